@@ -0,0 +1,81 @@
+import argparse
+import shutil
+import time
+from datetime import datetime
+from src.config import (BACKFILL_CHECKPOINT_DIR, BACKFILL_BUDGET_FRACTION, FETCH_CONCURRENCY,
+                        API_CALLS_PER_MINUTE, API_CALLS_PER_DAY)
+from src.api_client import OpenWeatherMapClient
+from src.backfill import BackfillJob
+from src.city_registry import load_city_registry
+from src.database import DatabaseManager
+from src.fetcher import ConcurrentFetcher
+from src.rate_limiter import RateLimiter
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Backfill daily weather summaries from archived observations or the history API')
+    parser.add_argument('--start', type=parse_date, required=True, help='first day (YYYY-MM-DD)')
+    parser.add_argument('--end', type=parse_date, required=True, help='last day (YYYY-MM-DD)')
+    parser.add_argument('--cities', help='comma-separated city names (default: all registry cities)')
+    parser.add_argument('--registry', help='CSV or JSON city registry file')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--archive', nargs='+', metavar='PATH',
+                        help='observation files (.jsonl, .csv, optionally gzipped) or directories')
+    source.add_argument('--history', action='store_true', help='use the history API endpoint')
+    parser.add_argument('--checkpoint-dir', default=BACKFILL_CHECKPOINT_DIR)
+    parser.add_argument('--restart', action='store_true', help='ignore any existing checkpoint')
+    parser.add_argument('--skip-failed', action='store_true',
+                        help='do not retry units that failed in an earlier run')
+    # The monitor keeps polling with the plan's full budget, so the backfill takes a share of it
+    parser.add_argument('--calls-per-minute', type=int,
+                        default=max(1, int(API_CALLS_PER_MINUTE * BACKFILL_BUDGET_FRACTION)),
+                        help='history API calls per minute (default: %(default)s)')
+    parser.add_argument('--calls-per-day', type=int,
+                        default=max(1, int(API_CALLS_PER_DAY * BACKFILL_BUDGET_FRACTION)),
+                        help='history API calls per day (default: %(default)s)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("\n=== Weather History Backfill ===\n")
+
+    if args.restart:
+        shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
+
+    registry = load_city_registry(args.registry)
+    cities = [c.strip() for c in args.cities.split(',')] if args.cities else None
+
+    rate_limiter = RateLimiter(args.calls_per_minute, args.calls_per_day)
+    api_client = OpenWeatherMapClient(use_cache=False, rate_limiter=rate_limiter)
+    api_client.register_cities(registry)
+    job = BackfillJob(DatabaseManager(), args.start, args.end, cities=cities,
+                      checkpoint_dir=args.checkpoint_dir, skip_failed=args.skip_failed)
+
+    started = time.monotonic()
+    fetcher = None
+    try:
+        if args.history:
+            fetcher = ConcurrentFetcher(FETCH_CONCURRENCY)
+            stats = job.run_history(api_client, cities or registry.names(), fetcher=fetcher)
+        else:
+            stats = job.run_archive(args.archive, api_client.parse_weather_data)
+    except KeyboardInterrupt:
+        print("\nBackfill interrupted; re-run the same command to resume")
+        return
+    finally:
+        if fetcher is not None:
+            fetcher.shutdown(wait=False)
+        api_client.close()
+
+    elapsed = time.monotonic() - started
+    print(f"\n✓ Backfill complete: {stats['units']} units, {stats['observations']} observations, "
+          f"{stats['summaries']} daily summaries in {elapsed:.1f}s")
+    if stats['failed']:
+        print(f"{stats['failed']} units failed; re-run the same command to retry them, "
+              f"or add --skip-failed to leave them out")
+
+if __name__ == "__main__":
+    main()
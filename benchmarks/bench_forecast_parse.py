@@ -0,0 +1,62 @@
+"""Micro-benchmark: dict-per-slot forecast parsing vs the columnar fast path.
+
+Measures parsing alone and parse-plus-convert, i.e. parsing followed by
+the DataFrame conversions done by add_forecast_data and the four
+ForecastVisualizer plots that consume the raw forecast.
+
+Parsing alone is a little slower (about 0.8x on a 40-slot payload): the
+columnar parser still walks every slot in Python. The gain is end to end,
+where the typed columns skip the per-plot DataFrame and to_datetime work.
+
+    python -m benchmarks.bench_forecast_parse
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('OPENWEATHERMAP_API_KEY', 'benchmark')
+
+import pandas as pd
+from src.api_client import OpenWeatherMapClient
+from src.data_processor import WeatherDataProcessor
+from src.forecast_visualizer import ForecastVisualizer
+from src.stub_server import forecast_payload
+
+PLOTS_PER_FORECAST = 4
+
+def dict_path(client, processor, visualizer, payload):
+    forecast = client.parse_forecast_data(payload)
+    processor.add_forecast_data('Delhi', forecast)
+    for _ in range(PLOTS_PER_FORECAST):
+        df = pd.DataFrame(forecast)
+        df['date_time'] = pd.to_datetime(df['date_time'])
+
+def columnar_path(client, processor, visualizer, payload):
+    processor.add_forecast_data('Delhi', client.parse_forecast_columns(payload))
+    stored = processor.get_forecast_data('Delhi')
+    for _ in range(PLOTS_PER_FORECAST):
+        visualizer._forecast_frame(stored)
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"  {label:<28}{seconds * 1e6:>10.1f} us")
+    return seconds
+
+def main(number=500):
+    client = OpenWeatherMapClient(use_cache=False)
+    processor = WeatherDataProcessor()
+    visualizer = ForecastVisualizer()
+    payload = forecast_payload('Delhi')
+
+    print(f"Forecast payload: {len(payload['list'])} slots, best of 5 x {number} runs")
+    print("Parse only:")
+    parse_dict = bench('dict (parse_forecast_data)', lambda: client.parse_forecast_data(payload), number)
+    parse_cols = bench('columnar', lambda: client.parse_forecast_columns(payload), number)
+    print("Parse + convert:")
+    full_dict = bench('dict', lambda: dict_path(client, processor, visualizer, payload), number)
+    full_cols = bench('columnar', lambda: columnar_path(client, processor, visualizer, payload), number)
+    print(f"Speed-up: parse {parse_dict / parse_cols:.1f}x, parse + convert {full_dict / full_cols:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Memory benchmark: dict records and object-dtype frames vs the compact path.
+
+Builds the in-memory store for many cities twice, measuring allocations
+with tracemalloc:
+
+  - records: one parse_weather_data dict per reading vs one Observation
+  - store: the original per-city DataFrame (object strings, float64) vs
+    the ObservationBuffer columns (categorical codes, float32)
+
+ObservationBuffer storage grows by doubling up to OBSERVATION_BUFFER_CAPACITY,
+so the store figure includes that preallocation slack and the per-buffer
+arrays, which dominate at a few dozen readings per city (about 175 vs 235
+bytes at the defaults). --steady-state measures a full raw retention window
+per city (1008 readings at 10-minute polling), which is what a long-running
+monitor holds: about 65 vs 133 bytes. Observation records keep their
+measures in one float32 array: about 245 vs 730 bytes for a dict.
+
+    python -m benchmarks.bench_observation_memory --cities 10000 --readings 48
+    python -m benchmarks.bench_observation_memory --cities 1000 --steady-state
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('OPENWEATHERMAP_API_KEY', 'benchmark')
+
+import pandas as pd
+from src.api_client import OpenWeatherMapClient
+from src.config import OBSERVATION_BUFFER_CAPACITY, RETENTION_DAYS
+from src.ring_buffer import ObservationBuffer
+from src.stub_server import weather_payload
+
+CONDITIONS = ['Clear', 'Clouds', 'Rain', 'Haze', 'Mist']
+START = 1725148800  # 2024-09-01 UTC
+STEADY_STATE_READINGS = RETENTION_DAYS['raw'] * 86400 // 600  # One retention window at 10 minutes
+
+def payloads(cities, readings):
+    for i in range(readings):
+        for c in range(cities):
+            payload = weather_payload(f"City {c}", START + i * 600)
+            payload['weather'][0]['main'] = CONDITIONS[(c + i) % len(CONDITIONS)]
+            yield payload
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return kept, current
+
+def dict_records(client, cities, readings):
+    return [client.parse_weather_data(p) for p in payloads(cities, readings)]
+
+def compact_records(client, cities, readings):
+    return [client.parse_weather_record(p) for p in payloads(cities, readings)]
+
+def frame_store(records):
+    by_city = {}
+    for record in records:
+        by_city.setdefault(record['city'], []).append(record)
+    return {city: pd.DataFrame(rows) for city, rows in by_city.items()}
+
+def buffer_store(records, capacity):
+    store = {}
+    for record in records:
+        if record.city not in store:
+            store[record.city] = ObservationBuffer(capacity)
+        store[record.city].append(record)
+    return store
+
+def report(label, baseline, compact, count):
+    print(f"  {label:<10}{baseline / count:>12.1f}{compact / count:>12.1f}"
+          f"{baseline / compact:>9.1f}x")
+
+def main(cities=10000, readings=48):
+    client = OpenWeatherMapClient(use_cache=False)
+    count = cities * readings
+
+    dicts, dict_bytes = measure(lambda: dict_records(client, cities, readings))
+    frames, frame_bytes = measure(lambda: frame_store(dicts))
+    del frames, dicts
+    records, record_bytes = measure(lambda: compact_records(client, cities, readings))
+    buffers, buffer_bytes = measure(lambda: buffer_store(records, OBSERVATION_BUFFER_CAPACITY))
+    del buffers, records
+
+    print(f"{cities} cities x {readings} readings ({count} observations), bytes per observation")
+    print(f"  {'':<10}{'baseline':>12}{'compact':>12}{'ratio':>10}")
+    report('records', dict_bytes, record_bytes, count)
+    report('store', frame_bytes, buffer_bytes, count)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cities', type=int, default=10000)
+    parser.add_argument('--readings', type=int, default=48, help='observations per city')
+    parser.add_argument('--steady-state', action='store_true',
+                        help=f"use a full retention window ({STEADY_STATE_READINGS} readings per city)")
+    args = parser.parse_args()
+    main(args.cities, STEADY_STATE_READINGS if args.steady_state else args.readings)
@@ -1,19 +1,42 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
 import time
 from datetime import date
-from src.config import CITIES, UPDATE_INTERVAL
+from src.config import (UPDATE_INTERVAL, FETCH_CONCURRENCY, BATCH_REQUESTS, BATCH_SIZE,
+                        JOB_INTERVALS, CITY_JOB_INTERVALS, SCHEDULER_JITTER, POLLING_TIERS,
+                        WORKER_PROCESSES, API_CALLS_PER_MINUTE, API_CALLS_PER_DAY,
+                        API_BUDGET_RESERVE, RESPONSE_CACHE_PATH, SNAPSHOT_DIR,
+                        WORKER_RESTARTS, WORKER_SHUTDOWN_TIMEOUT, BACKFILL_BUDGET_FRACTION)
 from src.api_client import OpenWeatherMapClient
+from src.fetcher import ConcurrentFetcher
+from src.scheduler import JobScheduler
+from src.rate_limiter import RateLimiter, QuotaDeferred
+from src.cache import ResponseCache
+from src.city_registry import load_city_registry
 from src.data_processor import WeatherDataProcessor
+from src.snapshot import ObservationSnapshot
 from src.database import DatabaseManager
+from src.persistence import database_writer
 from src.alerting import AlertSystem
-from src.visualization import WeatherVisualizer
+from src.visualization import WeatherVisualizer, DAILY_SUMMARY_COLUMNS
 from src.forecast_visualizer import ForecastVisualizer
 
-def process_current_weather(city, api_client, data_processor, db_manager, alert_system, visualizer):
-    """Process current weather data for a city"""
+def process_current_weather(city, api_client, data_processor, db_manager, alert_system, visualizer,
+                            raw_data=None, summaries=None, db_writer=None):
+    """Process current weather data for a city
+
+    When a `summaries` list is given the day's summary is appended to it
+    for the caller to save with the rest of the cycle (see run_current_weather).
+    Readings are handed to `db_writer`, if any, to be stored in the background.
+    """
     try:
-        print(f"\nFetching current weather data for {city}...")
-        raw_data = api_client.get_weather_data(city)
-        weather_data = api_client.parse_weather_data(raw_data)
+        if raw_data is None:
+            print(f"\nFetching current weather data for {city}...")
+            raw_data = api_client.get_weather_data(city)
+        weather_data = api_client.parse_weather_record(raw_data)
         
         # Display current conditions
         print(f"Current conditions in {city}:")
@@ -25,13 +48,18 @@ def process_current_weather(city, api_client, data_processor, db_manager, alert_
         
         # Process and store data
         try:
-            data_processor.add_weather_data(weather_data)
+            added = data_processor.add_weather_data(weather_data)
+            if added and db_writer is not None:
+                db_writer.put(weather_data.to_dict(), kind='observation',
+                              key=(city, weather_data.dt))
             
             # Process daily summary
             today = date.today()
             daily_summary = data_processor.get_daily_summary(city, today)
             
-            if daily_summary:
+            if daily_summary and summaries is not None:
+                summaries.append((city, daily_summary))
+            elif daily_summary:
                 try:
                     db_manager.save_daily_summary(city, daily_summary)
                     print(f"✓ Updated daily summary for {city}")
@@ -52,32 +80,35 @@ def process_current_weather(city, api_client, data_processor, db_manager, alert_
         print(f"Error fetching weather data for {city}: {str(e)}")
         return False
 
-def process_forecast(city, api_client, data_processor, forecast_visualizer):
-    """Process forecast data for a city"""
+def process_forecast(city, api_client, data_processor, forecast_visualizer, raw_forecast=None,
+                     summarize=True):
+    """Process forecast data for a city
+
+    With summarize=False the alerts and daily summary chart are left to the
+    caller, which can evaluate many cities at once (see run_forecasts).
+    """
     try:
-        print(f"\nFetching forecast data for {city}...")
-        raw_forecast = api_client.get_forecast_data(city)
-        forecast_data = api_client.parse_forecast_data(raw_forecast)
-        
-        # Store forecast data
-        data_processor.add_forecast_data(city, forecast_data)
+        if raw_forecast is None:
+            print(f"\nFetching forecast data for {city}...")
+            raw_forecast = api_client.get_forecast_data(city)
+        forecast_columns = api_client.parse_forecast_columns(raw_forecast)
         
-        # Generate forecast summaries
-        forecast_summaries = data_processor.get_forecast_summary(city)
+        # Store forecast data, then render from the stored frame
+        data_processor.add_forecast_data(city, forecast_columns)
+        forecast_data = data_processor.get_forecast_data(city)
         
         # Check for weather alerts
-        alerts = data_processor.get_weather_alerts(city)
-        if alerts:
-            print(f"\nWeather Alerts for {city}:")
-            for alert in alerts:
-                print(f"  ⚠️ {alert['type']}: {alert['description']}")
+        if summarize:
+            print_forecast_alerts(city, data_processor.get_weather_alerts(city))
         
         # Generate forecast visualizations
         forecast_visualizer.plot_temperature_forecast(city, forecast_data)
         forecast_visualizer.plot_precipitation_forecast(city, forecast_data)
         forecast_visualizer.plot_wind_forecast(city, forecast_data)
         forecast_visualizer.create_forecast_dashboard(city, forecast_data)
-        forecast_visualizer.plot_forecast_summary(city, forecast_summaries)
+        if summarize:
+            forecast_visualizer.plot_forecast_summary(
+                city, data_processor.get_forecast_summary(city))
         
         print(f"✓ Generated forecast visualizations for {city}")
         return True
@@ -85,64 +116,363 @@ def process_forecast(city, api_client, data_processor, forecast_visualizer):
         print(f"Error processing forecast for {city}: {str(e)}")
         return False
 
-def main():
-    print("\n=== Weather Monitoring System Starting ===\n")
-    
+def print_forecast_alerts(city, alerts):
+    """Print forecast alert dicts for a city"""
+    if alerts:
+        print(f"\nWeather Alerts for {city}:")
+        for alert in alerts:
+            print(f"  ⚠️ {alert['type']}: {alert['description']}")
+
+def submit_current_weather(fetcher, api_client, cities):
+    """Start current weather fetches, one group request per batch in batched mode"""
+    if BATCH_REQUESTS:
+        batches = [cities[i:i + BATCH_SIZE] for i in range(0, len(cities), BATCH_SIZE)]
+        return fetcher.submit_all(api_client.get_weather_data_batch, batches)
+    return fetcher.submit_all(api_client.get_weather_data, cities)
+
+def collect_current_weather(fetcher, pending):
+    """Yield (city, raw_data, error) per city in submission order"""
+    for key, result, error in fetcher.collect(pending):
+        if not BATCH_REQUESTS:
+            yield key, result, error
+            continue
+        for city in key:
+            if error is not None:
+                yield city, None, error
+            elif city in result:
+                yield city, result[city], None
+            else:
+                yield city, None, LookupError("no data returned in batch")
+
+def run_current_weather(cities, fetcher, api_client, data_processor, db_manager,
+                        alert_system, visualizer, db_writer=None):
+    """Fetch current weather for a group of cities and process it in city order
+
+    With a `db_writer` the cycle's database writes are queued for its
+    background thread instead of being made here.
+    """
+    # Start all fetches up front so the job waits on the slowest city
+    # rather than the sum of every city's round trips
+    print(f"\nFetching weather data for {len(cities)} cities...")
+    pending = submit_current_weather(fetcher, api_client, cities)
+
+    summaries = []
+    for city, raw_data, error in collect_current_weather(fetcher, pending):
+        if error is not None:
+            print(f"Error fetching weather data for {city}: {str(error)}")
+            continue
+        process_current_weather(city, api_client, data_processor,
+                             db_manager, alert_system, visualizer,
+                             raw_data=raw_data, summaries=summaries,
+                             db_writer=db_writer)
+    save_daily_summaries(summaries, db_manager, db_writer)
+    save_rollups(data_processor, db_manager, db_writer)
+    api_client.save_cache()
+
+def save_daily_summaries(summaries, db_manager, db_writer=None):
+    """Upsert the cycle's daily summaries in one transaction, or queue them on `db_writer`"""
+    if not summaries:
+        return
+    if db_writer is not None:
+        for city, summary in summaries:
+            db_writer.put((city, summary), kind='summary', key=(city, summary['date']))
+        return
+    try:
+        saved = db_manager.save_daily_summaries(summaries)
+        print(f"✓ Updated daily summaries for {saved} cities")
+    except Exception as e:
+        print(f"Error saving daily summaries: {str(e)}")
+
+def save_rollups(data_processor, db_manager, db_writer=None):
+    """Write the rollup periods updated this cycle, one transaction per tier"""
+    for tier, batch in data_processor.take_dirty_rollups().items():
+        if db_writer is not None:
+            for city, summary in batch:
+                db_writer.put((city, summary), kind=f"rollup/{tier}", key=(city, summary['date']))
+            continue
+        try:
+            db_manager.save_rollups(tier, batch)
+        except Exception as e:
+            print(f"Error saving {tier} rollups: {str(e)}")
+
+def run_forecasts(cities, fetcher, api_client, data_processor, forecast_visualizer):
+    """Fetch forecasts for a group of cities and process them in city order"""
+    pending = fetcher.submit_all(api_client.get_forecast_data, cities)
+    processed = []
+    for city, raw_forecast, error in fetcher.collect(pending):
+        if isinstance(error, QuotaDeferred):
+            print(f"Deferred forecast for {city}: {str(error)}")
+            continue
+        if error is not None:
+            print(f"Error processing forecast for {city}: {str(error)}")
+            continue
+        if process_forecast(city, api_client, data_processor, forecast_visualizer,
+                            raw_forecast=raw_forecast, summarize=False):
+            processed.append(city)
+
+    # Evaluate alert rules and summarise every processed city in one pass each
+    try:
+        alerts = data_processor.get_forecast_alerts(processed)
+        for city in alerts['city'].unique():
+            print_forecast_alerts(city, data_processor.alert_rules.messages(alerts, city))
+    except Exception as e:
+        print(f"Error generating weather alerts: {str(e)}")
+
+    summaries = data_processor.get_forecast_summaries(processed)
+    if summaries is not None and not summaries.empty:
+        for city, city_summaries in summaries.groupby('city', sort=False):
+            try:
+                forecast_visualizer.plot_forecast_summary(city, city_summaries)
+            except Exception as e:
+                print(f"Error plotting forecast summary for {city}: {str(e)}")
+    api_client.save_cache()
+
+def render_visualizations(data_processor, db_manager, visualizer):
+    """Generate current weather visualizations"""
+    try:
+        recent_data = data_processor.get_recent_view()
+        if not recent_data.empty:
+            visualizer.plot_temperature_trends(recent_data)
+            visualizer.plot_weather_conditions(recent_data)
+
+            today = date.today()
+            summaries = db_manager.get_summary_frame(
+                today.replace(day=1),
+                today,
+                columns=DAILY_SUMMARY_COLUMNS
+            )
+            if not summaries.empty:
+                visualizer.plot_daily_summary(summaries)
+    except Exception as e:
+        print(f"Error generating visualizations: {str(e)}")
+
+def group_cities_by_interval(registry, job_type):
+    """Group cities by their polling interval for a job type
+
+    Per-city overrides win, then the city's registry tier (current
+    weather only), then the job type's default interval.
+    """
+    groups = {}
+    for city in registry:
+        interval = JOB_INTERVALS[job_type]
+        if job_type == 'current_weather':
+            interval = POLLING_TIERS.get(city.tier, interval)
+        interval = CITY_JOB_INTERVALS.get(city.name, {}).get(job_type, interval)
+        groups.setdefault(interval, []).append(city.name)
+    return groups
+
+def schedule_jobs(scheduler, registry, fetcher, api_client, data_processor, db_manager,
+                  alert_system, visualizer, forecast_visualizer, render=True, snapshot=None,
+                  db_writer=None, archive=True):
+    """Register the fetch, rendering, cleanup, snapshot and archive jobs"""
+    for interval, group in group_cities_by_interval(registry, 'current_weather').items():
+        scheduler.add_job(f"current_weather/{interval}s", run_current_weather, interval,
+                          args=(group, fetcher, api_client, data_processor, db_manager,
+                                alert_system, visualizer, db_writer),
+                          jitter=SCHEDULER_JITTER)
+
+    for interval, group in group_cities_by_interval(registry, 'forecast').items():
+        scheduler.add_job(f"forecast/{interval}s", run_forecasts, interval,
+                          args=(group, fetcher, api_client, data_processor,
+                                forecast_visualizer),
+                          jitter=SCHEDULER_JITTER)
+
+    if render:
+        # Render once the first fetches have had a chance to land
+        scheduler.add_job('visualization', render_visualizations, JOB_INTERVALS['visualization'],
+                          args=(data_processor, db_manager, visualizer),
+                          start_delay=SCHEDULER_JITTER)
+    scheduler.add_job('cleanup', data_processor.clear_old_data, JOB_INTERVALS['cleanup'],
+                      start_delay=JOB_INTERVALS['cleanup'])
+    if archive and db_writer is not None:
+        # Archiving deletes from the hot table, so it runs on the writer thread between batches
+        scheduler.add_job('archive', db_writer.call, JOB_INTERVALS['archive'],
+                          args=(db_manager.archive_closed_months,),
+                          start_delay=JOB_INTERVALS['cleanup'])
+    elif archive:
+        scheduler.add_job('archive', db_manager.archive_closed_months, JOB_INTERVALS['archive'],
+                          start_delay=JOB_INTERVALS['cleanup'])
+    if snapshot is not None:
+        scheduler.add_job('snapshot', snapshot.save, JOB_INTERVALS['snapshot'],
+                          args=(data_processor,), start_delay=JOB_INTERVALS['snapshot'])
+
+def print_scheduler_stats(scheduler):
+    """Print run and missed-deadline counts for every job"""
+    print("\nScheduler statistics:")
+    for name, stats in scheduler.get_stats().items():
+        print(f"  {name}: {stats['runs']} runs, {stats['missed']} missed, "
+              f"{stats['late']} late, {stats['errors']} errors")
+
+def run_worker(registry, worker_index=0, num_workers=1):
+    """Run the fetch/process/persist pipeline for the cities in `registry`
+
+    Workers split the API budget left after the backfill's share
+    (BACKFILL_BUDGET_FRACTION) equally. With several workers each one has
+    its own response cache file and snapshot; only worker 0 renders
+    visualizations and archives old summaries. Returns False if the
+    components could not be initialized.
+    """
+    label = f"[worker {worker_index}] " if num_workers > 1 else ""
+
     # Initialize components
     try:
-        api_client = OpenWeatherMapClient()
+        cache_path = RESPONSE_CACHE_PATH
+        snapshot_dir = SNAPSHOT_DIR
+        if num_workers > 1:
+            root, ext = os.path.splitext(RESPONSE_CACHE_PATH)
+            cache_path = f"{root}.{worker_index}{ext}"
+            snapshot_dir = f"{SNAPSHOT_DIR}.{worker_index}"
+        # backfill.py may run alongside, so its share of the plan is held back
+        share = (1 - BACKFILL_BUDGET_FRACTION) / num_workers
+        rate_limiter = RateLimiter(max(API_CALLS_PER_MINUTE * share, 1),
+                                   max(int(API_CALLS_PER_DAY * share), 1),
+                                   reserve=API_BUDGET_RESERVE)
+        api_client = OpenWeatherMapClient(cache=ResponseCache(path=cache_path),
+                                          rate_limiter=rate_limiter)
+        api_client.register_cities(registry)
         data_processor = WeatherDataProcessor()
+        snapshot = ObservationSnapshot(snapshot_dir)
+        snapshot.restore(data_processor, cities=set(registry.names()))
         db_manager = DatabaseManager()
+        db_writer = database_writer(db_manager).start()
         alert_system = AlertSystem()
         visualizer = WeatherVisualizer()
         forecast_visualizer = ForecastVisualizer()
-        print("✓ Successfully initialized all components")
+        fetcher = ConcurrentFetcher(FETCH_CONCURRENCY)
+        scheduler = JobScheduler()
+        print(f"{label}✓ Successfully initialized all components")
     except Exception as e:
-        print(f"ERROR initializing components: {str(e)}")
-        return
+        print(f"{label}ERROR initializing components: {str(e)}")
+        return False
 
-    print(f"\nMonitoring weather for cities: {', '.join(CITIES)}")
-    print(f"Update interval: {UPDATE_INTERVAL} seconds")
-    print("\nPress Ctrl+C to stop the monitoring...\n")
+    print(f"{label}Monitoring {len(registry)} cities")
+    schedule_jobs(scheduler, registry, fetcher, api_client, data_processor, db_manager,
+                  alert_system, visualizer, forecast_visualizer, render=worker_index == 0,
+                  snapshot=snapshot, db_writer=db_writer,
+                  archive=worker_index == 0)
 
     try:
-        while True:
-            for city in CITIES:
-                # Process current weather
-                process_current_weather(city, api_client, data_processor, 
-                                     db_manager, alert_system, visualizer)
-                
-                # Process forecast (every hour)
-                if int(time.time()) % 3600 < UPDATE_INTERVAL:
-                    process_forecast(city, api_client, data_processor, 
-                                  forecast_visualizer)
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        # A second Ctrl+C must not cut off the final flush and snapshot
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        print(f"\n\n{label}Stopping weather monitoring...")
+        print_scheduler_stats(scheduler)
+        budget = api_client.get_rate_limit_status()
+        print(f"API budget remaining: {budget['minute']}/min, {budget['day']}/day")
+        fetcher.shutdown(wait=False)
+        api_client.close()
+        # Write everything still queued before the process exits
+        db_writer.stop()
+        stats = db_writer.stats
+        print(f"{label}Database writer: {stats['written']} rows in {stats['batches']} batches, "
+              f"{stats['coalesced']} updates merged, {stats['errors']} errors")
+        try:
+            snapshot.save(data_processor)
+        except Exception as e:
+            print(f"{label}Error saving snapshot: {str(e)}")
+    return True
 
-            # Generate current weather visualizations
-            try:
-                recent_data = data_processor.get_recent_data()
-                if not recent_data.empty:
-                    visualizer.plot_temperature_trends(recent_data)
-                    visualizer.plot_weather_conditions(recent_data)
-
-                    today = date.today()
-                    summaries = db_manager.get_daily_summaries(
-                        today.replace(day=1), 
-                        today
-                    )
-                    if summaries:
-                        visualizer.plot_daily_summary(summaries)
-            except Exception as e:
-                print(f"Error generating visualizations: {str(e)}")
+def worker_main(registry, worker_index, num_workers):
+    """Worker process entry point; exits non-zero if the worker failed to start"""
+    sys.exit(0 if run_worker(registry, worker_index, num_workers) else 1)
 
-            # Clean up old data
-            data_processor.clear_old_data()
+def start_worker(registry, worker_index, num_workers):
+    worker = multiprocessing.Process(target=worker_main, name=f"weather-worker-{worker_index}",
+                                     args=(registry.shard(worker_index, num_workers),
+                                           worker_index, num_workers))
+    worker.start()
+    return worker
 
-            print(f"\nSleeping for {UPDATE_INTERVAL} seconds...")
-            time.sleep(UPDATE_INTERVAL)
+def supervise_workers(workers, registry, num_workers, max_restarts=WORKER_RESTARTS):
+    """Wait for the workers, restarting any that exits with an error
 
-    except KeyboardInterrupt:
-        print("\n\nStopping weather monitoring system...")
+    A worker that keeps failing is reported and left stopped once it has
+    been restarted `max_restarts` times; its cities are then not polled.
+    """
+    restarts = [0] * len(workers)
+    while any(worker is not None for worker in workers):
+        for index, worker in enumerate(workers):
+            if worker is None:
+                continue
+            worker.join(timeout=1)
+            if worker.exitcode is None:
+                continue
+            if worker.exitcode == 0:
+                workers[index] = None
+            elif restarts[index] < max_restarts:
+                restarts[index] += 1
+                print(f"Worker {index} exited with code {worker.exitcode}; restarting "
+                      f"({restarts[index]}/{max_restarts})")
+                workers[index] = start_worker(registry, index, num_workers)
+            else:
+                print(f"ERROR: worker {index} exited with code {worker.exitcode} after "
+                      f"{max_restarts} restarts; its {len(registry.shard(index, num_workers))} "
+                      f"cities are not monitored")
+                workers[index] = None
+
+def join_workers(workers, timeout):
+    """Wait up to `timeout` seconds in total for the workers to exit"""
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        worker.join(timeout=max(deadline - time.monotonic(), 0))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Weather Monitoring System')
+    parser.add_argument('--registry', help='CSV or JSON city registry file')
+    parser.add_argument('--workers', type=int, default=WORKER_PROCESSES,
+                        help='number of worker processes, each owning a shard of the cities')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("\n=== Weather Monitoring System Starting ===\n")
+
+    try:
+        registry = load_city_registry(args.registry)
+    except Exception as e:
+        print(f"ERROR loading city registry: {str(e)}")
+        return
+
+    num_workers = max(1, min(args.workers, len(registry)))
+    if len(registry) <= 20:
+        print(f"Monitoring weather for cities: {', '.join(registry.names())}")
+    else:
+        print(f"Monitoring weather for {len(registry)} cities")
+    print(f"Update interval: {UPDATE_INTERVAL} seconds")
+    print(f"Fetch concurrency: {FETCH_CONCURRENCY}, worker processes: {num_workers}")
+    print("\nPress Ctrl+C to stop the monitoring...\n")
+
+    if num_workers == 1:
+        run_worker(registry)
         print("Goodbye!")
+        return
+
+    # Create the schema once; workers racing to create it on a fresh database fail
+    try:
+        DatabaseManager(cache_summaries=False).engine.dispose()
+    except Exception as e:
+        print(f"ERROR initializing database: {str(e)}")
+        return
+
+    workers = [start_worker(registry, i, num_workers) for i in range(num_workers)]
+    try:
+        supervise_workers(list(workers), registry, num_workers)
+    except KeyboardInterrupt:
+        # A terminal Ctrl+C already reached every worker in the process
+        # group; only interrupt the ones still running after the timeout,
+        # in case just the parent was signalled
+        workers = [worker for worker in multiprocessing.active_children()
+                   if worker.name.startswith('weather-worker-')]
+        join_workers(workers, WORKER_SHUTDOWN_TIMEOUT)
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGINT)
+        join_workers(workers, WORKER_SHUTDOWN_TIMEOUT)
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+    print("Goodbye!")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
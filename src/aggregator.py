@@ -0,0 +1,135 @@
+import math
+import sys
+import numpy as np
+from datetime import date, datetime, timedelta
+
+WIND_DIRECTIONS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                   'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+EPOCH_DATE = date(1970, 1, 1)
+MEAN_FIELDS = {
+    'avg_temp': 'temp',
+    'avg_humidity': 'humidity',
+    'avg_pressure': 'pressure',
+    'avg_wind_speed': 'wind_speed',
+    'avg_clouds': 'clouds',
+    'avg_visibility': 'visibility',
+}
+
+def utc_date(dt):
+    """UTC calendar date of a unix timestamp"""
+    return EPOCH_DATE + timedelta(days=int(dt) // 86400)
+
+def period_start(dt, seconds):
+    """Start of the UTC period of `seconds` containing a unix timestamp, as a naive datetime"""
+    return datetime(1970, 1, 1) + timedelta(seconds=int(dt) // seconds * seconds)
+
+def compass_direction(sin_sum, cos_sum):
+    """16-point compass name of the circular mean of summed unit wind vectors
+
+    Works on scalars or numpy arrays. Averaging the vectors rather than
+    the degrees keeps 350° and 10° pointing north instead of south.
+    """
+    degrees = np.degrees(np.arctan2(sin_sum, cos_sum)) % 360
+    index = (degrees / 22.5 + 0.5).astype(int) % 16
+    return np.asarray(WIND_DIRECTIONS)[index]
+
+def dominant_values(counts, column):
+    """Most frequent value per (city, date), ties going to the smallest value
+
+    Vectorized equivalent of Series.mode().iloc[0] over every group at once.
+    """
+    frame = counts.rename('count').reset_index()
+    frame = frame.sort_values(['city', 'date', 'count', column],
+                              ascending=[True, True, False, True], kind='mergesort')
+    return frame.drop_duplicates(['city', 'date']).set_index(['city', 'date'])[column]
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+def _dominant(counts):
+    """Most frequent value, ties going to the smallest (as Series.mode().iloc[0])"""
+    if not counts:
+        return 'Unknown'
+    top = max(counts.values())
+    return min(value for value, count in counts.items() if count == top)
+
+class PeriodAggregate:
+    """Running summary of one city's observations over one period (day or hour)
+
+    add() is O(1) in the number of readings already seen, and summary()
+    returns the same dict get_daily_summary used to compute from scratch,
+    with the period label under 'date'.
+    """
+
+    __slots__ = ('period', 'count', 'sums', 'temp_min', 'temp_max', 'wind_speed_max',
+                 'wind_sin', 'wind_cos', 'conditions', 'descriptions')
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.sums = dict.fromkeys(list(MEAN_FIELDS.values()) + ['rain_1h', 'snow_1h'], 0.0)
+        self.temp_min = math.inf
+        self.temp_max = -math.inf
+        self.wind_speed_max = -math.inf
+        self.wind_sin = 0.0
+        self.wind_cos = 0.0
+        self.conditions = {}  # Plain dicts rather than Counters: they pickle far faster
+        self.descriptions = {}
+
+    def add(self, observation):
+        """Fold one observation dict into the running totals"""
+        self.count += 1
+        for field in self.sums:
+            self.sums[field] += _number(observation.get(field))
+
+        temp = _number(observation.get('temp'))
+        self.temp_min = min(self.temp_min, temp)
+        self.temp_max = max(self.temp_max, temp)
+        self.wind_speed_max = max(self.wind_speed_max, _number(observation.get('wind_speed')))
+
+        radians = math.radians(_number(observation.get('wind_direction')))
+        self.wind_sin += math.sin(radians)
+        self.wind_cos += math.cos(radians)
+
+        condition = observation.get('main') or 'Unknown'
+        self.conditions[condition] = self.conditions.get(condition, 0) + 1
+        description = observation.get('description') or 'Unknown'
+        self.descriptions[description] = self.descriptions.get(description, 0) + 1
+
+    def __getstate__(self):
+        # A flat tuple unpickles several times faster than the default slots dict
+        return (self.period, self.count, self.sums, self.temp_min, self.temp_max,
+                self.wind_speed_max, self.wind_sin, self.wind_cos, self.conditions,
+                self.descriptions)
+
+    def __setstate__(self, state):
+        (self.period, self.count, self.sums, self.temp_min, self.temp_max,
+         self.wind_speed_max, self.wind_sin, self.wind_cos, self.conditions,
+         self.descriptions) = state
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by this aggregate"""
+        return (sys.getsizeof(self) + sys.getsizeof(self.sums)
+                + sys.getsizeof(self.conditions) + sys.getsizeof(self.descriptions))
+
+    def summary(self):
+        """Current summary dict for the day"""
+        summary = {'date': self.period, 'observations': self.count}
+        for key, field in MEAN_FIELDS.items():
+            summary[key] = self.sums[field] / self.count
+        summary.update({
+            'max_temp': self.temp_max,
+            'min_temp': self.temp_min,
+            'dominant_weather': _dominant(self.conditions),
+            'detailed_description': _dominant(self.descriptions),
+            'max_wind_speed': self.wind_speed_max,
+            'dominant_wind_direction': str(compass_direction(self.wind_sin, self.wind_cos)),
+            'total_rain': self.sums['rain_1h'],
+            'total_snow': self.sums['snow_1h'],
+        })
+        return summary
@@ -1,26 +1,189 @@
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from .config import OPENWEATHERMAP_API_KEY, TEMPERATURE_UNIT
+from .cache import ResponseCache
+from .observation import Observation
+from .rate_limiter import RateLimiter, PRIORITY_HIGH, PRIORITY_LOW
+from .config import (OPENWEATHERMAP_API_KEY, TEMPERATURE_UNIT, API_BASE_URL, HISTORY_BASE_URL,
+                     HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+                     HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, BATCH_SIZE,
+                     API_CALLS_PER_MINUTE, API_CALLS_PER_DAY, API_BUDGET_RESERVE,
+                     DEFAULT_COUNTRY)
+
+# Numeric forecast fields in the order parse_forecast_columns extracts them
+FORECAST_MEASURES = ['temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity',
+                     'wind_speed', 'wind_direction', 'clouds', 'pop', 'rain_3h', 'snow_3h']
 
 class OpenWeatherMapClient:
-    BASE_URL = "http://api.openweathermap.org/data/2.5"
+    BASE_URL = API_BASE_URL
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    LOW_PRIORITY_ENDPOINTS = {'forecast'}
 
-    def __init__(self):
+    def __init__(self, base_url=None, pool_size=HTTP_POOL_SIZE,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 max_retries=HTTP_MAX_RETRIES, backoff_base=HTTP_BACKOFF_BASE,
+                 backoff_max=HTTP_BACKOFF_MAX, cache=None, use_cache=True,
+                 rate_limiter=None, history_base_url=None):
         if not OPENWEATHERMAP_API_KEY:
             raise ValueError("OpenWeatherMap API key is not set")
         self.api_key = OPENWEATHERMAP_API_KEY
+        self.base_url = base_url or self.BASE_URL
+        self.history_base_url = history_base_url or HISTORY_BASE_URL
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # One keep-alive session shared by every call (and every fetch thread)
+        self._adapter = HTTPAdapter(pool_connections=pool_size,
+                                    pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+        # Responses are served from the cache within their TTL
+        self.cache = None
+        if use_cache:
+            self.cache = cache if cache is not None else ResponseCache()
+
+        # Shared by every thread using this client; forecasts yield to current weather
+        self.rate_limiter = rate_limiter or RateLimiter(
+            API_CALLS_PER_MINUTE, API_CALLS_PER_DAY, reserve=API_BUDGET_RESERVE)
+
+        # City name -> OpenWeatherMap city ID, resolved once per city
+        self.city_ids = {}
+        self.city_countries = {}
+
+    def _units(self):
+        return 'metric' if TEMPERATURE_UNIT == 'celsius' else 'imperial'
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _get_json(self, endpoint, params):
+        """GET an endpoint through the response cache"""
+        if self.cache is None:
+            return self._request(endpoint, params).json()
+
+        data, entry = self.cache.get(endpoint, params)
+        if data is not None:
+            return data
+
+        response = self._request(endpoint, params, headers=self.cache.validators(entry))
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidate(endpoint, params)
+        data = response.json()
+        self.cache.put(endpoint, params, data, response.headers)
+        return data
+
+    def _request(self, endpoint, params, headers=None, base_url=None):
+        """GET an API endpoint with timeouts and retry/backoff on 429/5xx"""
+        url = f"{base_url or self.base_url}/{endpoint}"
+        priority = PRIORITY_LOW if endpoint in self.LOW_PRIORITY_ENDPOINTS else PRIORITY_HIGH
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(priority)
+            self._count('requests')
+            try:
+                response = self.session.get(url, params=params, headers=headers,
+                                            timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+                delay = self._backoff_delay(attempt)
+            else:
+                if (response.status_code not in self.RETRY_STATUS_CODES
+                        or attempt >= self.max_retries):
+                    if not response.ok:
+                        self._count('failures')
+                    response.raise_for_status()
+                    return response
+                if response.status_code == 429:
+                    self.rate_limiter.throttle()
+                delay = self._backoff_delay(attempt, response.headers.get('Retry-After'))
+                # Drain the body so the connection goes back to the pool
+                response.content
+            attempt += 1
+            self._count('retries')
+            time.sleep(delay)
+
+    def get_connection_stats(self):
+        """Get request counters and keep-alive connection reuse statistics"""
+        opened = 0
+        served = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                served += pool.num_requests
+        with self._stats_lock:
+            stats = dict(self._stats)
+        if self.cache is not None:
+            stats.update({f"cache_{k}": v for k, v in self.cache.stats.items()})
+        stats.update({
+            'pool_size': self.pool_size,
+            'connections_opened': opened,
+            'connections_reused': max(served - opened, 0),
+        })
+        return stats
+
+    def get_rate_limit_status(self):
+        """Get the remaining per-minute and per-day API call budgets"""
+        return self.rate_limiter.remaining()
+
+    def save_cache(self):
+        """Persist cached responses so they survive a restart"""
+        if self.cache is not None:
+            self.cache.save()
+
+    def close(self):
+        """Persist the response cache and close all pooled connections"""
+        self.save_cache()
+        self.session.close()
+
+    def register_cities(self, registry):
+        """Use registry IDs and countries when building requests"""
+        for city in registry:
+            self.city_countries[city.name] = city.country
+            if city.city_id is not None:
+                self.city_ids[city.name] = city.city_id
+
+    def _location_params(self, city):
+        if city in self.city_ids:
+            return {'id': self.city_ids[city]}
+        return {'q': f"{city},{self.city_countries.get(city, DEFAULT_COUNTRY)}"}
 
     def get_weather_data(self, city):
         """Get current weather data"""
         params = {
-            'q': f"{city},IN",
+            **self._location_params(city),
             'appid': self.api_key,
-            'units': 'metric' if TEMPERATURE_UNIT == 'celsius' else 'imperial'
+            'units': self._units()
         }
         try:
-            response = requests.get(f"{self.BASE_URL}/weather", params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json('weather', params)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather data: {e}")
             raise
@@ -28,18 +191,93 @@ class OpenWeatherMapClient:
     def get_forecast_data(self, city, days=5):
         """Get weather forecast data"""
         params = {
-            'q': f"{city},IN",
+            **self._location_params(city),
             'appid': self.api_key,
-            'units': 'metric' if TEMPERATURE_UNIT == 'celsius' else 'imperial'
+            'units': self._units()
         }
         try:
-            response = requests.get(f"{self.BASE_URL}/forecast", params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json('forecast', params)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching forecast data: {e}")
             raise
 
+    def get_history_data(self, city, start, end):
+        """Get hourly historical observations between two Unix timestamps"""
+        params = {
+            **self._location_params(city),
+            'type': 'hour',
+            'start': int(start),
+            'end': int(end),
+            'appid': self.api_key,
+            'units': self._units()
+        }
+        try:
+            return self._request('history/city', params, base_url=self.history_base_url).json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching history data: {e}")
+            raise
+
+    def parse_history_data(self, city, data):
+        """Parse a history response into parse_weather_data dicts"""
+        return [self.parse_weather_data({'name': city, **item}) for item in data.get('list', [])]
+
+    def resolve_city_id(self, city):
+        """Resolve a city name to its OpenWeatherMap ID, caching the result"""
+        if city not in self.city_ids:
+            self._remember_city_id(city, self.get_weather_data(city))
+        return self.city_ids[city]
+
+    def _remember_city_id(self, city, data):
+        if data.get('id') is not None:
+            self.city_ids[city] = data['id']
+
+    def get_weather_data_batch(self, cities, batch_size=BATCH_SIZE):
+        """Get current weather for many cities using the multi-ID group endpoint
+
+        Returns a dict mapping each requested city to its raw payload, in the
+        same shape as get_weather_data so parse_weather_data applies as is.
+        Cities without a known ID are resolved first; the payload of that
+        lookup is used directly instead of being fetched again.
+        """
+        results = {}
+        for city in cities:
+            if city not in self.city_ids:
+                try:
+                    data = self.get_weather_data(city)
+                except requests.exceptions.RequestException:
+                    continue
+                self._remember_city_id(city, data)
+                results[city] = data
+
+        pending = [c for c in cities if c not in results and c in self.city_ids]
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            by_id = {self.city_ids[c]: c for c in chunk}
+            params = {
+                'id': ','.join(str(city_id) for city_id in by_id),
+                'appid': self.api_key,
+                'units': self._units()
+            }
+            try:
+                data = self._get_json('group', params)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching batched weather data: {e}")
+                raise
+            for item in self.split_group_response(data):
+                city = by_id.get(item.get('id'))
+                if city is not None:
+                    results[city] = item
+
+        return {city: results[city] for city in cities if city in results}
+
+    def split_group_response(self, data):
+        """Split a group endpoint response into per-city weather payloads"""
+        return list(data.get('list', []))
+
+    def parse_weather_batch(self, data):
+        """Parse a group endpoint response into parse_weather_data dicts"""
+        return [self.parse_weather_data(item) for item in self.split_group_response(data)]
+
     def parse_weather_data(self, data):
         """Parse current weather data with extended parameters"""
         return {
@@ -61,6 +299,19 @@ class OpenWeatherMapClient:
             'dt': data['dt']
         }
 
+    def parse_weather_record(self, data):
+        """Parse current weather data into a compact Observation record"""
+        main = data['main']
+        wind = data['wind']
+        return Observation(
+            data['name'], data['weather'][0]['main'], data['weather'][0]['description'],
+            data['dt'],
+            temp=main['temp'], feels_like=main['feels_like'], temp_min=main['temp_min'],
+            temp_max=main['temp_max'], pressure=main['pressure'], humidity=main['humidity'],
+            wind_speed=wind['speed'], wind_direction=wind.get('deg', 0),
+            clouds=data['clouds']['all'], visibility=data.get('visibility', 0),
+            rain_1h=data.get('rain', {}).get('1h', 0), snow_1h=data.get('snow', {}).get('1h', 0))
+
     def parse_forecast_data(self, data):
         """Parse forecast data"""
         forecasts = []
@@ -85,4 +336,83 @@ class OpenWeatherMapClient:
                 'snow_3h': item.get('snow', {}).get('3h', 0)
             }
             forecasts.append(forecast)
-        return forecasts
\ No newline at end of file
+        return forecasts
+
+    # Labels seen so far per categorical forecast column, shared by every client
+    _category_lock = threading.Lock()
+    _category_codes = {'main': {}, 'description': {}}
+    _category_dtypes = {'main': pd.CategoricalDtype([]), 'description': pd.CategoricalDtype([])}
+
+    @classmethod
+    def _categorical(cls, name, values):
+        """Encode strings against the column's shared labels, reusing its dtype"""
+        with cls._category_lock:
+            codes = cls._category_codes[name]
+            encoded = [codes.get(v, -1) for v in values]
+            if -1 in encoded:
+                for value in values:
+                    codes.setdefault(value, len(codes))
+                cls._category_dtypes[name] = pd.CategoricalDtype(list(codes))
+                encoded = [codes[v] for v in values]
+            dtype = cls._category_dtypes[name]
+        encoded = np.array(encoded, dtype=np.int8 if len(dtype.categories) < 128 else np.int32)
+        return pd.Categorical.from_codes(encoded, dtype=dtype, validate=False)
+
+    @staticmethod
+    def _local_datetimes(dt):
+        """Epoch seconds to naive local datetime64, matching datetime.fromtimestamp"""
+        if len(dt) == 0:
+            return dt.astype('datetime64[ns]')
+        first = time.localtime(int(dt[0])).tm_gmtoff
+        last = time.localtime(int(dt[-1])).tm_gmtoff
+        if first == last:
+            offsets = first
+        else:
+            offsets = np.array([time.localtime(int(t)).tm_gmtoff for t in dt], dtype=np.int64)
+        return (dt + offsets).astype('datetime64[s]').astype('datetime64[ns]')
+
+    def parse_forecast_columns(self, data):
+        """Parse forecast data straight into typed column arrays
+
+        Returns a dict of equal-length columns that pd.DataFrame accepts
+        without further conversion: int64 epoch seconds, float32 measures,
+        categoricals for main/description and a local date_time column.
+        Parsing alone is a little slower than parse_forecast_data (building
+        typed arrays costs more than plain dicts); the saving is in the
+        DataFrame conversions downstream, see benchmarks/bench_forecast_parse.py.
+        """
+        items = data['list']
+        dts = []
+        measures = []
+        mains = []
+        descriptions = []
+        # One pass over the slots, measures flattened slot-major into a single list
+        extend = measures.extend
+        for item in items:
+            main = item['main']
+            wind = item['wind']
+            weather = item['weather'][0]
+            dts.append(item['dt'])
+            extend((
+                main['temp'], main['feels_like'], main['temp_min'], main['temp_max'],
+                main['pressure'], main['humidity'], wind['speed'], wind.get('deg', 0),
+                item['clouds']['all'], item.get('pop', 0),
+                item.get('rain', {}).get('3h', 0), item.get('snow', {}).get('3h', 0)
+            ))
+            mains.append(weather['main'])
+            descriptions.append(weather['description'])
+
+        dt = np.array(dts, dtype=np.int64)
+        columns = {
+            'city': np.full(len(dts), data['city']['name'], dtype=object),
+            'dt': dt,
+            'date_time': self._local_datetimes(dt),
+            'main': self._categorical('main', mains),
+            'description': self._categorical('description', descriptions),
+        }
+        # One contiguous float32 row per measure
+        values = np.fromiter(measures, dtype=np.float32, count=len(measures))
+        values = values.reshape(len(dts), len(FORECAST_MEASURES)).T.copy()
+        for i, name in enumerate(FORECAST_MEASURES):
+            columns[name] = values[i]
+        return columns
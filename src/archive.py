@@ -0,0 +1,75 @@
+import os
+import re
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+
+ARCHIVE_FILE = re.compile(r'^summaries-(\d{4})-(\d{2})\.db$')
+
+def add_months(month, count):
+    """First day of the month `count` months after `month` (negative for before)"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+class SummaryArchive:
+    """Closed months of daily summaries, one compacted SQLite file per month.
+
+    Each file holds the same table as the hot database, so rows read back
+    as the same ORM class or Core columns. The directory is listed on
+    every lookup, which keeps processes sharing an archive in step.
+    """
+
+    def __init__(self, directory, table):
+        self.directory = directory
+        self.table = table
+        self.engines = {}
+
+    def path(self, month):
+        return os.path.join(self.directory, f"summaries-{month:%Y-%m}.db")
+
+    def months(self, start_date=None, end_date=None):
+        """First days of the archived months overlapping [start_date, end_date], oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        months = []
+        for name in names:
+            match = ARCHIVE_FILE.match(name)
+            if not match:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if start_date is not None and add_months(month, 1) <= start_date:
+                continue
+            if end_date is not None and month > end_date:
+                continue
+            months.append(month)
+        return sorted(months)
+
+    def engine(self, month):
+        if month not in self.engines:
+            os.makedirs(self.directory, exist_ok=True)
+            engine = create_engine(f"sqlite:///{self.path(month)}")
+            self.table.create(engine, checkfirst=True)
+            self.engines[month] = engine
+        return self.engines[month]
+
+    def write(self, month, rows):
+        """Upsert summary row dicts into a month's file, then compact the file"""
+        engine = self.engine(month)
+        statement = sqlite.insert(self.table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['city', 'date'],
+            set_={name: statement.excluded[name] for name in rows[0]
+                  if name not in ('city', 'date')}
+        )
+        with engine.begin() as conn:
+            conn.execute(statement, rows)
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('VACUUM')
+
+    def dispose(self):
+        for engine in self.engines.values():
+            engine.dispose()
+        self.engines = {}
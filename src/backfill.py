@@ -0,0 +1,367 @@
+import glob
+import gzip
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from .config import (BACKFILL_CHECKPOINT_DIR, BACKFILL_CHUNK_SIZE, BACKFILL_WRITE_BATCH,
+                     HISTORY_WINDOW_DAYS)
+from .aggregator import compass_direction, dominant_values
+
+MEASURE_COLUMNS = ['temp', 'humidity', 'pressure', 'wind_speed', 'wind_direction',
+                   'clouds', 'visibility', 'rain_1h', 'snow_1h']
+OBSERVATION_COLUMNS = ['city', 'dt', 'main', 'description'] + MEASURE_COLUMNS
+ARCHIVE_PATTERNS = ['*.jsonl', '*.jsonl.gz', '*.json', '*.csv', '*.csv.gz']
+
+# How each partial aggregate column combines across chunks
+PARTIAL_AGGREGATES = {
+    'n': ('temp', 'size', 'sum'),
+    'temp_sum': ('temp', 'sum', 'sum'),
+    'temp_min': ('temp', 'min', 'min'),
+    'temp_max': ('temp', 'max', 'max'),
+    'humidity_sum': ('humidity', 'sum', 'sum'),
+    'pressure_sum': ('pressure', 'sum', 'sum'),
+    'wind_speed_sum': ('wind_speed', 'sum', 'sum'),
+    'wind_speed_max': ('wind_speed', 'max', 'max'),
+    'wind_sin_sum': ('wind_sin', 'sum', 'sum'),
+    'wind_cos_sum': ('wind_cos', 'sum', 'sum'),
+    'clouds_sum': ('clouds', 'sum', 'sum'),
+    'visibility_sum': ('visibility', 'sum', 'sum'),
+    'rain_sum': ('rain_1h', 'sum', 'sum'),
+    'snow_sum': ('snow_1h', 'sum', 'sum'),
+}
+
+class DailySummaryAccumulator:
+    """Mergeable per-(city, date) partial aggregates for streamed observations"""
+
+    def __init__(self):
+        self.partials = None
+        self.main_counts = None
+        self.description_counts = None
+
+    def __len__(self):
+        return 0 if self.partials is None else len(self.partials)
+
+    def add(self, observations):
+        """Fold a chunk of observation rows into the running aggregates"""
+        if observations.empty:
+            return
+        df = observations
+        radians = np.radians(df['wind_direction'].to_numpy(dtype='float64'))
+        df = df.assign(date=df['dt'].to_numpy(dtype='int64').astype('datetime64[s]')
+                       .astype('datetime64[D]'),
+                       wind_sin=np.sin(radians), wind_cos=np.cos(radians))
+
+        grouped = df.groupby(['city', 'date'], sort=False)
+        part = grouped.agg(**{name: (col, how) for name, (col, how, _) in PARTIAL_AGGREGATES.items()})
+        mains = df.groupby(['city', 'date', 'main'], sort=False).size()
+        descriptions = df.groupby(['city', 'date', 'description'], sort=False).size()
+
+        merge = {name: how for name, (_, _, how) in PARTIAL_AGGREGATES.items()}
+        self.partials = self._combine(self.partials, part, lambda g: g.agg(merge))
+        self.main_counts = self._combine(self.main_counts, mains, lambda g: g.sum())
+        self.description_counts = self._combine(self.description_counts, descriptions,
+                                                lambda g: g.sum())
+
+    @staticmethod
+    def _combine(current, new, reduce):
+        if current is None:
+            return new
+        combined = pd.concat([current, new])
+        return reduce(combined.groupby(level=list(range(combined.index.nlevels)), sort=False))
+
+    def finalize(self):
+        """Turn the aggregates into (city, summary) pairs and reset"""
+        if self.partials is None:
+            return []
+
+        p = self.partials
+        n = p['n']
+        result = pd.DataFrame({
+            'avg_temp': p['temp_sum'] / n,
+            'max_temp': p['temp_max'],
+            'min_temp': p['temp_min'],
+            'avg_humidity': p['humidity_sum'] / n,
+            'avg_pressure': p['pressure_sum'] / n,
+            'avg_wind_speed': p['wind_speed_sum'] / n,
+            'max_wind_speed': p['wind_speed_max'],
+            'dominant_wind_direction': compass_direction(p['wind_sin_sum'].to_numpy(),
+                                                         p['wind_cos_sum'].to_numpy()),
+            'total_rain': p['rain_sum'],
+            'total_snow': p['snow_sum'],
+            'avg_clouds': p['clouds_sum'] / n,
+            'avg_visibility': p['visibility_sum'] / n,
+        }, index=p.index)
+        result['dominant_weather'] = dominant_values(self.main_counts, 'main')
+        result['detailed_description'] = dominant_values(self.description_counts, 'description')
+        result = result.fillna({'dominant_weather': 'Unknown', 'detailed_description': 'Unknown'})
+
+        summaries = []
+        for (city, day), row in zip(result.index, result.to_dict('records')):
+            row['date'] = pd.Timestamp(day).date()
+            for key, value in row.items():
+                if isinstance(value, np.floating):
+                    row[key] = float(value)
+            summaries.append((city, row))
+
+        self.partials = self.main_counts = self.description_counts = None
+        return summaries
+
+    def save(self, directory):
+        for name in ('partials', 'main_counts', 'description_counts'):
+            path = os.path.join(directory, f"{name}.pkl")
+            value = getattr(self, name)
+            if value is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            value.to_pickle(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+
+    def load(self, directory):
+        for name in ('partials', 'main_counts', 'description_counts'):
+            path = os.path.join(directory, f"{name}.pkl")
+            setattr(self, name, pd.read_pickle(path) if os.path.exists(path) else None)
+
+def normalize_observations(df):
+    """Coerce an observation chunk to the columns and types the accumulator expects"""
+    for column in OBSERVATION_COLUMNS:
+        if column not in df.columns:
+            df[column] = 0 if column in MEASURE_COLUMNS else 'Unknown'
+    df = df[OBSERVATION_COLUMNS].copy()
+    for column in MEASURE_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0)
+    df['dt'] = pd.to_numeric(df['dt'], errors='coerce')
+    df = df.dropna(subset=['dt'])
+    df['dt'] = df['dt'].astype('int64')
+    df['main'] = df['main'].astype(str).str.strip()
+    return df
+
+def expand_archive_paths(paths):
+    """Expand directories into the archive files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in ARCHIVE_PATTERNS:
+                files.extend(glob.glob(os.path.join(path, '**', pattern), recursive=True))
+        else:
+            files.append(path)
+    return sorted(set(files))
+
+def iter_archive_chunks(path, parse_weather_data, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Stream an archive file as DataFrame chunks
+
+    CSV files hold parse_weather_data columns. JSON Lines files hold either
+    raw /weather payloads or parse_weather_data dicts, one per line.
+    """
+    if path.endswith(('.csv', '.csv.gz')):
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield normalize_observations(chunk)
+        return
+
+    opener = gzip.open if path.endswith('.gz') else open
+    rows = []
+    with opener(path, 'rt') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record.get('main'), dict):
+                record = parse_weather_data(record)
+            rows.append(record)
+            if len(rows) >= chunk_size:
+                yield normalize_observations(pd.DataFrame(rows))
+                rows = []
+    if rows:
+        yield normalize_observations(pd.DataFrame(rows))
+
+class BackfillJob:
+    """Resumable bulk ingestion of historical observations into daily summaries
+
+    Work is split into units (archive files, or city/time windows of the
+    history endpoint). Observations are aggregated chunk by chunk and the
+    resulting summaries are written through save_daily_summaries in
+    batches. After every unit the completed units and any unwritten
+    aggregates are checkpointed, so an interrupted run resumes where it
+    stopped.
+
+    A unit that fails is recorded in the checkpoint with its error and
+    the run carries on with the others. Failed units are retried on the
+    next run unless `skip_failed` is set, which leaves them out for good.
+    Archive days can span files, so archive summaries are only written
+    once no file is left failed.
+    """
+
+    def __init__(self, db_manager, start_date, end_date, cities=None,
+                 checkpoint_dir=BACKFILL_CHECKPOINT_DIR, write_batch=BACKFILL_WRITE_BATCH,
+                 skip_failed=False):
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        self.db_manager = db_manager
+        self.start_date = start_date
+        self.end_date = end_date
+        self.cities = set(cities) if cities else None
+        self.checkpoint_dir = checkpoint_dir
+        self.write_batch = write_batch
+        self.accumulator = DailySummaryAccumulator()
+        self.skip_failed = skip_failed
+        self.completed = set()
+        self.failed = {}  # unit -> error message
+        self.stats = {'units': 0, 'observations': 0, 'summaries': 0, 'failed': 0}
+
+        # Observations are bucketed by UTC day, like WeatherDataProcessor
+        self._start_ts = datetime.combine(start_date, datetime.min.time(), timezone.utc).timestamp()
+        self._end_ts = datetime.combine(end_date + timedelta(days=1), datetime.min.time(),
+                                        timezone.utc).timestamp()
+
+    def _fingerprint(self, source):
+        return {
+            'start': self.start_date.isoformat(),
+            'end': self.end_date.isoformat(),
+            'cities': sorted(self.cities) if self.cities else None,
+            'source': source,
+        }
+
+    def _state_path(self):
+        return os.path.join(self.checkpoint_dir, 'state.json')
+
+    def _load_checkpoint(self, fingerprint):
+        path = self._state_path()
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('fingerprint') != fingerprint:
+            print("Existing backfill checkpoint is for a different run, starting over")
+            return
+        self.completed = set(state.get('completed', []))
+        self.failed = dict(state.get('failed', {}))
+        self.accumulator.load(self.checkpoint_dir)
+        print(f"Resuming backfill: {len(self.completed)} units already done, "
+              f"{len(self.failed)} failed")
+
+    def _save_checkpoint(self, fingerprint, finished=False):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self.accumulator.save(self.checkpoint_dir)
+        state = {'fingerprint': fingerprint, 'completed': sorted(self.completed),
+                 'failed': self.failed, 'finished': finished}
+        tmp_path = f"{self._state_path()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path())
+
+    def _filter(self, df):
+        mask = (df['dt'] >= self._start_ts) & (df['dt'] < self._end_ts)
+        if self.cities is not None:
+            mask &= df['city'].isin(self.cities)
+        return df[mask]
+
+    def flush(self):
+        """Write all aggregated summaries in batched transactions"""
+        summaries = self.accumulator.finalize()
+        for i in range(0, len(summaries), self.write_batch):
+            self.db_manager.save_daily_summaries(summaries[i:i + self.write_batch])
+        self.stats['summaries'] += len(summaries)
+        if summaries:
+            print(f"✓ Wrote {len(summaries)} daily summaries")
+
+    @staticmethod
+    def _load_each(units, load_unit):
+        """(unit, chunks, error) per unit, like ConcurrentFetcher.collect"""
+        for unit in units:
+            try:
+                yield unit, load_unit(unit), None
+            except Exception as e:
+                yield unit, None, e
+
+    def _run(self, units, load_unit, fingerprint, days_complete_per_unit, fetcher=None):
+        self._load_checkpoint(fingerprint)
+        skipped = set(self.failed) if self.skip_failed else set()
+        todo = [unit for unit in units if unit not in self.completed and unit not in skipped]
+        print(f"Backfilling {len(todo)} of {len(units)} units "
+              f"from {self.start_date} to {self.end_date}")
+        # The aggregates on disk are what a failed unit is rolled back to
+        self._save_checkpoint(fingerprint)
+
+        if fetcher is not None:
+            results = fetcher.collect(fetcher.submit_all(load_unit, todo))
+        else:
+            results = self._load_each(todo, load_unit)
+
+        for unit, chunks, error in results:
+            try:
+                if error is not None:
+                    raise error
+                observations = 0
+                for chunk in chunks:
+                    chunk = self._filter(chunk)
+                    observations += len(chunk)
+                    self.accumulator.add(chunk)
+            except Exception as e:
+                # Drop anything the unit added and carry on with the rest
+                print(f"Error backfilling {unit}: {str(e)}")
+                self.failed[unit] = str(e)
+                self.accumulator.load(self.checkpoint_dir)
+                self._save_checkpoint(fingerprint)
+                continue
+            self.failed.pop(unit, None)
+            self.completed.add(unit)
+            self.stats['units'] += 1
+            self.stats['observations'] += observations
+            # A day can only be written once no later unit can add to it
+            if days_complete_per_unit and len(self.accumulator) >= self.write_batch:
+                self.flush()
+            self._save_checkpoint(fingerprint)
+
+        failed = [unit for unit in units if unit in self.failed and unit not in skipped]
+        self.stats['failed'] = len(failed)
+        if failed and not days_complete_per_unit:
+            # Days may continue in a failed file, so their summaries are held back
+            self._save_checkpoint(fingerprint)
+        else:
+            self.flush()
+            self._save_checkpoint(fingerprint, finished=not failed)
+        if failed:
+            print(f"✗ {len(failed)} units failed: {', '.join(failed[:10])}"
+                  f"{' ...' if len(failed) > 10 else ''}")
+        return self.stats
+
+    def run_archive(self, paths, parse_weather_data):
+        """Backfill from archived observation files"""
+        files = expand_archive_paths(paths)
+        fingerprint = self._fingerprint({'archive': files})
+
+        def load(path):
+            return iter_archive_chunks(path, parse_weather_data)
+
+        return self._run(files, load, fingerprint, days_complete_per_unit=False)
+
+    def history_units(self, cities):
+        """(city, window start) units covering the date range in whole days"""
+        units = []
+        for city in cities:
+            day = self.start_date
+            while day <= self.end_date:
+                units.append(f"{city}|{day.isoformat()}")
+                day += timedelta(days=HISTORY_WINDOW_DAYS)
+        return units
+
+    def run_history(self, api_client, cities, fetcher=None):
+        """Backfill from the history endpoint, fetching windows concurrently"""
+        cities = [c for c in cities if self.cities is None or c in self.cities]
+        units = self.history_units(cities)
+        fingerprint = self._fingerprint('history')
+
+        def load(unit):
+            city, day = unit.split('|')
+            start = datetime.combine(datetime.fromisoformat(day).date(), datetime.min.time(),
+                                     timezone.utc)
+            end = min(start + timedelta(days=HISTORY_WINDOW_DAYS),
+                      datetime.fromtimestamp(self._end_ts, timezone.utc))
+            data = api_client.get_history_data(city, start.timestamp(), end.timestamp() - 1)
+            rows = api_client.parse_history_data(city, data)
+            return [normalize_observations(pd.DataFrame(rows))] if rows else []
+
+        return self._run(units, load, fingerprint, days_complete_per_unit=True, fetcher=fetcher)
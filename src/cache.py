@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+from .config import RESPONSE_CACHE_PATH, CACHE_TTLS, FORECAST_CADENCE
+
+class ResponseCache:
+    """TTL cache for API responses, persisted to a JSON file on disk.
+
+    Entries are keyed by endpoint and query parameters (minus the API key).
+    Forecast entries expire at the next provider update boundary, since the
+    5 day / 3 hour forecast only changes on that cadence. Expired entries
+    keep their ETag/Last-Modified validators so they can be revalidated with
+    a conditional request instead of being downloaded again.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttls=None, clock=time.time):
+        self.path = path
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.clock = clock
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_key(endpoint, params):
+        query = sorted((k, str(v)) for k, v in params.items() if k != 'appid')
+        return f"{endpoint}?{urlencode(query)}"
+
+    def expiry(self, endpoint, now):
+        """Absolute expiry time for a response fetched at `now`"""
+        expires_at = now + self.ttls.get(endpoint, 0)
+        if endpoint == 'forecast' and FORECAST_CADENCE:
+            next_update = (int(now) // FORECAST_CADENCE + 1) * FORECAST_CADENCE
+            expires_at = min(expires_at, next_update)
+        return expires_at
+
+    def get(self, endpoint, params):
+        """Return (data, entry): data is set only for a fresh entry, entry may be stale"""
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.clock() < entry['expires_at']:
+                self.stats['hits'] += 1
+                return entry['data'], entry
+            self.stats['misses'] += 1
+            return None, entry
+
+    def validators(self, entry):
+        """Conditional request headers for a stale entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, endpoint, params, data, headers=None):
+        """Store a fresh response"""
+        headers = headers or {}
+        now = self.clock()
+        entry = {
+            'data': data,
+            'fetched_at': now,
+            'expires_at': self.expiry(endpoint, now),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        with self._lock:
+            self.entries[self.make_key(endpoint, params)] = entry
+            self._dirty = True
+
+    def revalidate(self, endpoint, params):
+        """Extend a stale entry after a 304 Not Modified response"""
+        now = self.clock()
+        with self._lock:
+            entry = self.entries.get(self.make_key(endpoint, params))
+            if entry is None:
+                return None
+            entry['fetched_at'] = now
+            entry['expires_at'] = self.expiry(endpoint, now)
+            self.stats['revalidated'] += 1
+            self._dirty = True
+            return entry['data']
+
+    def load(self):
+        """Load persisted entries, ignoring a missing or unreadable file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable response cache {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write entries to disk if anything changed since the last save"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self.entries)
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
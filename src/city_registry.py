@@ -0,0 +1,88 @@
+import csv
+import json
+import os
+import zlib
+from .config import CITIES, CITY_REGISTRY_PATH, DEFAULT_COUNTRY, DEFAULT_POLLING_TIER
+
+class City:
+    """A monitored location from the city registry"""
+    __slots__ = ('name', 'city_id', 'lat', 'lon', 'country', 'tier')
+
+    def __init__(self, name, city_id=None, lat=None, lon=None, country=DEFAULT_COUNTRY,
+                 tier=DEFAULT_POLLING_TIER):
+        self.name = name
+        self.city_id = city_id
+        self.lat = lat
+        self.lon = lon
+        self.country = country or DEFAULT_COUNTRY
+        self.tier = tier or DEFAULT_POLLING_TIER
+
+    @classmethod
+    def from_record(cls, record):
+        """Build a City from a CSV row or JSON object"""
+        def number(key, cast):
+            value = record.get(key)
+            return cast(value) if value not in (None, '') else None
+
+        return cls(
+            name=record['name'].strip(),
+            city_id=number('id', int),
+            lat=number('lat', float),
+            lon=number('lon', float),
+            country=(record.get('country') or '').strip(),
+            tier=(record.get('tier') or '').strip(),
+        )
+
+    def __repr__(self):
+        return f"City({self.name!r}, id={self.city_id}, country={self.country!r}, tier={self.tier!r})"
+
+def shard_for(name, num_shards):
+    """Stable shard index for a city name (independent of PYTHONHASHSEED)"""
+    return zlib.crc32(name.lower().encode()) % num_shards
+
+class CityRegistry:
+    """Ordered collection of monitored cities loaded from CSV or JSON"""
+
+    def __init__(self, cities):
+        self.cities = list(cities)
+        self._by_name = {city.name: city for city in self.cities}
+        if len(self._by_name) != len(self.cities):
+            raise ValueError("City registry contains duplicate city names")
+
+    @classmethod
+    def load(cls, path):
+        """Load a registry file; the format is chosen by extension"""
+        if path.lower().endswith('.csv'):
+            with open(path, newline='') as f:
+                records = list(csv.DictReader(f))
+        else:
+            with open(path) as f:
+                records = json.load(f)
+        return cls(City.from_record(record) for record in records)
+
+    @classmethod
+    def from_names(cls, names):
+        return cls(City(name) for name in names)
+
+    def __len__(self):
+        return len(self.cities)
+
+    def __iter__(self):
+        return iter(self.cities)
+
+    def get(self, name):
+        return self._by_name.get(name)
+
+    def names(self):
+        return [city.name for city in self.cities]
+
+    def shard(self, index, num_shards):
+        """The subset of cities owned by shard `index` of `num_shards`"""
+        return CityRegistry(c for c in self.cities if shard_for(c.name, num_shards) == index)
+
+def load_city_registry(path=None):
+    """Load the configured registry, falling back to the CITIES list"""
+    path = path or CITY_REGISTRY_PATH
+    if path and os.path.exists(path):
+        return CityRegistry.load(path)
+    return CityRegistry.from_names(CITIES)
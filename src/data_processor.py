@@ -1,204 +1,256 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from .config import TEMPERATURE_UNIT
+from .config import TEMPERATURE_UNIT, OBSERVATION_BUFFER_CAPACITY, RETENTION_DAYS, ROLLUP_TIERS
+from .ring_buffer import ObservationBuffer, RecentDataView
+from .observation import Observation
+from .forecast_rules import ForecastRuleEngine
+from .aggregator import PeriodAggregate, dominant_values, utc_date, period_start
+
+# Forecast summary column -> (forecast column, aggregation)
+FORECAST_SUMMARY_AGGREGATES = {
+    'avg_temp': ('temp', 'mean'),
+    'max_temp': ('temp', 'max'),
+    'min_temp': ('temp', 'min'),
+    'avg_humidity': ('humidity', 'mean'),
+    'avg_wind_speed': ('wind_speed', 'mean'),
+    'precipitation_probability': ('pop', 'max'),
+    'total_rain': ('rain_3h', 'sum'),
+    'total_snow': ('snow_3h', 'sum'),
+}
+FORECAST_SUMMARY_INPUTS = ['temp', 'humidity', 'wind_speed', 'pop', 'rain_3h', 'snow_3h']
 
 class WeatherDataProcessor:
     def __init__(self):
         self.current_data = {}
+        self.daily_aggregates = {}  # city -> {date: PeriodAggregate}
+        self.rollups = {tier: {} for tier in ROLLUP_TIERS}  # tier -> city -> {start: PeriodAggregate}
+        self.dirty_rollups = {tier: set() for tier in ROLLUP_TIERS}  # (city, start) not yet saved
         self.forecast_data = {}
+        self.alert_rules = ForecastRuleEngine.from_config()
         
     def add_weather_data(self, weather_data):
-        """Add new weather data for a city"""
+        """Add new weather data for a city
+
+        Readings no newer than the city's last one, e.g. a cached payload
+        fetched again, are skipped so they are not aggregated twice.
+        Returns whether the reading was added.
+        """
         try:
             city = weather_data['city']
             if city not in self.current_data:
-                self.current_data[city] = pd.DataFrame()
-            
-            # Create a copy of the data to avoid modifying the original
-            data_copy = weather_data.copy()
-            
-            # Handle special weather conditions
-            if isinstance(data_copy.get('main'), str):
-                data_copy['main'] = data_copy['main'].strip()
-            
-            # Convert to DataFrame and add date
-            df = pd.DataFrame([data_copy])
-            df['date'] = pd.to_datetime(df['dt'], unit='s').dt.date
+                self.current_data[city] = ObservationBuffer(OBSERVATION_BUFFER_CAPACITY)
+            buffer = self.current_data[city]
+
+            last_dt = buffer.last_dt
+            if last_dt is not None and weather_data['dt'] <= last_dt:
+                print(f"Skipping weather data for {city}: reading at {weather_data['dt']} "
+                      f"is not newer than {last_dt}")
+                return False
             
-            # Ensure all numeric columns have valid values
-            numeric_columns = ['temp', 'feels_like', 'humidity', 'pressure', 
-                             'wind_speed', 'clouds', 'visibility', 'rain_1h', 'snow_1h']
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            # Slotted record with interned strings and coerced measures;
+            # parse_weather_record output is used as is
+            if not isinstance(weather_data, Observation):
+                weather_data = Observation.from_dict(weather_data)
             
-            # Concatenate with existing data
-            self.current_data[city] = pd.concat([self.current_data[city], df], 
-                                              ignore_index=True)
+            # Append in place; no per-observation DataFrame or concat
+            buffer.append(weather_data)
+
+            # Keep the day's summary and every rollup tier current as readings arrive
+            self._aggregate(self.daily_aggregates, city, utc_date(weather_data.dt), weather_data)
+            for tier, seconds in ROLLUP_TIERS.items():
+                start = period_start(weather_data.dt, seconds)
+                self._aggregate(self.rollups[tier], city, start, weather_data)
+                self.dirty_rollups[tier].add((city, start))
             print(f"Successfully added weather data for {city}")
+            return True
             
         except Exception as e:
             print(f"Error adding weather data for {city}: {str(e)}")
             raise
 
+    @staticmethod
+    def _aggregate(store, city, period, observation):
+        periods = store.setdefault(city, {})
+        if period not in periods:
+            periods[period] = PeriodAggregate(period)
+        periods[period].add(observation)
+
+    def add_forecast_data(self, city, forecast_data):
+        """Store forecast data for a city
+
+        Accepts either the per-slot dicts from parse_forecast_data or the
+        column arrays from parse_forecast_columns.
+        """
+        try:
+            if isinstance(forecast_data, dict):
+                # Columnar input: derive the date columns before building the frame
+                columns = dict(forecast_data)
+                date_time = np.asarray(columns['date_time'], dtype='datetime64[ns]')
+                columns['datetime'] = date_time
+                columns['date'] = date_time.astype('datetime64[D]').astype(object)
+                self.forecast_data[city] = pd.DataFrame(columns)
+                return
+
+            df = pd.DataFrame(forecast_data)
+            if df.empty:
+                self.forecast_data[city] = df
+                return
+            df['datetime'] = pd.to_datetime(df['date_time'])
+            df['date'] = df['datetime'].dt.date
+            self.forecast_data[city] = df
+        except Exception as e:
+            print(f"Error adding forecast data for {city}: {str(e)}")
+            raise
+
+    def get_forecast_data(self, city):
+        """Get the stored forecast DataFrame for a city"""
+        return self.forecast_data.get(city, pd.DataFrame())
+
     def get_daily_summary(self, city, date):
         """Get daily summary for a specific city and date"""
-        if city not in self.current_data:
+        if city not in self.daily_aggregates:
             print(f"No data available for {city}")
             return None
-            
-        daily_data = self.current_data[city][self.current_data[city]['date'] == date]
-        if daily_data.empty:
+
+        # Observations are bucketed by UTC day as they arrive
+        aggregate = self.daily_aggregates[city].get(date)
+        if aggregate is None:
             print(f"No data available for {city} on {date}")
             return None
 
-        try:
-            # Calculate dominant weather condition
-            weather_mode = daily_data['main'].mode()
-            dominant_weather = weather_mode.iloc[0] if not weather_mode.empty else 'Unknown'
-            
-            # Calculate detailed description
-            desc_mode = daily_data['description'].mode()
-            detailed_description = desc_mode.iloc[0] if not desc_mode.empty else 'Unknown'
-            
-            summary = {
-                'date': date,
-                'avg_temp': float(daily_data['temp'].mean()),
-                'max_temp': float(daily_data['temp'].max()),
-                'min_temp': float(daily_data['temp'].min()),
-                'dominant_weather': dominant_weather,
-                'detailed_description': detailed_description,
-                'avg_humidity': float(daily_data['humidity'].mean()),
-                'avg_pressure': float(daily_data['pressure'].mean()),
-                'avg_wind_speed': float(daily_data['wind_speed'].mean()),
-                'max_wind_speed': float(daily_data['wind_speed'].max()),
-                'dominant_wind_direction': self._get_dominant_wind_direction(daily_data['wind_direction']),
-                'total_rain': float(daily_data.get('rain_1h', pd.Series([0])).sum()),
-                'total_snow': float(daily_data.get('snow_1h', pd.Series([0])).sum()),
-                'avg_clouds': float(daily_data['clouds'].mean()),
-                'avg_visibility': float(daily_data['visibility'].mean())
-            }
-            
-            print(f"Generated summary for {city} on {date}")
-            return summary
-            
-        except Exception as e:
-            print(f"Error creating summary for {city}: {str(e)}")
-            print(f"Data for {city}:")
-            print(daily_data)
-            return None
+        summary = aggregate.summary()
+        print(f"Generated summary for {city} on {date}")
+        return summary
         
+    def get_rollups(self, tier, city):
+        """In-memory rollup summaries of one tier for a city, oldest first"""
+        return [aggregate.summary() for aggregate in self.rollups[tier].get(city, {}).values()]
+
+    def take_dirty_rollups(self):
+        """{tier: [(city, summary)]} for periods updated since the last call"""
+        changed = {}
+        for tier, dirty in self.dirty_rollups.items():
+            periods = self.rollups[tier]
+            changed[tier] = [(city, periods[city][start].summary()) for city, start in dirty
+                             if start in periods.get(city, {})]
+            dirty.clear()
+        return changed
+
     def get_forecast_summary(self, city):
         """Get forecast summary for a city"""
-        if city not in self.forecast_data:
-            return None
-            
-        df = self.forecast_data[city]
-        if df.empty:
+        summaries = self.get_forecast_summaries([city])
+        if summaries is None or summaries.empty:
             return None
-            
+        return summaries.drop(columns='city').to_dict('records')
+
+    def _stack_forecasts(self, cities, measures):
+        """Every city's forecast slots as one flat DataFrame, ordered by city then time
+
+        Holds city, date_time, date (datetime64[D]), main and `measures`;
+        a measure a city lacks is filled with zeros.
+        """
+        cities = list(self.forecast_data) if cities is None else cities
+        frames = [(city, self.forecast_data[city]) for city in cities
+                  if city in self.forecast_data and not self.forecast_data[city].empty]
+        if not frames:
+            return pd.DataFrame()
+
+        date_time = np.concatenate([df['date_time'].to_numpy(dtype='datetime64[ns]')
+                                    for _, df in frames])
+        columns = {
+            'city': np.repeat([city for city, _ in frames], [len(df) for _, df in frames]),
+            'date_time': date_time,
+            'date': date_time.astype('datetime64[D]'),
+            'main': np.concatenate([df['main'].to_numpy(dtype=object) for _, df in frames]),
+        }
+        for name in measures:
+            columns[name] = np.concatenate([
+                df[name].to_numpy(dtype='float64') if name in df else np.zeros(len(df))
+                for _, df in frames])
+        return pd.DataFrame(columns)
+
+    def get_forecast_summaries(self, cities=None):
+        """Daily forecast summaries for many cities in one grouped pass
+
+        Returns a tidy DataFrame with one row per (city, date), or None on
+        error. The slots of every city are stacked into flat arrays and
+        aggregated together, with the dominant condition found by a
+        vectorized mode, so there is no per-city or per-day Python loop.
+        """
         try:
-            # Group by date for daily summaries
-            daily_groups = df.groupby('date')
-            
-            summaries = []
-            for date, group in daily_groups:
-                summary = {
-                    'date': date,
-                    'avg_temp': group['temp'].mean(),
-                    'max_temp': group['temp'].max(),
-                    'min_temp': group['temp'].min(),
-                    'dominant_weather': group['main'].mode().iloc[0],
-                    'avg_humidity': group['humidity'].mean(),
-                    'avg_wind_speed': group['wind_speed'].mean(),
-                    'precipitation_probability': group.get('pop', pd.Series([0])).max(),
-                    'total_rain': group.get('rain_3h', pd.Series([0])).sum(),
-                    'total_snow': group.get('snow_3h', pd.Series([0])).sum()
-                }
-                summaries.append(summary)
-                
+            df = self._stack_forecasts(cities, FORECAST_SUMMARY_INPUTS)
+            if df.empty:
+                return df
+
+            summaries = df.groupby(['city', 'date'], sort=True).agg(**FORECAST_SUMMARY_AGGREGATES)
+            counts = df.groupby(['city', 'date', 'main'], sort=False).size()
+            summaries.insert(3, 'dominant_weather', dominant_values(counts, 'main'))
+            summaries = summaries.reset_index()
+            summaries['date'] = summaries['date'].dt.date
             return summaries
-            
+
         except Exception as e:
-            print(f"Error creating forecast summary for {city}: {str(e)}")
+            print(f"Error creating forecast summaries: {str(e)}")
             return None
 
+    def get_forecast_alerts(self, cities=None):
+        """Alerts table for many cities from one evaluation of the alert rules"""
+        metrics = sorted({rule.metric for rule in self.alert_rules.rules})
+        return self.alert_rules.evaluate(self._stack_forecasts(cities, metrics))
+
     def get_weather_alerts(self, city):
         """Get weather alerts based on forecast data"""
-        if city not in self.forecast_data or self.forecast_data[city].empty:
-            return []
-            
-        alerts = []
-        forecast = self.forecast_data[city]
-        
         try:
-            # High temperature alert
-            high_temp_periods = forecast[forecast['temp'] > 35]
-            if not high_temp_periods.empty:
-                dates = high_temp_periods['datetime'].dt.date.unique()
-                alerts.append({
-                    'type': 'High Temperature',
-                    'description': f"Temperatures above 35°C expected on {', '.join(str(d) for d in dates)}"
-                })
-            
-            # Heavy rain alert
-            heavy_rain_periods = forecast[forecast['rain_3h'] > 10]
-            if not heavy_rain_periods.empty:
-                dates = heavy_rain_periods['datetime'].dt.date.unique()
-                alerts.append({
-                    'type': 'Heavy Rain',
-                    'description': f"Heavy rain expected on {', '.join(str(d) for d in dates)}"
-                })
-            
-            # Strong wind alert
-            strong_wind_periods = forecast[forecast['wind_speed'] > 20]
-            if not strong_wind_periods.empty:
-                dates = strong_wind_periods['datetime'].dt.date.unique()
-                alerts.append({
-                    'type': 'Strong Winds',
-                    'description': f"Strong winds expected on {', '.join(str(d) for d in dates)}"
-                })
-            
+            return self.alert_rules.messages(self.get_forecast_alerts([city]), city)
         except Exception as e:
             print(f"Error generating weather alerts for {city}: {str(e)}")
-        
-        return alerts
+            return []
 
-    def get_recent_data(self, hours=24):
-        """Get recent data for all cities"""
+    def get_recent_view(self, hours=24):
+        """Zero-copy view of every city's observations from the last `hours`"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_data = []
-        
-        for city, df in self.current_data.items():
-            if not df.empty:
-                recent = df[df['dt'] > cutoff_time.timestamp()].copy()
-                if not recent.empty:
-                    recent_data.append(recent)
-        
-        if not recent_data:
-            return pd.DataFrame()
-        
-        return pd.concat(recent_data, ignore_index=True)
+        return RecentDataView.since(self.current_data, cutoff_time.timestamp())
 
-    def _get_dominant_wind_direction(self, wind_degrees):
-        """Convert wind degrees to cardinal directions"""
-        try:
-            directions = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
-                         'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
-            
-            # Convert degrees to 16-point compass direction
-            val = int((wind_degrees.mean() / 22.5) + 0.5)
-            return directions[val % 16]
-        except Exception as e:
-            print(f"Error calculating wind direction: {str(e)}")
-            return 'N'
-
-    def clear_old_data(self, days=7):
-        """Remove data older than specified days"""
-        cutoff_time = datetime.now() - timedelta(days=days)
-        for city in self.current_data:
-            if not self.current_data[city].empty:
-                self.current_data[city] = self.current_data[city][
-                    self.current_data[city]['dt'] > cutoff_time.timestamp()
-                ]
\ No newline at end of file
+    def get_recent_data(self, hours=24):
+        """Get recent data for all cities as one DataFrame"""
+        recent = self.get_recent_view(hours).to_frame()
+        if not recent.empty:
+            recent['date'] = pd.to_datetime(recent['dt'], unit='s').dt.date
+        return recent
+
+    def clear_old_data(self, days=None):
+        """Drop expired day partitions and rollups, per RETENTION_DAYS
+
+        `days` overrides the raw retention. Whole days (and rollup
+        periods) are dropped at once, so a sweep costs O(expired partitions) rather
+        than a scan of every stored row. Ring buffer storage is
+        preallocated, so dropped observations free slots for reuse rather
+        than memory; `bytes_freed` counts the released aggregates only.
+        Returns what was dropped.
+        """
+        now = datetime.now().timestamp()
+        raw_days = RETENTION_DAYS['raw'] if days is None else days
+        raw_cutoff_ts = now - raw_days * 86400
+        raw_cutoff = utc_date(raw_cutoff_ts)
+        stats = {'rows': 0, 'aggregates': 0, 'bytes_freed': 0}
+
+        for buffer in self.current_data.values():
+            stats['rows'] += buffer.drop_days_before(int(raw_cutoff_ts) // 86400)
+
+        stores = [(self.daily_aggregates, raw_cutoff)]
+        stores += [(self.rollups[tier], period_start(now - RETENTION_DAYS[tier] * 86400, seconds))
+                   for tier, seconds in ROLLUP_TIERS.items()]
+        for store, cutoff in stores:
+            for periods in store.values():
+                # Periods are kept in arrival order, so expired ones lead
+                while periods:
+                    oldest = next(iter(periods))
+                    if oldest >= cutoff:
+                        break
+                    stats['aggregates'] += 1
+                    stats['bytes_freed'] += periods.pop(oldest).nbytes
+
+        print(f"Retention sweep reclaimed {stats['rows']} observation slots and dropped "
+              f"{stats['aggregates']} aggregates, freeing {stats['bytes_freed'] / 1024:.1f} KB")
+        return stats
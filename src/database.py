@@ -1,10 +1,26 @@
-from sqlalchemy import create_engine, Column, Integer, Float, String, Date, UniqueConstraint, Text
+import numpy as np
+import pandas as pd
+from sqlalchemy import (create_engine, event, func, select, Column, Integer, BigInteger, Float,
+                        String, Date, DateTime, UniqueConstraint, Text)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import datetime
-from .config import DATABASE_URL
+from sqlalchemy.orm import sessionmaker
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from .archive import SummaryArchive, add_months
+from .config import (DATABASE_URL, ROLLUP_TIERS, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+                     DB_POOL_RECYCLE, SQLITE_PRAGMAS, SUMMARY_CACHE_QUERIES, ARCHIVE_DIR,
+                     ARCHIVE_HOT_MONTHS)
 
 Base = declarative_base()
 
+# Dialects with a native INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
 class DailyWeatherSummary(Base):
     __tablename__ = 'daily_weather_summary'
 
@@ -29,110 +45,563 @@ class DailyWeatherSummary(Base):
 
     __table_args__ = (UniqueConstraint('city', 'date', name='_city_date_uc'),)
 
+class SummaryVersion(Base):
+    """One-row counter bumped by every daily summary write, from any process"""
+    __tablename__ = 'summary_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class WeatherObservation(Base):
+    """One current-weather reading as parsed from the API"""
+    __tablename__ = 'weather_observation'
+
+    city = Column(String(50), primary_key=True)
+    dt = Column(BigInteger, primary_key=True)  # Unix time of the reading
+    main = Column(String(50))
+    description = Column(String(100))
+    temp = Column(Float)
+    feels_like = Column(Float)
+    temp_min = Column(Float)
+    temp_max = Column(Float)
+    pressure = Column(Float)
+    humidity = Column(Float)
+    wind_speed = Column(Float)
+    wind_direction = Column(Float)
+    clouds = Column(Float)
+    visibility = Column(Float)
+    rain_1h = Column(Float, default=0.0)
+    snow_1h = Column(Float, default=0.0)
+
+# Low-cardinality summary columns returned as pandas categoricals by get_summary_frame
+SUMMARY_CATEGORY_COLUMNS = ('city', 'dominant_weather', 'wind_direction')
+
+def _column_array(column, values):
+    """Numpy array for one selected column, typed from its SQL type"""
+    if isinstance(column.type, Date):
+        return np.array(values, dtype='datetime64[D]')
+    if isinstance(column.type, Float):
+        return np.array(values, dtype=np.float64)  # NULL becomes NaN
+    if isinstance(column.type, Integer):
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=object)
+
+class RollupMixin:
+    """Columns shared by the rollup tier tables (one row per city and period)"""
+    id = Column(Integer, primary_key=True)
+    city = Column(String(50), nullable=False)
+    period_start = Column(DateTime, nullable=False)  # UTC
+    observations = Column(Integer)
+    avg_temp = Column(Float)
+    max_temp = Column(Float)
+    min_temp = Column(Float)
+    dominant_weather = Column(String(50))
+    avg_humidity = Column(Float)
+    avg_pressure = Column(Float)
+    avg_wind_speed = Column(Float)
+    max_wind_speed = Column(Float)
+    wind_direction = Column(String(10))
+    total_rain = Column(Float, default=0.0)
+    total_snow = Column(Float, default=0.0)
+    avg_clouds = Column(Float)
+    avg_visibility = Column(Float)
+    last_updated = Column(Float, default=lambda: datetime.now().timestamp())
+
+def _rollup_model(tier):
+    table = f"weather_rollup_{tier}"
+    return type(f"WeatherRollup{tier}", (RollupMixin, Base), {
+        '__tablename__': table,
+        '__table_args__': (UniqueConstraint('city', 'period_start', name=f'_{table}_uc'),),
+    })
+
+ROLLUP_MODELS = {tier: _rollup_model(tier) for tier in ROLLUP_TIERS}
+
+def rollup_tier_for(resolution):
+    """Coarsest rollup tier whose period fits within `resolution` seconds
+
+    Falls back to the finest tier when the resolution is finer than all.
+    """
+    fitting = [tier for tier, seconds in ROLLUP_TIERS.items() if seconds <= resolution]
+    if not fitting:
+        return min(ROLLUP_TIERS, key=ROLLUP_TIERS.get)
+    return max(fitting, key=ROLLUP_TIERS.get)
+
+def create_database_engine(database_url=DATABASE_URL):
+    """Engine with an explicit connection pool and, for SQLite, tuned pragmas
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                             pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE,
+                             pool_pre_ping=True)
+
+    if url.database in (None, '', ':memory:'):
+        engine = create_engine(url)
+    else:
+        engine = create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                               pool_timeout=DB_POOL_TIMEOUT)
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+def default_archive_dir(url):
+    """<database>.archive beside a SQLite database file; None for other databases"""
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return os.path.splitext(url.database)[0] + '.archive'
+
+class SummaryCache:
+    """Daily summary query results, refreshed row by row after writes
+
+    Each cached query keeps its rows by (city, date). A write marks that
+    row stale in every cached query covering it, and the next read
+    re-selects only the stale rows. Rows are immutable Core rows shared
+    between callers. Callers hold `lock` across the database
+    read and the cache update, so a write committed mid-read is still
+    marked stale afterwards.
+
+    Writes from other processes (backfill.py, other workers) cannot mark
+    rows stale, so callers also pass the database's summary version to
+    check() before every read; any version this process did not produce
+    itself empties the cache.
+    """
+
+    def __init__(self, max_queries=SUMMARY_CACHE_QUERIES):
+        self.lock = threading.RLock()
+        self.max_queries = max_queries
+        self.queries = OrderedDict()  # (city or None, start, end) -> (rows, stale keys)
+        self.latest = {}  # city -> most recent summary row
+        self.version = None  # summary_version the cached rows are current with
+        self.stats = {'hits': 0, 'refreshes': 0, 'misses': 0, 'cleared': 0}
+
+    def get(self, key):
+        entry = self.queries.get(key)
+        if entry is not None:
+            self.queries.move_to_end(key)
+        return entry
+
+    def put(self, key, rows):
+        self.queries[key] = (rows, set())
+        self.queries.move_to_end(key)
+        while len(self.queries) > self.max_queries:
+            self.queries.popitem(last=False)
+
+    def check(self, version):
+        """Drop every cached query if summaries were written elsewhere since the last check"""
+        if version != self.version:
+            if self.queries or self.latest:
+                self.stats['cleared'] += 1
+            self.queries.clear()
+            self.latest.clear()
+            self.version = version
+
+    def invalidate(self, keys, version=None):
+        """Mark (city, date) rows as changed by a write that produced `version`"""
+        with self.lock:
+            for city, day in keys:
+                self.latest.pop(city, None)
+                for (query_city, start, end), (_, stale) in self.queries.items():
+                    if start <= day <= end and query_city in (None, city):
+                        stale.add((city, day))
+            # Only if no other process wrote in between is the cache still current
+            if version is not None and self.version == version - 1:
+                self.version = version
+
 class DatabaseManager:
-    def __init__(self):
-        self.engine = create_engine(DATABASE_URL)
+    def __init__(self, database_url=DATABASE_URL, cache_summaries=True, archive_dir=ARCHIVE_DIR):
+        """`cache_summaries` keeps summary reads in memory, checked against other processes' writes"""
+        self.engine = create_database_engine(database_url)
+        self.Session = sessionmaker(bind=self.engine)
+        self.cache = SummaryCache() if cache_summaries else None
+        archive_dir = archive_dir or default_archive_dir(self.engine.url)
+        self.archive = SummaryArchive(archive_dir, DailyWeatherSummary.__table__) if archive_dir else None
         Base.metadata.create_all(self.engine)
+        self._create_version_row()
+
+    def _create_version_row(self):
+        table = SummaryVersion.__table__
+        try:
+            with self.engine.begin() as conn:
+                if conn.execute(select(table.c.id)).first() is None:
+                    conn.execute(table.insert().values(id=1, version=0))
+        except IntegrityError:
+            pass  # Created by another process in the meantime
+
+    def _summary_version(self):
+        with self.engine.connect() as conn:
+            return conn.execute(select(SummaryVersion.__table__.c.version)).scalar()
+
+    def _archive_engines(self, start_date, end_date):
+        """Engines of the archived months overlapping a date range"""
+        if self.archive is None:
+            return []
+        return [self.archive.engine(month) for month in self.archive.months(start_date, end_date)]
+
+    @staticmethod
+    def _summary_columns(summary):
+        """Map a summary dict onto DailyWeatherSummary columns"""
+        return {
+            'avg_temp': summary.get('avg_temp'),
+            'max_temp': summary.get('max_temp'),
+            'min_temp': summary.get('min_temp'),
+            'dominant_weather': summary.get('dominant_weather'),
+            'avg_humidity': summary.get('avg_humidity'),
+            'avg_pressure': summary.get('avg_pressure'),
+            'avg_wind_speed': summary.get('avg_wind_speed'),
+            'max_wind_speed': summary.get('max_wind_speed'),
+            'wind_direction': summary.get('dominant_wind_direction'),
+            'total_rain': summary.get('total_rain', 0.0),
+            'total_snow': summary.get('total_snow', 0.0),
+            'avg_clouds': summary.get('avg_clouds'),
+            'avg_visibility': summary.get('avg_visibility'),
+            'description': summary.get('detailed_description'),
+        }
+
+    def _upsert(self, session, model, keys, rows):
+        """INSERT ... ON CONFLICT (keys) DO UPDATE for many rows in one statement
+
+        Uses the SQLite/PostgreSQL native upsert so existing rows are not
+        read back first; other dialects fall back to select-then-write.
+        """
+        insert = UPSERT_INSERTS.get(self.engine.dialect.name)
+        if insert is None:
+            self._merge(session, model, keys, rows)
+            return
+        statement = insert(model)
+        updates = [name for name in rows[0] if name not in keys]
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: statement.excluded[name] for name in updates}
+        )
+        session.execute(statement, rows)
+
+    @staticmethod
+    def _merge(session, model, keys, rows):
+        filters = [getattr(model, key).in_({row[key] for row in rows}) for key in keys]
+        existing = {
+            tuple(getattr(row, key) for key in keys): row
+            for row in session.query(model).filter(*filters)
+        }
+        for values in rows:
+            row = existing.get(tuple(values[key] for key in keys))
+            if row is None:
+                session.add(model(**values))
+            else:
+                for name, value in values.items():
+                    setattr(row, name, value)
 
     def save_daily_summary(self, city, summary):
         """Save or update daily summary for a city"""
-        from sqlalchemy.orm import sessionmaker
-        Session = sessionmaker(bind=self.engine)
-        session = Session()
+        self.save_daily_summaries([(city, summary)])
+        print(f"Successfully saved/updated summary for {city} on {summary['date']}")
+        return True
+
+    def save_daily_summaries(self, batch):
+        """Save or update many (city, summary) pairs in a single transaction"""
+        session = self.Session()
 
         try:
-            # Check if record exists
-            existing = session.query(DailyWeatherSummary).filter_by(
-                city=city,
-                date=summary['date']
-            ).first()
+            # Later entries for the same key win, as with repeated single saves
+            pending = {(city, summary['date']): summary for city, summary in batch}
+            if not pending:
+                return 0
 
             current_time = datetime.now().timestamp()
-
-            if existing:
-                # Update existing record
-                for key, value in summary.items():
-                    if hasattr(existing, key) and key != 'date':
-                        setattr(existing, key, value)
-                existing.last_updated = current_time
-            else:
-                # Create new record
-                new_summary = DailyWeatherSummary(
-                    city=city,
-                    date=summary['date'],
-                    avg_temp=summary.get('avg_temp'),
-                    max_temp=summary.get('max_temp'),
-                    min_temp=summary.get('min_temp'),
-                    dominant_weather=summary.get('dominant_weather'),
-                    avg_humidity=summary.get('avg_humidity'),
-                    avg_pressure=summary.get('avg_pressure'),
-                    avg_wind_speed=summary.get('avg_wind_speed'),
-                    max_wind_speed=summary.get('max_wind_speed'),
-                    wind_direction=summary.get('dominant_wind_direction'),
-                    total_rain=summary.get('total_rain', 0.0),
-                    total_snow=summary.get('total_snow', 0.0),
-                    avg_clouds=summary.get('avg_clouds'),
-                    avg_visibility=summary.get('avg_visibility'),
-                    description=summary.get('detailed_description'),
-                    last_updated=current_time
-                )
-                session.add(new_summary)
+            rows = [dict(city=city, date=day, last_updated=current_time,
+                         **self._summary_columns(summary))
+                    for (city, day), summary in pending.items()]
+            self._upsert(session, DailyWeatherSummary, ['city', 'date'], rows)
+            # Lets summary caches in other processes see that this write happened
+            version_table = SummaryVersion.__table__
+            session.execute(version_table.update().values(version=version_table.c.version + 1))
+            version = session.execute(select(version_table.c.version)).scalar()
 
             session.commit()
-            print(f"Successfully saved/updated summary for {city} on {summary['date']}")
-            return True
+            if self.cache is not None:
+                self.cache.invalidate(pending, version)
+            return len(pending)
 
         except Exception as e:
             session.rollback()
-            print(f"Error saving summary for {city}: {str(e)}")
+            print(f"Error saving batch of {len(batch)} summaries: {str(e)}")
             raise
         finally:
             session.close()
 
-    def get_daily_summaries(self, start_date, end_date):
-        """Get daily summaries for all cities between dates"""
-        from sqlalchemy.orm import sessionmaker
-        Session = sessionmaker(bind=self.engine)
-        session = Session()
+    def save_observations(self, rows):
+        """Insert raw observation dicts in one executemany transaction
+
+        Readings already stored for the same (city, dt) are skipped, so a
+        batch can safely be written twice.
+        """
+        if not rows:
+            return 0
+        session = self.Session()
 
         try:
-            summaries = session.query(DailyWeatherSummary).filter(
-                DailyWeatherSummary.date.between(start_date, end_date)
-            ).order_by(
-                DailyWeatherSummary.date,
-                DailyWeatherSummary.city
-            ).all()
-            return summaries
+            statement = WeatherObservation.__table__.insert()
+            insert = UPSERT_INSERTS.get(self.engine.dialect.name)
+            if insert is not None:
+                statement = insert(WeatherObservation).on_conflict_do_nothing(
+                    index_elements=['city', 'dt'])
+            session.execute(statement, rows)
+            session.commit()
+            return len(rows)
+
+        except Exception:
+            session.rollback()
+            raise
         finally:
             session.close()
 
-    def get_city_summaries(self, city, start_date, end_date):
-        """Get daily summaries for a specific city"""
-        from sqlalchemy.orm import sessionmaker
-        Session = sessionmaker(bind=self.engine)
-        session = Session()
+    def get_observations(self, city, start, end):
+        """Raw readings for a city with start <= dt < end (Unix seconds)"""
+        session = self.Session()
 
         try:
-            summaries = session.query(DailyWeatherSummary).filter(
-                DailyWeatherSummary.city == city,
-                DailyWeatherSummary.date.between(start_date, end_date)
-            ).order_by(DailyWeatherSummary.date).all()
-            return summaries
+            return session.query(WeatherObservation).filter(
+                WeatherObservation.city == city,
+                WeatherObservation.dt >= start,
+                WeatherObservation.dt < end
+            ).order_by(WeatherObservation.dt).all()
         finally:
             session.close()
 
-    def get_latest_summary(self, city):
-        """Get the most recent summary for a city"""
-        from sqlalchemy.orm import sessionmaker
-        Session = sessionmaker(bind=self.engine)
-        session = Session()
+    def save_rollups(self, tier, batch):
+        """Save or update (city, summary) rollup pairs of one tier in a single transaction"""
+        session = self.Session()
+        model = ROLLUP_MODELS[tier]
+
+        try:
+            pending = {(city, summary['date']): summary for city, summary in batch}
+            if not pending:
+                return 0
+
+            current_time = datetime.now().timestamp()
+            rows = []
+            for (city, start), summary in pending.items():
+                columns = self._summary_columns(summary)
+                del columns['description']
+                rows.append(dict(city=city, period_start=start, last_updated=current_time,
+                                 observations=summary.get('observations'), **columns))
+            self._upsert(session, model, ['city', 'period_start'], rows)
+
+            session.commit()
+            return len(pending)
+
+        except Exception as e:
+            session.rollback()
+            print(f"Error saving {tier} rollups: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    def get_rollups(self, city, start, end, resolution):
+        """Rollup rows for a city between two datetimes at `resolution` seconds or coarser
+
+        Reads the coarsest tier that still meets the resolution, so a
+        year at daily resolution is a few hundred rows.
+        """
+        session = self.Session()
+        model = ROLLUP_MODELS[rollup_tier_for(resolution)]
 
         try:
-            summary = session.query(DailyWeatherSummary).filter(
-                DailyWeatherSummary.city == city
-            ).order_by(
-                DailyWeatherSummary.date.desc()
-            ).first()
-            return summary
+            return session.query(model).filter(
+                model.city == city,
+                model.period_start >= start,
+                model.period_start < end
+            ).order_by(model.period_start).all()
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    def _summaries(self, city, start_date, end_date):
+        """Summaries between dates, for one city or all, ordered by date then city"""
+        if self.cache is None:
+            rows = self._read_summaries(city, start_date, end_date)
+            return sorted(rows.values(), key=lambda row: (row.date, row.city))
+
+        with self.cache.lock:
+            self.cache.check(self._summary_version())
+            key = (city, start_date, end_date)
+            entry = self.cache.get(key)
+            if entry is None:
+                self.cache.stats['misses'] += 1
+                rows = self._read_summaries(city, start_date, end_date)
+                self.cache.put(key, rows)
+            else:
+                rows, stale = entry
+                if stale:
+                    # Only the rows written since the last read are selected again
+                    self.cache.stats['refreshes'] += 1
+                    rows.update(self._read_summaries(city, start_date, end_date, keys=stale))
+                    stale.clear()
+                else:
+                    self.cache.stats['hits'] += 1
+            return sorted(rows.values(), key=lambda row: (row.date, row.city))
+
+    def _read_summaries(self, city, start_date, end_date, keys=None):
+        """{(city, date): row} from the archived months in range, then the hot table
+
+        Rows come from a Core select, so no ORM objects are built; they
+        have the same attributes as DailyWeatherSummary. Hot rows replace
+        archived ones. With `keys`, only those (city, date) rows are read,
+        and only from the hot table where writes go.
+        """
+        engines = [self.engine]
+        if keys is None:
+            engines = self._archive_engines(start_date, end_date) + engines
+
+        table = DailyWeatherSummary.__table__
+        statement = select(table).where(table.c.date.between(start_date, end_date))
+        if city is not None:
+            statement = statement.where(table.c.city == city)
+        if keys is not None:
+            statement = statement.where(table.c.city.in_({c for c, _ in keys}),
+                                        table.c.date.in_({d for _, d in keys}))
+
+        rows = {}
+        for engine in engines:
+            with engine.connect() as conn:
+                for row in conn.execute(statement):
+                    if keys is None or (row.city, row.date) in keys:
+                        rows[(row.city, row.date)] = row
+        return rows
+
+    def get_summary_columns(self, start_date, end_date, columns=None, cities=None):
+        """Daily summaries between dates as {column: numpy array}, without ORM objects
+
+        `columns` projects the select onto those DailyWeatherSummary
+        columns (all by default) and `cities` restricts it to those cities.
+        Rows are ordered by date then city. Dates come back as
+        datetime64[D], floats as float64 with NULL as NaN, text as object.
+        With the summary cache on, the arrays are built from the cached
+        Core rows, so repeated dashboard reads skip the database and pick
+        up writes through the same row-level invalidation.
+        """
+        table = DailyWeatherSummary.__table__
+        names = list(columns) if columns else [column.name for column in table.columns]
+        if self.cache is not None:
+            cities = None if cities is None else set(cities)
+            city = next(iter(cities)) if cities is not None and len(cities) == 1 else None
+            summaries = [summary for summary in self._summaries(city, start_date, end_date)
+                         if cities is None or summary.city in cities]
+            return {name: _column_array(table.c[name], [getattr(summary, name) for summary in summaries])
+                    for name in names}
+
+        selected = names + [name for name in ('date', 'city') if name not in names]
+        statement = select(*[table.c[name] for name in selected]).where(
+            table.c.date.between(start_date, end_date)
+        ).order_by(table.c.date, table.c.city)
+        if cities is not None:
+            statement = statement.where(table.c.city.in_(list(cities)))
+
+        archives = self._archive_engines(start_date, end_date)
+        if not archives:
+            with self.engine.connect() as conn:
+                rows = conn.execute(statement).all()
+        else:
+            # Archived months first, so hot rows replace any archived copy
+            date_at, city_at = selected.index('date'), selected.index('city')
+            merged = {}
+            for engine in archives + [self.engine]:
+                with engine.connect() as conn:
+                    for row in conn.execute(statement):
+                        merged[(row[date_at], row[city_at])] = row
+            rows = [merged[key] for key in sorted(merged)]
+
+        values = list(zip(*rows)) or [()] * len(names)
+        return {name: _column_array(table.c[name], column) for name, column in zip(names, values)}
+
+    def get_summary_frame(self, start_date, end_date, columns=None, cities=None):
+        """get_summary_columns as a DataFrame, with categorical city and condition columns"""
+        frame = pd.DataFrame(self.get_summary_columns(start_date, end_date, columns, cities),
+                             copy=False)
+        for name in SUMMARY_CATEGORY_COLUMNS:
+            if name in frame:
+                frame[name] = frame[name].astype('category')
+        return frame
+
+    def get_daily_summaries(self, start_date, end_date):
+        """Get daily summaries for all cities between dates"""
+        return self._summaries(None, start_date, end_date)
+
+    def get_city_summaries(self, city, start_date, end_date):
+        """Get daily summaries for a specific city"""
+        return self._summaries(city, start_date, end_date)
+
+    def get_latest_summary(self, city):
+        """Get the most recent summary for a city"""
+        if self.cache is not None:
+            with self.cache.lock:
+                self.cache.check(self._summary_version())
+                if city in self.cache.latest:
+                    self.cache.stats['hits'] += 1
+                    return self.cache.latest[city]
+                self.cache.stats['misses'] += 1
+                summary = self._latest_summary(city)
+                if summary is not None:
+                    self.cache.latest[city] = summary
+                return summary
+        return self._latest_summary(city)
+
+    def _latest_summary(self, city):
+        # The hot table holds the newest months; fall back to the archive newest first
+        engines = [self.engine]
+        if self.archive is not None:
+            engines += [self.archive.engine(month) for month in reversed(self.archive.months())]
+
+        table = DailyWeatherSummary.__table__
+        statement = select(table).where(table.c.city == city).order_by(table.c.date.desc()).limit(1)
+        for engine in engines:
+            with engine.connect() as conn:
+                summary = conn.execute(statement).first()
+            if summary is not None:
+                return summary
+        return None
+
+    def archive_closed_months(self, keep_months=ARCHIVE_HOT_MONTHS, today=None, compact=True):
+        """Move daily summaries of old closed months into the monthly archive
+
+        The current month and the `keep_months` before it stay in the hot
+        table. Each month is written to its archive file before it is
+        deleted from the hot table, in one hot-table transaction, so an
+        interrupted run leaves at worst duplicate rows (the hot copy wins).
+        With `compact`, the hot database is vacuumed afterwards to return
+        the freed pages. Returns the archived months.
+        """
+        if self.archive is None:
+            return []
+        cutoff = add_months((today or date.today()).replace(day=1), -keep_months)
+        table = DailyWeatherSummary.__table__
+        columns = [column for column in table.columns if column.name != 'id']
+
+        with self.engine.connect() as conn:
+            oldest = conn.execute(select(func.min(table.c.date)).where(table.c.date < cutoff)).scalar()
+
+        archived = []
+        month = oldest.replace(day=1) if oldest is not None else cutoff
+        while month < cutoff:
+            in_month = (table.c.date >= month) & (table.c.date < add_months(month, 1))
+            with self.engine.begin() as conn:
+                rows = [dict(row._mapping) for row in conn.execute(select(*columns).where(in_month))]
+                if rows:
+                    self.archive.write(month, rows)
+                    conn.execute(table.delete().where(in_month))
+                    archived.append(month)
+            month = add_months(month, 1)
+
+        if archived and compact and self.engine.dialect.name == 'sqlite':
+            with self.engine.connect() as conn:
+                conn.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('VACUUM')
+        if archived:
+            print(f"Archived daily summaries for {len(archived)} months "
+                  f"({archived[0]:%Y-%m} to {archived[-1]:%Y-%m})")
+        return archived
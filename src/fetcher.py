@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from .config import FETCH_CONCURRENCY
+
+class ConcurrentFetcher:
+    """Run blocking API fetches for many cities on a bounded thread pool.
+
+    Fetches overlap, but results are always handed back in the order the
+    cities were submitted so downstream processing stays deterministic.
+    """
+
+    def __init__(self, max_workers=FETCH_CONCURRENCY):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='weather-fetch')
+
+    def submit_all(self, fetch, cities):
+        """Schedule fetch(city) for every city and return the pending futures"""
+        return [(city, self._executor.submit(fetch, city)) for city in cities]
+
+    def collect(self, pending):
+        """Yield (city, result, error) tuples in submission order"""
+        for city, future in pending:
+            try:
+                yield city, future.result(), None
+            except Exception as e:
+                yield city, None, e
+
+    def fetch_all(self, fetch, cities):
+        """Fetch data for all cities concurrently and return ordered results"""
+        return list(self.collect(self.submit_all(fetch, cities)))
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
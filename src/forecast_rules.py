@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from .api_client import FORECAST_MEASURES
+from .config import FORECAST_ALERT_RULES, FORECAST_ALERT_OVERRIDES
+
+COMPARATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+}
+ALERT_COLUMNS = ['city', 'type', 'date', 'start', 'slots', 'peak', 'threshold']
+
+class AlertRule:
+    """One forecast alert condition with optional per-city thresholds"""
+
+    def __init__(self, name, metric, comparator, threshold, window=1, message=None,
+                 overrides=None):
+        if comparator not in COMPARATORS:
+            raise ValueError(f"Unknown comparator {comparator!r} in rule {name!r}")
+        # A metric missing from the forecasts reads as zeros, so a typo would never fire
+        if metric not in FORECAST_MEASURES:
+            raise ValueError(f"Unknown metric {metric!r} in rule {name!r}; "
+                             f"expected one of {', '.join(FORECAST_MEASURES)}")
+        if window < 1:
+            raise ValueError(f"Rule {name!r} needs a window of at least one slot")
+        self.name = name
+        self.metric = metric
+        self.comparator = comparator
+        self.threshold = threshold
+        self.window = window
+        self.message = message or f"{name} expected on {{dates}}"
+        self.overrides = overrides or {}  # city -> threshold
+
+    @classmethod
+    def from_config(cls, rule, overrides=None):
+        """Build a rule from a FORECAST_ALERT_RULES entry and the override mapping"""
+        city_thresholds = {city: rules[rule['name']]['threshold']
+                           for city, rules in (overrides or {}).items()
+                           if rule['name'] in rules}
+        return cls(rule['name'], rule['metric'], rule['comparator'], rule['threshold'],
+                   rule.get('window', 1), rule.get('message'), city_thresholds)
+
+    def thresholds(self, cities):
+        """Threshold for each of `cities` (an array of unique labels)"""
+        return np.array([self.overrides.get(city, self.threshold) for city in cities],
+                        dtype='float64')
+
+    def describe(self, threshold, dates):
+        return self.message.format(threshold=f"{threshold:g}",
+                                   dates=', '.join(str(d) for d in dates))
+
+def sustained(mask, groups, window):
+    """Slots inside a run of at least `window` matching slots within one group
+
+    Vectorized: a run ends at i when the last `window` mask values sum to
+    `window` and slot i - window + 1 belongs to the same group.
+    """
+    if window == 1:
+        return mask
+    counts = np.concatenate([[0], np.cumsum(mask)])
+    ends = np.arange(window - 1, len(mask))
+    full = (counts[ends + 1] - counts[ends + 1 - window]) == window
+    full &= groups[ends] == groups[ends - window + 1]
+    ends = ends[full]
+    result = np.zeros(len(mask), dtype=bool)
+    for offset in range(window):
+        result[ends - offset] = True
+    return result
+
+class ForecastRuleEngine:
+    """Evaluates every alert rule over all cities' forecasts at once
+
+    Each rule compiles to one comparison over the stacked forecast arrays,
+    with per-city thresholds broadcast by city code, so the Python-level
+    work grows with the number of rules, not cities or slots.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    @classmethod
+    def from_config(cls, rules=None, overrides=None):
+        rules = FORECAST_ALERT_RULES if rules is None else rules
+        overrides = FORECAST_ALERT_OVERRIDES if overrides is None else overrides
+        names = {rule['name'] for rule in rules}
+        for city, city_rules in overrides.items():
+            for name, override in city_rules.items():
+                if name not in names:
+                    raise ValueError(f"Override for {city} names unknown rule {name!r}")
+                if set(override) != {'threshold'}:
+                    raise ValueError(f"Override of {name!r} for {city} may only set 'threshold'")
+        return cls([AlertRule.from_config(rule, overrides) for rule in rules])
+
+    def evaluate(self, forecasts):
+        """Alerts table with one row per (city, rule, date) that triggered
+
+        `forecasts` holds every city's slots ordered by city then time, with
+        'city', 'date', 'date_time' and the metric columns.
+        """
+        if forecasts.empty:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+
+        codes, cities = pd.factorize(forecasts['city'], sort=False)
+        parts = []
+        for rule in self.rules:
+            if rule.metric not in forecasts:
+                continue
+            values = forecasts[rule.metric].to_numpy(dtype='float64')
+            thresholds = rule.thresholds(cities)[codes]
+            mask = sustained(COMPARATORS[rule.comparator](values, thresholds), codes, rule.window)
+            hits = np.flatnonzero(mask)
+            if not len(hits):
+                continue
+
+            matches = pd.DataFrame({
+                'city': forecasts['city'].to_numpy()[hits],
+                'date': forecasts['date'].to_numpy()[hits],
+                'start': forecasts['date_time'].to_numpy()[hits],
+                'value': values[hits],
+                'threshold': thresholds[hits],
+            })
+            peak = 'max' if rule.comparator.startswith('>') else 'min'
+            grouped = matches.groupby(['city', 'date'], sort=False).agg(
+                start=('start', 'min'), slots=('value', 'size'),
+                peak=('value', peak), threshold=('threshold', 'first'))
+            parts.append(grouped.reset_index().assign(type=rule.name))
+
+        if not parts:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        alerts = pd.concat(parts, ignore_index=True)[ALERT_COLUMNS]
+        alerts['date'] = pd.to_datetime(alerts['date']).dt.date
+        return alerts
+
+    def messages(self, alerts, city):
+        """Alert dicts ({'type', 'description'}) for one city, in rule order"""
+        city_alerts = alerts[alerts['city'] == city]
+        result = []
+        for rule in self.rules:
+            rows = city_alerts[city_alerts['type'] == rule.name]
+            if rows.empty:
+                continue
+            result.append({
+                'type': rule.name,
+                'description': rule.describe(rows['threshold'].iloc[0], rows['date']),
+            })
+        return result
@@ -11,9 +11,17 @@ class ForecastVisualizer:
         plt.style.use('seaborn-v0_8')
         sns.set_theme()
 
-    def plot_temperature_forecast(self, city, forecast_data):
+    def _forecast_frame(self, forecast_data):
+        """Build a plotting frame, reusing an already converted DataFrame as is"""
+        if (isinstance(forecast_data, pd.DataFrame)
+                and pd.api.types.is_datetime64_any_dtype(forecast_data['date_time'])):
+            return forecast_data
         df = pd.DataFrame(forecast_data)
         df['date_time'] = pd.to_datetime(df['date_time'])
+        return df
+
+    def plot_temperature_forecast(self, city, forecast_data):
+        df = self._forecast_frame(forecast_data)
         
         plt.figure(figsize=(15, 6))
         plt.plot(df['date_time'], df['temp'], 'b-', label='Temperature')
@@ -33,8 +41,7 @@ class ForecastVisualizer:
         plt.close()
 
     def plot_precipitation_forecast(self, city, forecast_data):
-        df = pd.DataFrame(forecast_data)
-        df['date_time'] = pd.to_datetime(df['date_time'])
+        df = self._forecast_frame(forecast_data)
         
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10), sharex=True)
         
@@ -60,8 +67,7 @@ class ForecastVisualizer:
         plt.close()
 
     def plot_wind_forecast(self, city, forecast_data):
-        df = pd.DataFrame(forecast_data)
-        df['date_time'] = pd.to_datetime(df['date_time'])
+        df = self._forecast_frame(forecast_data)
         
         fig, ax = plt.subplots(figsize=(15, 6))
         
@@ -90,8 +96,7 @@ class ForecastVisualizer:
 
     def create_forecast_dashboard(self, city, forecast_data):
         """Create a comprehensive forecast dashboard"""
-        df = pd.DataFrame(forecast_data)
-        df['date_time'] = pd.to_datetime(df['date_time'])
+        df = self._forecast_frame(forecast_data)
         
         fig = plt.figure(figsize=(15, 12))
         gs = fig.add_gridspec(3, 2)
@@ -0,0 +1,73 @@
+import math
+import sys
+from array import array
+
+STRING_FIELDS = ('city', 'main', 'description')
+MEASURE_FIELDS = ('temp', 'feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity',
+                  'wind_speed', 'wind_direction', 'clouds', 'visibility', 'rain_1h', 'snow_1h')
+FIELDS = STRING_FIELDS + MEASURE_FIELDS + ('dt',)
+FIELD_SET = frozenset(FIELDS)
+
+def _number(value):
+    """Coerce a reading to float, using 0 for missing or invalid values"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+class Observation:
+    """One current-weather reading, without the per-row dict
+
+    A __slots__ record holding the same fields as a parse_weather_data
+    dict. City, condition and description strings are interned, so
+    readings of the same city or condition share one string object.
+    Measures are coerced once, here, and packed into a single float32
+    array (the precision the ring buffer stores them at) instead of twelve
+    boxed floats; obs.temp and friends read from it. Item access
+    (obs['temp'], obs.get('rain_1h', 0)) is kept for code written against
+    the dicts.
+    """
+
+    __slots__ = STRING_FIELDS + ('dt', 'measures')
+
+    def __init__(self, city, main, description, dt, **measures):
+        self.city = sys.intern(city)
+        self.main = sys.intern((main or 'Unknown').strip())
+        self.description = sys.intern(description or 'Unknown')
+        self.dt = int(dt)
+        self.measures = array('f', [_number(measures.get(name)) for name in MEASURE_FIELDS])
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a parse_weather_data dict (or any mapping with its keys)"""
+        return cls(data['city'], data.get('main'), data.get('description'), data['dt'],
+                   **{name: data.get(name) for name in MEASURE_FIELDS})
+
+    def __getitem__(self, name):
+        if name not in FIELD_SET:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name):
+        return name in FIELD_SET
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in FIELD_SET else default
+
+    def keys(self):
+        return FIELDS
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __repr__(self):
+        return f"Observation({self.city!r}, dt={self.dt}, temp={self.temp})"
+
+def _measure(index):
+    """Read-only attribute for one packed measure"""
+    return property(lambda self: self.measures[index])
+
+for _index, _name in enumerate(MEASURE_FIELDS):
+    setattr(Observation, _name, _measure(_index))
+del _index, _name
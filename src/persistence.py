@@ -0,0 +1,183 @@
+import functools
+import itertools
+import queue
+import threading
+import time
+from .config import WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL, WRITE_QUEUE_SIZE, ROLLUP_TIERS
+
+_FLUSH = object()
+_STOP = object()
+_TIMEOUT = object()
+_UNKEYED = object()
+
+class _Call:
+    """A function queued to run on the writer thread"""
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+class WriteBehindQueue:
+    """Single background writer draining a bounded queue into batched writes.
+
+    `writers` is either one write(batch) callable or a dict of them by
+    kind, e.g. observations and daily summaries; put() names the kind.
+    put() only enqueues, so the fetch loop pays for a queue append rather
+    than a database round trip. The writer thread flushes once
+    `batch_size` entries are pending or the oldest has waited
+    `flush_interval` seconds, calling each kind's writer with its entries
+    in the order they were first queued.
+
+    Items put with a `key` are coalesced: a later item for the same kind
+    and key replaces the pending one, so a summary updated several times
+    within a flush window is written once. When `max_pending` items are
+    queued, put() blocks until the writer catches up instead of letting
+    memory grow. A failed write is reported and dropped; the writer keeps
+    running. stop() writes everything pending before returning.
+
+    call() runs other database work, such as archiving, on the writer
+    thread once the pending writes are done, so it never competes with
+    the writer for the SQLite write lock.
+    """
+
+    def __init__(self, writers, batch_size=WRITE_BATCH_SIZE, flush_interval=WRITE_FLUSH_INTERVAL,
+                 max_pending=WRITE_QUEUE_SIZE, name='write-behind'):
+        self.writers = writers if isinstance(writers, dict) else {None: writers}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self._unkeyed = itertools.count()
+        self.stats = {'queued': 0, 'blocked': 0, 'coalesced': 0, 'written': 0, 'batches': 0,
+                      'errors': 0}
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.thread.start()
+        return self
+
+    def put(self, item, kind=None, key=None, timeout=None):
+        """Queue an item for the `kind` writer, blocking while the queue is full
+
+        Raises queue.Full if `timeout` seconds pass without room.
+        """
+        if kind not in self.writers:
+            raise KeyError(f"no writer for {kind!r}")
+        if key is None:
+            key = (_UNKEYED, next(self._unkeyed))  # Never equal to a caller's key
+        entry = (kind, key, item)
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.stats['blocked'] += 1
+            self.queue.put(entry, timeout=timeout)
+        self.stats['queued'] += 1
+
+    def flush(self):
+        """Write everything queued so far and wait until it is done"""
+        self.queue.put(_FLUSH)
+        self.queue.join()
+
+    def call(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the writer thread after what is queued so far
+
+        Blocks until it has run and returns its result or raises its
+        exception. Runs in the caller's thread if the writer is not started.
+        """
+        if self.thread is None:
+            return func(*args, **kwargs)
+        job = _Call(func, args, kwargs)
+        self.queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def stop(self, timeout=None):
+        """Write what is pending and stop the writer thread"""
+        if self.thread is None:
+            return
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        pending = {kind: {} for kind in self.writers}
+        count = 0
+        deadline = None
+        while True:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                entry = self.queue.get(timeout=wait)
+            except queue.Empty:
+                entry = _TIMEOUT
+
+            if entry is not _TIMEOUT and entry is not _FLUSH and entry is not _STOP \
+                    and not isinstance(entry, _Call):
+                kind, key, item = entry
+                if not count:
+                    deadline = time.monotonic() + self.flush_interval
+                if key in pending[kind]:
+                    self.stats['coalesced'] += 1
+                    self.queue.task_done()
+                else:
+                    count += 1
+                pending[kind][key] = item
+                if count < self.batch_size:
+                    continue
+
+            self._write(pending)
+            pending = {kind: {} for kind in self.writers}
+            count = 0
+            deadline = None
+            if isinstance(entry, _Call):
+                entry.run()
+            if entry is _FLUSH or entry is _STOP or isinstance(entry, _Call):
+                self.queue.task_done()
+            if entry is _STOP:
+                return
+
+    def _write(self, pending):
+        for kind, items in pending.items():
+            if not items:
+                continue
+            batch = list(items.values())
+            try:
+                self.writers[kind](batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                label = self.name if kind is None else f"{self.name} ({kind})"
+                print(f"Error writing batch of {len(batch)} in {label}: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+def database_writer(db_manager, **options):
+    """WriteBehindQueue for the pipeline's observation, summary and rollup writes
+
+    Kinds are 'observation' (reading dicts), 'summary' and 'rollup/<tier>'
+    (both (city, summary) pairs).
+    """
+    writers = {
+        'observation': db_manager.save_observations,
+        'summary': db_manager.save_daily_summaries,
+    }
+    for tier in ROLLUP_TIERS:
+        writers[f"rollup/{tier}"] = functools.partial(db_manager.save_rollups, tier)
+    return WriteBehindQueue(writers, name='database-writer', **options)
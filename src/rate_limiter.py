@@ -0,0 +1,123 @@
+import threading
+import time
+
+PRIORITY_HIGH = 0  # Current weather
+PRIORITY_LOW = 1  # Forecasts and other deferrable calls
+
+class QuotaDeferred(Exception):
+    """Raised when a low-priority call is deferred to protect the daily quota"""
+
+class RateLimiter:
+    """Thread-safe per-minute token bucket plus a per-day call budget.
+
+    Callers that find the bucket empty wait for a token instead of failing.
+    High-priority callers are always served first, the last `reserve`
+    fraction of the minute bucket is kept for them, and once the daily
+    budget drops into its reserve low-priority calls raise QuotaDeferred so
+    they can be retried later.
+    """
+
+    def __init__(self, per_minute, per_day, reserve=0.2, clock=time.time):
+        if per_minute < 1 or per_day < 1:
+            raise ValueError("Rate limits must allow at least one call")
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.clock = clock
+        self.minute_reserve = per_minute * reserve
+        self.day_reserve = int(per_day * reserve)
+
+        self._tokens = float(per_minute)
+        self._refilled_at = clock()
+        self._day = self._day_index(self._refilled_at)
+        self._used_today = 0
+        self._waiting_high = 0
+        self._cond = threading.Condition()
+        self.stats = {'acquired': 0, 'waited': 0, 'deferred': 0}
+
+    @staticmethod
+    def _day_index(now):
+        return int(now // 86400)
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.per_minute,
+                           self._tokens + (now - self._refilled_at) * self.per_minute / 60)
+        self._refilled_at = now
+        day = self._day_index(now)
+        if day != self._day:
+            self._day = day
+            self._used_today = 0
+        return now
+
+    def _seconds_until(self, tokens, now):
+        """Seconds until the bucket holds `tokens` tokens or the day rolls over"""
+        if self._used_today >= self.per_day:
+            return (self._day + 1) * 86400 - now
+        return max(tokens - self._tokens, 0) * 60 / self.per_minute
+
+    def acquire(self, priority=PRIORITY_HIGH, timeout=None):
+        """Take one call from the budget, waiting if necessary
+
+        Returns False if `timeout` expires first. Raises QuotaDeferred for a
+        low-priority call once the daily budget is down to its reserve.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        with self._cond:
+            if priority == PRIORITY_HIGH:
+                self._waiting_high += 1
+            try:
+                while True:
+                    now = self._refill()
+                    day_remaining = self.per_day - self._used_today
+                    if priority == PRIORITY_HIGH:
+                        needed = 1
+                        allowed = day_remaining >= 1
+                    else:
+                        if day_remaining <= self.day_reserve:
+                            self.stats['deferred'] += 1
+                            raise QuotaDeferred(
+                                f"Daily API budget low ({day_remaining} calls left)")
+                        # The bucket never holds more than per_minute tokens, so with
+                        # a tiny budget the reserve shrinks rather than starving forecasts
+                        needed = min(1 + self.minute_reserve, self.per_minute)
+                        allowed = self._waiting_high == 0
+
+                    if allowed and self._tokens >= needed:
+                        self._tokens -= 1
+                        self._used_today += 1
+                        self.stats['acquired'] += 1
+                        if waited:
+                            self.stats['waited'] += 1
+                        return True
+
+                    wait = self._seconds_until(needed, now)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    waited = True
+                    # Wake up at least once a second to track newly waiting callers
+                    self._cond.wait(min(max(wait, 0.001), 1.0))
+            finally:
+                if priority == PRIORITY_HIGH:
+                    self._waiting_high -= 1
+                    self._cond.notify_all()
+
+    def throttle(self):
+        """Empty the minute bucket after the server reports throttling"""
+        with self._cond:
+            self._refill()
+            self._tokens = 0.0
+
+    def remaining(self):
+        """Remaining minute and day budgets"""
+        with self._cond:
+            self._refill()
+            return {
+                'minute': int(self._tokens),
+                'day': self.per_day - self._used_today,
+                'per_minute': self.per_minute,
+                'per_day': self.per_day,
+            }
@@ -0,0 +1,352 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# Readings are stored as float32: a tenth of a degree or hPa needs far less
+# than float64. Observation records carry the same float32 values and the
+# aggregates sum them in float64
+NUMERIC_COLUMNS = {
+    'temp': np.float32,
+    'feels_like': np.float32,
+    'temp_min': np.float32,
+    'temp_max': np.float32,
+    'pressure': np.float32,
+    'humidity': np.float32,
+    'wind_speed': np.float32,
+    'wind_direction': np.float32,
+    'clouds': np.float32,
+    'visibility': np.float32,
+    'rain_1h': np.float32,
+    'snow_1h': np.float32,
+    'dt': np.int64,
+}
+CATEGORY_COLUMNS = ['city', 'main', 'description']
+COLUMN_ORDER = CATEGORY_COLUMNS + list(NUMERIC_COLUMNS)
+INITIAL_ROWS = 64
+
+def _codes_dtype(num_categories):
+    """Smallest code dtype pandas uses for this many categories (avoids a copy)"""
+    if num_categories < np.iinfo(np.int8).max:
+        return np.int8
+    if num_categories < np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+class ObservationBuffer:
+    """Ring buffer of one city's observations backed by numpy columns.
+
+    Each row is stored once and the live window is kept contiguous, so the
+    DataFrames handed out by frame() wrap the arrays without copying. When
+    an append reaches the end of the storage, the live rows are moved back
+    to the front, or the storage doubles if they fill most of it. Storage
+    grows up to `capacity` rows plus an eighth of slack, which keeps those
+    moves amortised O(1) per append; once the buffer holds `capacity` rows
+    the oldest is dropped, so memory is fixed.
+
+    Frames are views: an append may move or overwrite the rows under them,
+    so take a copy if one has to outlive the next update.
+
+    Rows are also indexed by UTC day: `partitions` holds (day number,
+    absolute row index) for the first row of each day, so retention can
+    drop whole expired days by moving the head instead of scanning rows.
+    """
+
+    def __init__(self, capacity, initial_rows=INITIAL_ROWS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.max_rows = capacity + capacity // 8
+        self.rows = min(initial_rows, capacity)
+        self.start = 0
+        self.size = 0
+        self.sorted = True  # True while rows arrive in non-decreasing dt order
+        self.appended = 0  # Absolute index of the next row; the head is appended - size
+        self.partitions = deque()
+        self.mapped = False  # True while columns are read-only snapshot arrays
+        self.categories = {name: [] for name in CATEGORY_COLUMNS}
+        self._category_codes = {name: {} for name in CATEGORY_COLUMNS}
+        self.columns = {name: np.zeros(self.rows, dtype=dtype)
+                        for name, dtype in NUMERIC_COLUMNS.items()}
+        for name in CATEGORY_COLUMNS:
+            self.columns[name] = np.zeros(self.rows, dtype=np.int8)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def empty(self):
+        return self.size == 0
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    @property
+    def last_dt(self):
+        """dt of the most recently appended row, or None when empty"""
+        return int(self.columns['dt'][self.start + self.size - 1]) if self.size else None
+
+    @classmethod
+    def from_columns(cls, capacity, columns, categories):
+        """Buffer over existing column arrays, e.g. memory-mapped from a snapshot
+
+        The arrays are used in place (read-only is fine) and copied into
+        ring storage only on the first write, so restoring costs nothing
+        until a city is updated. Rows must be in stored order.
+        """
+        buffer = cls(capacity)
+        size = len(columns['dt'])
+        keep = max(0, size - capacity)  # Oldest rows beyond capacity are dropped
+        buffer.columns = {name: values[keep:] for name, values in columns.items()}
+        buffer.size = buffer.rows = size - keep
+        buffer.appended = buffer.size
+        buffer.mapped = True
+        for name in CATEGORY_COLUMNS:
+            codes_dtype = _codes_dtype(len(categories[name]))
+            buffer.columns[name] = buffer.columns[name].astype(codes_dtype, copy=False)
+            buffer.categories[name] = list(categories[name])
+            buffer._category_codes[name] = {value: code for code, value in enumerate(categories[name])}
+        dt = buffer.column('dt')
+        buffer.sorted = bool(np.all(np.diff(dt) >= 0))
+        buffer._index_days()
+        return buffer
+
+    def _materialize(self):
+        """Copy mapped columns into writable ring storage before the first write"""
+        if self.mapped:
+            self._relocate(self._grown_rows())
+            self.mapped = False
+
+    def _make_room(self):
+        """Free the slot after the live window once it reaches the end of storage"""
+        if self.start <= self.rows // 8 and self.rows < self.max_rows:
+            self._relocate(self._grown_rows())
+        else:
+            self._relocate(self.rows)
+
+    def _grown_rows(self):
+        return min(max(2 * self.rows, 1), self.max_rows)
+
+    def _relocate(self, rows):
+        """Move the live rows to the front of storage `rows` long (in place if unchanged)"""
+        for name, values in self.columns.items():
+            live = values[self.start:self.start + self.size]
+            if rows != self.rows:
+                values = np.zeros(rows, dtype=values.dtype)
+                self.columns[name] = values
+            values[:self.size] = live
+        self.rows = rows
+        self.start = 0
+
+    def _encode(self, name, value):
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            self.categories[name].append(value)
+            dtype = _codes_dtype(len(codes))
+            if self.columns[name].dtype != dtype:
+                self.columns[name] = self.columns[name].astype(dtype)
+        return code
+
+    def append(self, row):
+        """Append one observation dict; missing measures are stored as 0"""
+        self._materialize()
+        if self.size == self.capacity:
+            # Full: drop the oldest row to make room
+            self._advance(1)
+        if self.start + self.size == self.rows:
+            self._make_room()
+
+        pos = self.start + self.size
+        dt = self.columns['dt']
+        if self.size and row['dt'] < dt[self.start + self.size - 1]:
+            self.sorted = False
+        day = int(row['dt']) // 86400
+        if not self.partitions or self.partitions[-1][0] != day:
+            self.partitions.append((day, self.appended))
+        for name in NUMERIC_COLUMNS:
+            self.columns[name][pos] = row.get(name, 0)
+        for name in CATEGORY_COLUMNS:
+            self.columns[name][pos] = self._encode(name, row.get(name) or 'Unknown')
+        self.size += 1
+        self.appended += 1
+
+    def column(self, name, offset=0, stop=None):
+        """Zero-copy view of a raw column (category columns as codes)"""
+        stop = self.size if stop is None else stop
+        return self.columns[name][self.start + offset:self.start + stop]
+
+    def frame(self, offset=0, stop=None):
+        """Zero-copy DataFrame over rows [offset, stop) of the live window"""
+        data = {}
+        for name in COLUMN_ORDER:
+            values = self.column(name, offset, stop)
+            if name in self.categories:
+                values = pd.Categorical.from_codes(values, self.categories[name], validate=False)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def bounds(self, start_dt, end_dt):
+        """Offsets [lo, hi) of rows with start_dt <= dt < end_dt, for time-ordered rows"""
+        dt = self.column('dt')
+        return (int(np.searchsorted(dt, start_dt, side='left')),
+                int(np.searchsorted(dt, end_dt, side='left')))
+
+    def between(self, start_dt, end_dt):
+        """Rows with start_dt <= dt < end_dt; a zero-copy view while rows are time-ordered"""
+        if self.sorted:
+            return self.frame(*self.bounds(start_dt, end_dt))
+        frame = self.frame()
+        return frame[(frame['dt'] >= start_dt) & (frame['dt'] < end_dt)]
+
+    def since(self, timestamp):
+        """Rows with dt > timestamp"""
+        return self.between(int(np.floor(timestamp)) + 1, np.iinfo(np.int64).max)
+
+    def positions_after(self, timestamp):
+        """Window offsets of rows with dt > timestamp: a slice, or a mask if rows are unordered"""
+        dt = self.column('dt')
+        if self.sorted:
+            return slice(int(np.searchsorted(dt, timestamp, side='right')), self.size)
+        return dt > timestamp
+
+    def drop_through(self, timestamp):
+        """Drop rows with dt <= timestamp and return how many were dropped"""
+        if self.sorted:
+            count = int(np.searchsorted(self.column('dt'), timestamp, side='right'))
+            self._advance(count)
+        else:
+            keep = self.column('dt') > timestamp
+            count = self.size - int(keep.sum())
+            if count:
+                self._compact(keep)
+        if self.size == 0:
+            self.sorted = True
+        return count
+
+    def drop_days_before(self, day):
+        """Drop whole UTC days numbered below `day` and return the rows dropped
+
+        O(expired days) for time-ordered rows: the head simply moves to the
+        first row of the oldest day that is kept.
+        """
+        if not self.sorted:
+            return self.drop_through(day * 86400 - 1)
+        while self.partitions and self.partitions[0][0] < day:
+            self.partitions.popleft()
+        first_kept = self.partitions[0][1] if self.partitions else self.appended
+        count = max(0, first_kept - (self.appended - self.size))
+        self._advance(count)
+        return count
+
+    def _advance(self, count):
+        """Move the head forward past `count` rows"""
+        self.start += count
+        self.size -= count
+        if self.size == 0:
+            self.start = 0
+        self._trim_partitions()
+
+    def _trim_partitions(self):
+        """Forget partitions whose rows have all left the window"""
+        head = self.appended - self.size
+        while len(self.partitions) > 1 and self.partitions[1][1] <= head:
+            self.partitions.popleft()
+        if self.size == 0:
+            self.partitions.clear()
+
+    def _compact(self, keep):
+        """Rewrite the rows selected by `keep` to the front of the storage"""
+        self._materialize()
+        kept = int(keep.sum())
+        for values in self.columns.values():
+            values[:kept] = values[self.start:self.start + self.size][keep]
+        self.start = 0
+        self.size = kept
+        self.sorted = bool(np.all(np.diff(self.column('dt')) >= 0))
+        self._index_days()
+
+    def _index_days(self):
+        """Rebuild the day partitions from the live rows"""
+        days = self.column('dt') // 86400
+        firsts = np.flatnonzero(np.diff(days, prepend=days[:1] - 1)) if self.size else []
+        head = self.appended - self.size
+        self.partitions = deque((int(days[i]), head + int(i)) for i in firsts)
+
+class RecentDataView:
+    """Read-only multi-city window over observation buffers
+
+    Holds, per city, the buffer and the slice of rows inside the time
+    window; nothing is copied until a caller asks for it. Columns come back
+    as numpy views (category columns as labels), and the derived 'datetime'
+    column is a datetime64 reinterpretation of 'dt', built on first use and
+    cached. Call to_frame() for a single concatenated DataFrame.
+    """
+
+    def __init__(self, windows):
+        self.windows = windows  # city -> (buffer, row positions: slice or boolean mask)
+        self._cache = {}
+
+    @classmethod
+    def since(cls, buffers, timestamp):
+        """View of every buffer's rows with dt > timestamp"""
+        windows = {}
+        for city, buffer in buffers.items():
+            positions = buffer.positions_after(timestamp)
+            if len(buffer.column('dt')[positions]):
+                windows[city] = (buffer, positions)
+        return cls(windows)
+
+    @property
+    def cities(self):
+        return list(self.windows)
+
+    @property
+    def empty(self):
+        return not self.windows
+
+    def __len__(self):
+        return sum(len(self.column(city, 'dt')) for city in self.windows)
+
+    def column(self, city, name):
+        """Values of one column for one city inside the window"""
+        key = (city, name)
+        if key in self._cache:
+            return self._cache[key]
+
+        buffer, positions = self.windows[city]
+        if name == 'datetime':
+            values = self.column(city, 'dt').view('datetime64[s]')
+        elif name in buffer.categories:
+            codes = buffer.column(name)[positions]
+            values = pd.Categorical.from_codes(codes, buffer.categories[name], validate=False)
+        else:
+            values = buffer.column(name)[positions]
+        self._cache[key] = values
+        return values
+
+    def frame(self, city):
+        """DataFrame of one city's window (zero-copy for time-ordered buffers)"""
+        buffer, positions = self.windows[city]
+        if isinstance(positions, slice):
+            return buffer.frame(positions.start, positions.stop)
+        return buffer.frame()[positions]
+
+    def value_counts(self, name):
+        """Counts of a category column across every city, most frequent first"""
+        counts = {}
+        for city in self.windows:
+            buffer, positions = self.windows[city]
+            codes = buffer.column(name)[positions]
+            for label, count in zip(buffer.categories[name], np.bincount(codes)):
+                if count:
+                    counts[label] = counts.get(label, 0) + int(count)
+        return pd.Series(counts, dtype='int64').sort_values(ascending=False, kind='mergesort')
+
+    def to_frame(self):
+        """Concatenate every city's rows into one DataFrame (copies)"""
+        if self.empty:
+            return pd.DataFrame()
+        return pd.concat([self.frame(city) for city in self.windows], ignore_index=True)
@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import random
+import time
+
+class ScheduledJob:
+    """A recurring job and its run/miss accounting"""
+
+    def __init__(self, name, func, interval, args=(), kwargs=None):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.next_run = None
+        self.runs = 0
+        self.errors = 0
+        self.missed = 0  # Deadlines skipped entirely because the job fell behind
+        self.late = 0  # Runs that started more than the grace period after their deadline
+        self.max_lateness = 0.0
+        self.last_duration = 0.0
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'errors': self.errors,
+            'missed': self.missed,
+            'late': self.late,
+            'max_lateness': self.max_lateness,
+            'last_duration': self.last_duration,
+        }
+
+class JobScheduler:
+    """Run recurring jobs from a heap of deadlines.
+
+    Each job keeps its own interval. The next deadline is anchored to the
+    previous deadline rather than to when the job finished, so periods do
+    not drift by the time the work takes. Deadlines that have already
+    passed when a job is rescheduled are skipped and counted as missed
+    instead of being run back to back.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep, late_grace=1.0, rng=None):
+        self.clock = clock
+        self.sleep = sleep
+        self.late_grace = late_grace
+        self.rng = rng or random.Random()
+        self.jobs = {}
+        self._queue = []
+        self._counter = itertools.count()
+
+    def add_job(self, name, func, interval, args=(), kwargs=None, jitter=0.0, start_delay=0.0):
+        """Schedule func(*args, **kwargs) every `interval` seconds
+
+        The first run is offset by start_delay plus a random amount of up to
+        `jitter` seconds so that jobs with the same interval don't fire
+        their requests in one burst.
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already scheduled")
+        job = ScheduledJob(name, func, interval, args, kwargs)
+        job.next_run = self.clock() + start_delay + self.rng.uniform(0, jitter)
+        self.jobs[name] = job
+        self._push(job)
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (job.next_run, next(self._counter), job))
+
+    def seconds_until_next(self):
+        """Seconds until the earliest deadline (0 if one is already due)"""
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - self.clock())
+
+    def run_pending(self):
+        """Run every job whose deadline has passed, earliest first"""
+        ran = 0
+        while self._queue and self._queue[0][0] <= self.clock():
+            deadline, _, job = heapq.heappop(self._queue)
+            self._run(job, deadline)
+            ran += 1
+        return ran
+
+    def _run(self, job, deadline):
+        started = self.clock()
+        lateness = started - deadline
+        job.max_lateness = max(job.max_lateness, lateness)
+        if lateness > self.late_grace:
+            job.late += 1
+
+        try:
+            job.func(*job.args, **job.kwargs)
+        except Exception as e:
+            job.errors += 1
+            print(f"Error running scheduled job {job.name}: {str(e)}")
+        finally:
+            job.runs += 1
+            finished = self.clock()
+            job.last_duration = finished - started
+
+        # Anchor to the previous deadline to compensate for drift
+        next_run = deadline + job.interval
+        if next_run <= finished:
+            skipped = int((finished - next_run) // job.interval) + 1
+            job.missed += skipped
+            next_run += skipped * job.interval
+        job.next_run = next_run
+        self._push(job)
+
+    def run_forever(self, should_stop=None):
+        """Run jobs as they fall due until should_stop() returns True"""
+        while not (should_stop and should_stop()):
+            self.run_pending()
+            wait = self.seconds_until_next()
+            if wait is None:
+                break
+            if wait > 0:
+                self.sleep(wait)
+
+    def get_stats(self):
+        """Per-job run, error and deadline statistics"""
+        return {name: job.stats() for name, job in self.jobs.items()}
@@ -0,0 +1,144 @@
+import json
+import os
+import pickle
+import shutil
+import time
+import numpy as np
+from .config import SNAPSHOT_DIR, OBSERVATION_BUFFER_CAPACITY
+from .ring_buffer import ObservationBuffer, CATEGORY_COLUMNS, COLUMN_ORDER
+
+MANIFEST = 'manifest.json'
+STATE_FILE = 'state.pkl'
+
+def open_periods(periods):
+    """{city: {start: aggregate}} reduced to each city's latest period"""
+    return {city: {max(aggregates): aggregates[max(aggregates)]}
+            for city, aggregates in periods.items() if aggregates}
+
+class ObservationSnapshot:
+    """Checkpoint of a WeatherDataProcessor's in-memory store for warm restarts
+
+    Every city's buffered observations are written as one .npy file per
+    column (city rows back to back), and the manifest records each city's
+    row count and category labels. Daily aggregates, the open period of
+    each rollup tier and the small forecast frames are pickled alongside;
+    closed rollup periods are already in their rollup tables and only
+    reads older than the last reading could change them, so they are not
+    pickled every few minutes. Each save goes to a new
+    generation directory and the manifest is swapped in last, so a crash
+    mid-save leaves the previous snapshot intact.
+
+    restore() memory-maps the columns; buffers read straight from the
+    mapping and copy a city's rows only when that city is next written.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST)
+
+    def save(self, processor):
+        """Write a new snapshot generation and return what was saved"""
+        started = time.perf_counter()
+        buffers = [(city, buffer) for city, buffer in processor.current_data.items()
+                   if not buffer.empty]
+        generation = f"gen-{time.time_ns()}"
+        generation_dir = os.path.join(self.directory, generation)
+        os.makedirs(generation_dir)
+
+        nbytes = 0
+        for name in COLUMN_ORDER:
+            parts = [buffer.column(name) for _, buffer in buffers]
+            if name in CATEGORY_COLUMNS:
+                parts = [codes.astype(np.int32) for codes in parts]
+            values = np.concatenate(parts) if parts else np.zeros(0)
+            np.save(os.path.join(generation_dir, f"{name}.npy"), values)
+            nbytes += values.nbytes
+
+        state = {
+            'daily_aggregates': processor.daily_aggregates,
+            'rollups': {tier: open_periods(periods) for tier, periods in processor.rollups.items()},
+            'forecast_data': processor.forecast_data,
+        }
+        with open(os.path.join(generation_dir, STATE_FILE), 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = {
+            'generation': generation,
+            'saved_at': time.time(),
+            'cities': [{'name': city, 'rows': len(buffer), 'categories': buffer.categories}
+                       for city, buffer in buffers],
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self._remove_stale(generation)
+
+        stats = {'cities': len(buffers), 'rows': sum(len(b) for _, b in buffers),
+                 'bytes': nbytes, 'seconds': time.perf_counter() - started}
+        print(f"✓ Snapshot saved: {stats['rows']} observations for {stats['cities']} cities "
+              f"in {stats['seconds'] * 1000:.0f} ms")
+        return stats
+
+    def restore(self, processor, cities=None):
+        """Load the latest snapshot into `processor`; returns stats or None if there is none
+
+        With `cities`, only those cities are restored (e.g. after the
+        registry was resharded across a different number of workers).
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+
+        started = time.perf_counter()
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            generation_dir = os.path.join(self.directory, manifest['generation'])
+            with open(os.path.join(generation_dir, STATE_FILE), 'rb') as f:
+                state = pickle.load(f)
+
+            current_data = {}
+            if manifest['cities']:
+                # Plain ndarray views of the mappings slice much faster than np.memmap
+                columns = {name: np.load(os.path.join(generation_dir, f"{name}.npy"),
+                                         mmap_mode='r').view(np.ndarray)
+                           for name in COLUMN_ORDER}
+                offset = 0
+                for entry in manifest['cities']:
+                    end = offset + entry['rows']
+                    if cities is not None and entry['name'] not in cities:
+                        offset = end
+                        continue
+                    current_data[entry['name']] = ObservationBuffer.from_columns(
+                        OBSERVATION_BUFFER_CAPACITY,
+                        {name: values[offset:end] for name, values in columns.items()},
+                        entry['categories'])
+                    offset = end
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            print(f"Ignoring unreadable snapshot in {self.directory}: {e}")
+            return None
+
+        keep = (lambda stored: stored) if cities is None else (
+            lambda stored: {city: value for city, value in stored.items() if city in cities})
+        processor.current_data = current_data
+        processor.daily_aggregates = keep(state['daily_aggregates'])
+        processor.forecast_data = keep(state['forecast_data'])
+        for tier in processor.rollups:
+            processor.rollups[tier] = keep(state['rollups'].get(tier, {}))
+
+        stats = {'cities': len(current_data), 'rows': sum(len(b) for b in current_data.values()),
+                 'age': time.time() - manifest['saved_at'],
+                 'seconds': time.perf_counter() - started}
+        print(f"✓ Restored {stats['rows']} observations for {stats['cities']} cities from a "
+              f"{stats['age'] / 60:.0f}-minute-old snapshot in {stats['seconds'] * 1000:.0f} ms")
+        return stats
+
+    def _remove_stale(self, current):
+        """Delete older generations; one still mapped on Windows is retried next save"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('gen-') and name != current and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
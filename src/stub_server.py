@@ -0,0 +1,205 @@
+"""Local stand-in for the OpenWeatherMap API.
+
+Serves deterministic payloads for the /weather, /group, /forecast and
+/history/city endpoints so the client (including batched requests) can be exercised
+offline. Run it with ``python -m src.stub_server --port 8765`` and point
+OPENWEATHERMAP_BASE_URL at ``http://127.0.0.1:8765``. City IDs from the
+registry (``--registry``, cities.json by default) resolve to their names;
+any other ID is served as a synthetic city.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+GROUP_LIMIT = 20
+CONDITIONS = [
+    ('Clear', 'clear sky'),
+    ('Clouds', 'scattered clouds'),
+    ('Rain', 'light rain'),
+    ('Haze', 'haze'),
+]
+
+def city_id(name):
+    """Stable fake city ID derived from the city name"""
+    return 1000000 + zlib.crc32(name.lower().encode()) % 1000000
+
+def _seed(name):
+    return zlib.crc32(name.lower().encode())
+
+def weather_payload(name, dt=None, location_id=None):
+    """Build a current weather payload shaped like the /weather response"""
+    seed = _seed(name)
+    dt = int(time.time()) if dt is None else dt
+    temp = 20.0 + seed % 15
+    main, description = CONDITIONS[seed % len(CONDITIONS)]
+    return {
+        'id': city_id(name) if location_id is None else location_id,
+        'name': name,
+        'dt': dt,
+        'weather': [{'main': main, 'description': description}],
+        'main': {
+            'temp': temp,
+            'feels_like': temp + 1.5,
+            'temp_min': temp - 1,
+            'temp_max': temp + 1,
+            'pressure': 1000 + seed % 20,
+            'humidity': 40 + seed % 50,
+        },
+        'wind': {'speed': (seed % 100) / 10, 'deg': seed % 360},
+        'clouds': {'all': seed % 100},
+        'visibility': 10000,
+    }
+
+def forecast_payload(name, start=None, slots=40, location_id=None):
+    """Build a 5 day / 3 hour forecast payload shaped like /forecast"""
+    start = int(time.time()) // 10800 * 10800 if start is None else start
+    items = []
+    for i in range(slots):
+        current = weather_payload(name, start + i * 10800)
+        current['main']['temp'] += (i % 8 - 4) * 0.75
+        item = {k: current[k] for k in ('dt', 'weather', 'main', 'wind', 'clouds', 'visibility')}
+        item['pop'] = round((_seed(name) + i) % 10 / 10, 1)
+        if current['weather'][0]['main'] == 'Rain':
+            item['rain'] = {'3h': round((i % 5) * 0.8, 2)}
+        items.append(item)
+    return {
+        'cnt': len(items),
+        'list': items,
+        'city': {'id': city_id(name) if location_id is None else location_id, 'name': name, 'country': 'IN'},
+    }
+
+def history_payload(name, start, end):
+    """Build an hourly history payload shaped like /history/city"""
+    items = []
+    first = -(-int(start) // 3600) * 3600
+    for dt in range(first, int(end) + 1, 3600):
+        current = weather_payload(name, dt)
+        current['main']['temp'] += (dt // 3600 % 24 - 12) * 0.25
+        items.append({k: current[k] for k in ('dt', 'weather', 'main', 'wind', 'clouds', 'visibility')})
+    return {'cod': '200', 'city_id': city_id(name), 'cnt': len(items), 'list': items}
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+        if url.path.rstrip('/').endswith('history/city'):
+            endpoint = 'history'
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.count(endpoint)
+
+        if 'appid' not in params:
+            return self._send(401, {'cod': 401, 'message': 'Invalid API key'})
+
+        if endpoint == 'history':
+            _, name = self._lookup(params)
+            if name is None:
+                return self._send(404, {'cod': '404', 'message': 'city not found'})
+            return self._send(200, history_payload(name, params.get('start', 0),
+                                                   params.get('end', 0)))
+
+        if endpoint == 'group':
+            ids = [i for i in params.get('id', '').split(',') if i]
+            if not ids or len(ids) > GROUP_LIMIT:
+                return self._send(400, {'cod': '400', 'message': 'Invalid id list'})
+            items = [weather_payload(self.server.name_for(int(i)), location_id=int(i))
+                     for i in ids]
+            return self._send(200, {'cnt': len(items), 'list': items})
+
+        if endpoint in ('weather', 'forecast'):
+            location_id, name = self._lookup(params)
+            if name is None:
+                return self._send(404, {'cod': '404', 'message': 'city not found'})
+            if endpoint == 'weather':
+                return self._send(200, weather_payload(name, location_id=location_id))
+            return self._send(200, forecast_payload(name, location_id=location_id))
+
+        self._send(404, {'cod': '404', 'message': 'Internal error'})
+
+    def _lookup(self, params):
+        """(city ID, name) for the requested location, or (None, None)"""
+        if 'id' in params:
+            location_id = int(params['id'])
+            return location_id, self.server.name_for(location_id)
+        if 'q' in params:
+            name = params['q'].split(',')[0].strip()
+            if name:
+                self.server.names[city_id(name)] = name
+                return city_id(name), name
+        return None, None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """Threaded HTTP server that mimics the OpenWeatherMap endpoints"""
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, cities=None, registry=None):
+        super().__init__((host, port), _StubHandler)
+        self.names = {city_id(c): c for c in (cities or [])}
+        for city in registry or []:
+            if city.city_id is not None:
+                self.names[city.city_id] = city.name
+        self.request_counts = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def name_for(self, location_id):
+        """City name for an ID; IDs not seen before get a synthetic city"""
+        return self.names.setdefault(location_id, f"City {location_id}")
+
+    def count(self, endpoint):
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local OpenWeatherMap stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--registry', default='cities.json',
+                        help='city registry whose IDs map to city names')
+    args = parser.parse_args()
+
+    registry = None
+    if os.path.exists(args.registry):
+        # The registry loader reads the app config, which requires an API key
+        os.environ.setdefault('OPENWEATHERMAP_API_KEY', 'stub')
+        from .city_registry import CityRegistry
+        registry = CityRegistry.load(args.registry)
+    server = StubWeatherServer(args.host, args.port, registry=registry)
+    print(f"Stub OpenWeatherMap API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
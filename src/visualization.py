@@ -3,6 +3,10 @@ import seaborn as sns
 import pandas as pd
 import os
 from .config import VISUALIZATION_OUTPUT_DIR
+from .ring_buffer import RecentDataView
+
+# Summary columns read by plot_daily_summary
+DAILY_SUMMARY_COLUMNS = ['date', 'city', 'avg_temp', 'max_temp', 'min_temp', 'dominant_weather']
 
 class WeatherVisualizer:
     def __init__(self):
@@ -11,20 +15,18 @@ class WeatherVisualizer:
         sns.set_theme()
 
     def plot_temperature_trends(self, data):
-        """Plot temperature trends for all cities"""
+        """Plot temperature trends for all cities
+
+        Accepts a RecentDataView or a DataFrame of observations.
+        """
         if data.empty:
             return
             
         plt.figure(figsize=(15, 8))
         
-        # Convert timestamp to datetime for better plotting
-        data['datetime'] = pd.to_datetime(data['dt'], unit='s')
-        
         # Plot each city's temperature
-        for city in data['city'].unique():
-            city_data = data[data['city'] == city]
-            plt.plot(city_data['datetime'], city_data['temp'], 
-                    marker='o', linestyle='-', label=city)
+        for city, times, temps in self._city_series(data, 'temp'):
+            plt.plot(times, temps, marker='o', linestyle='-', label=city)
         
         plt.title('Temperature Trends by City')
         plt.xlabel('Time')
@@ -46,7 +48,10 @@ class WeatherVisualizer:
         plt.figure(figsize=(12, 6))
         
         # Count occurrences of each weather condition
-        condition_counts = data['main'].value_counts()
+        if isinstance(data, RecentDataView):
+            condition_counts = data.value_counts('main')
+        else:
+            condition_counts = data['main'].value_counts()
         
         # Create bar plot
         sns.barplot(x=condition_counts.index, y=condition_counts.values)
@@ -60,27 +65,37 @@ class WeatherVisualizer:
         plt.savefig(filepath)
         plt.close()
 
+    @staticmethod
+    def _city_series(data, column):
+        """Yield (city, datetimes, values) per city without modifying `data`"""
+        if isinstance(data, RecentDataView):
+            for city in data.cities:
+                yield city, data.column(city, 'datetime'), data.column(city, column)
+            return
+        for city, city_data in data.groupby('city', sort=False, observed=True):
+            yield city, pd.to_datetime(city_data['dt'], unit='s'), city_data[column]
+
     def plot_daily_summary(self, summaries):
-        """Plot daily weather summaries"""
-        if not summaries:
+        """Plot daily weather summaries
+
+        Accepts a DataFrame with the DAILY_SUMMARY_COLUMNS (see
+        DatabaseManager.get_summary_frame) or a list of summary rows.
+        """
+        if len(summaries) == 0:
             return
         
-        # Convert SQLAlchemy objects to DataFrame
-        df = pd.DataFrame([{
-            'date': s.date,
-            'city': s.city,
-            'avg_temp': s.avg_temp,
-            'max_temp': s.max_temp,
-            'min_temp': s.min_temp,
-            'dominant_weather': s.dominant_weather
-        } for s in summaries])
+        if isinstance(summaries, pd.DataFrame):
+            df = summaries
+        else:
+            # Convert SQLAlchemy objects to DataFrame
+            df = pd.DataFrame([{name: getattr(s, name) for name in DAILY_SUMMARY_COLUMNS}
+                               for s in summaries])
         
         # Create figure with multiple subplots
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 12))
         
         # Temperature trends
-        for city in df['city'].unique():
-            city_data = df[df['city'] == city]
+        for city, city_data in df.groupby('city', sort=False, observed=True):
             ax1.plot(city_data['date'], city_data['avg_temp'], 
                     marker='o', linestyle='-', label=f'{city} (Avg)')
             ax1.fill_between(city_data['date'], 
@@ -96,7 +111,8 @@ class WeatherVisualizer:
         ax1.tick_params(axis='x', rotation=45)
         
         # Weather condition distribution
-        condition_counts = df.groupby(['city', 'dominant_weather']).size().unstack(fill_value=0)
+        condition_counts = df.groupby(['city', 'dominant_weather'],
+                                      observed=True).size().unstack(fill_value=0)
         condition_counts.plot(kind='bar', ax=ax2)
         ax2.set_title('Dominant Weather Conditions by City')
         ax2.set_xlabel('City')
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import random
+from datetime import date
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aggregator import PeriodAggregate, compass_direction
+from src.data_processor import WeatherDataProcessor
+
+DAY_START = 1704067200  # 2024-01-01 00:00 UTC
+
+class TestPeriodAggregate(unittest.TestCase):
+    def test_matches_full_recomputation(self):
+        """Running totals give the same summary as recomputing from all readings"""
+        rng = random.Random(7)
+        rows = [{'city': 'TestCity', 'dt': DAY_START + i * 600,
+                 'temp': rng.uniform(10, 40), 'humidity': rng.randint(20, 90),
+                 'pressure': rng.randint(990, 1030), 'wind_speed': rng.uniform(0, 15),
+                 'wind_direction': rng.uniform(80, 100), 'clouds': rng.randint(0, 100),
+                 'visibility': 10000, 'rain_1h': rng.choice([0, 0.5]), 'snow_1h': 0,
+                 'main': rng.choice(['Clear', 'Clouds', 'Rain']), 'description': 'x'}
+                for i in range(144)]
+        processor = WeatherDataProcessor()
+        for row in rows:
+            processor.add_weather_data(row)
+        summary = processor.get_daily_summary('TestCity', date(2024, 1, 1))
+
+        df = pd.DataFrame(rows)
+        # Readings are kept at float32 precision; totals are summed in float64
+        for name in ('temp', 'wind_speed', 'rain_1h'):
+            df[name] = df[name].astype('float32').astype('float64')
+        self.assertAlmostEqual(summary['avg_temp'], df['temp'].mean(), places=9)
+        self.assertEqual(summary['min_temp'], df['temp'].min())
+        self.assertEqual(summary['max_wind_speed'], df['wind_speed'].max())
+        self.assertAlmostEqual(summary['total_rain'], df['rain_1h'].sum(), places=9)
+        self.assertEqual(summary['dominant_weather'], df['main'].mode().iloc[0])
+        self.assertEqual(summary['dominant_wind_direction'], 'E')
+        print("✓ Incremental summary parity test passed")
+
+    def test_repeated_reading_counted_once(self):
+        """A cached payload handed in again does not shift the day's averages"""
+        processor = WeatherDataProcessor()
+        first = {'city': 'TestCity', 'dt': DAY_START + 600, 'temp': 20, 'main': 'Clear'}
+        second = {'city': 'TestCity', 'dt': DAY_START + 1200, 'temp': 30, 'main': 'Rain'}
+        self.assertTrue(processor.add_weather_data(first))
+        self.assertTrue(processor.add_weather_data(second))
+        self.assertFalse(processor.add_weather_data(dict(second)))
+        self.assertFalse(processor.add_weather_data(first))  # Older than the last reading
+
+        summary = processor.get_daily_summary('TestCity', date(2024, 1, 1))
+        self.assertEqual(summary['avg_temp'], 25.0)
+        self.assertEqual(len(processor.current_data['TestCity']), 2)
+        self.assertEqual(processor.get_rollups('1h', 'TestCity')[0]['avg_temp'], 25.0)
+        print("✓ Repeated reading test passed")
+
+    def test_wind_direction_is_circular_mean(self):
+        """Winds either side of north average to north, not south"""
+        aggregate = PeriodAggregate(date(2024, 1, 1))
+        for degrees in (350, 10, 355, 5):
+            aggregate.add({'temp': 20, 'wind_direction': degrees, 'main': 'Clear'})
+        self.assertEqual(aggregate.summary()['dominant_wind_direction'], 'N')
+        self.assertEqual(list(compass_direction([1.0, 0.0], [0.0, -1.0])), ['E', 'S'])
+        print("✓ Circular wind direction test passed")
+
+class TestForecastSummaries(unittest.TestCase):
+    def test_batch_matches_per_city_groupby(self):
+        """One grouped pass gives the same rows as summarising each city's days"""
+        rng = random.Random(3)
+        processor = WeatherDataProcessor()
+        for city in ('Delhi', 'Mumbai', 'Chennai'):
+            processor.add_forecast_data(city, [
+                {'city': city, 'dt': DAY_START + i * 10800,
+                 'date_time': pd.Timestamp(DAY_START + i * 10800, unit='s').to_pydatetime(),
+                 'temp': rng.uniform(20, 40), 'humidity': rng.randint(30, 90),
+                 'wind_speed': rng.uniform(0, 10), 'pop': rng.random(),
+                 'rain_3h': rng.choice([0, 1.5]), 'snow_3h': 0,
+                 'main': rng.choice(['Clear', 'Clouds', 'Rain'])}
+                for i in range(40)])
+
+        summaries = processor.get_forecast_summaries()
+        self.assertEqual(len(summaries), 3 * 5)
+        for (city, day), row in summaries.set_index(['city', 'date']).iterrows():
+            group = processor.get_forecast_data(city)
+            group = group[group['date'] == day]
+            self.assertAlmostEqual(row['avg_temp'], group['temp'].mean(), places=9)
+            self.assertEqual(row['max_temp'], group['temp'].max())
+            self.assertEqual(row['precipitation_probability'], group['pop'].max())
+            self.assertEqual(row['dominant_weather'], group['main'].mode().iloc[0])
+
+        per_city = processor.get_forecast_summary('Mumbai')
+        self.assertEqual([s['date'] for s in per_city], sorted(set(summaries['date'])))
+        print("✓ Batch forecast summary test passed")
+
+if __name__ == '__main__':
+    unittest.main()
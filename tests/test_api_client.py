@@ -0,0 +1,222 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api_client import OpenWeatherMapClient
+from src.cache import ResponseCache
+from src.data_processor import WeatherDataProcessor
+from src.stub_server import StubWeatherServer, forecast_payload
+from src.city_registry import load_city_registry
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    failures_left = 0
+
+    def do_GET(self):
+        cls = type(self)
+        if cls.failures_left > 0:
+            cls.failures_left -= 1
+            self._send(503, {'message': 'try again'})
+        elif self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self._send(200, {'name': 'Delhi', 'main': {'temp': 30.0}})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestPooledClient(unittest.TestCase):
+    def setUp(self):
+        _Handler.failures_left = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = OpenWeatherMapClient(
+            base_url=f"http://127.0.0.1:{self.server.server_port}",
+            backoff_base=0.01, max_retries=3, use_cache=False)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        """Consecutive calls reuse one keep-alive connection"""
+        for _ in range(3):
+            self.assertEqual(self.client.get_weather_data('Delhi')['name'], 'Delhi')
+
+        stats = self.client.get_connection_stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['connections_reused'], 2)
+        print("✓ Connection reuse test passed")
+
+    def test_retry_on_server_error(self):
+        """5xx responses are retried with backoff before succeeding"""
+        _Handler.failures_left = 2
+        data = self.client.get_forecast_data('Delhi')
+
+        self.assertEqual(data['name'], 'Delhi')
+        stats = self.client.get_connection_stats()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['failures'], 0)
+        print("✓ Retry/backoff test passed")
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent 5xx responses surface as an HTTP error"""
+        _Handler.failures_left = 10
+        with self.assertRaises(Exception):
+            self.client.get_weather_data('Delhi')
+        self.assertEqual(self.client.get_connection_stats()['retries'], 3)
+        print("✓ Retry limit test passed")
+
+class TestBatchedRequests(unittest.TestCase):
+    def setUp(self):
+        self.server = StubWeatherServer().start()
+        self.client = OpenWeatherMapClient(base_url=self.server.base_url, use_cache=False)
+        self.cities = [f"City{i}" for i in range(45)]
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_batched_fetch_uses_group_endpoint(self):
+        """Cities are resolved once, then fetched 20 at a time"""
+        first = self.client.get_weather_data_batch(self.cities)
+        self.assertEqual(list(first), self.cities)
+        self.assertEqual(self.server.request_counts, {'weather': 45})
+
+        second = self.client.get_weather_data_batch(self.cities)
+        self.assertEqual(list(second), self.cities)
+        self.assertEqual(self.server.request_counts, {'weather': 45, 'group': 3})
+        print("✓ Batched request count test passed")
+
+    def test_shipped_registry_ids_are_served(self):
+        """The stub answers the real OpenWeatherMap IDs in cities.json"""
+        registry = load_city_registry(os.path.join(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))), 'cities.json'))
+        server = StubWeatherServer(registry=registry).start()
+        client = OpenWeatherMapClient(base_url=server.base_url, use_cache=False)
+        try:
+            client.register_cities(registry)
+            self.assertEqual(client.get_weather_data('Delhi')['id'], 1273294)
+            self.assertEqual(client.parse_weather_data(client.get_weather_data('Delhi'))['city'],
+                             'Delhi')
+            self.assertEqual(client.get_forecast_data('Mumbai')['city']['name'], 'Mumbai')
+            self.assertEqual(list(client.get_weather_data_batch(registry.names())),
+                             registry.names())
+            self.assertEqual(server.request_counts.get('group'), 1)
+        finally:
+            client.close()
+            server.stop()
+
+        # IDs outside any registry get a synthetic city rather than a 404
+        self.assertEqual(self.server.name_for(424242), 'City 424242')
+        print("✓ Registry ID stub test passed")
+
+    def test_batched_payloads_parse_like_single_requests(self):
+        """Split group responses parse into the same dicts as /weather"""
+        self.client.get_weather_data_batch(self.cities[:5])
+        batch = self.client.get_weather_data_batch(self.cities[:5])
+
+        for city in self.cities[:5]:
+            single = self.client.parse_weather_data(self.client.get_weather_data(city))
+            batched = self.client.parse_weather_data(batch[city])
+            self.assertEqual(batched.keys(), single.keys())
+            self.assertEqual(batched['city'], city)
+            self.assertEqual(batched['temp'], single['temp'])
+        print("✓ Batched parsing test passed")
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_700_000_000.0
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, 'responses.json')
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = self._client()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_dir.cleanup()
+
+    def _client(self):
+        cache = ResponseCache(path=self.cache_path, clock=lambda: self.now)
+        return OpenWeatherMapClient(
+            base_url=f"http://127.0.0.1:{self.server.server_port}", cache=cache)
+
+    def test_forecast_served_from_memory_within_ttl(self):
+        """Repeated forecast lookups within the TTL skip the network"""
+        for _ in range(5):
+            self.client.get_forecast_data('Delhi')
+        stats = self.client.get_connection_stats()
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['cache_hits'], 4)
+
+        # Forecast entries expire on the provider's 3 hour update boundary
+        entry = next(iter(self.client.cache.entries.values()))
+        self.assertEqual(entry['expires_at'] % (3 * 3600), 0)
+        print("✓ Forecast cache test passed")
+
+    def test_revalidation_and_persistence(self):
+        """Expired entries revalidate with ETag and survive a restart"""
+        self.client.get_weather_data('Delhi')
+        self.client.close()
+
+        self.now += 3600
+        self.client = self._client()
+        data = self.client.get_weather_data('Delhi')
+
+        self.assertEqual(data['name'], 'Delhi')
+        self.assertEqual(self.client.get_connection_stats()['cache_revalidated'], 1)
+        self.client.get_weather_data('Delhi')
+        self.assertEqual(self.client.get_connection_stats()['requests'], 1)
+        print("✓ Cache revalidation test passed")
+
+class TestForecastColumns(unittest.TestCase):
+    def test_columnar_parser_matches_dict_parser(self):
+        """Typed column arrays carry the same values as the per-slot dicts"""
+        client = OpenWeatherMapClient(use_cache=False)
+        payload = forecast_payload('Chennai')
+        slots = client.parse_forecast_data(payload)
+        columns = client.parse_forecast_columns(payload)
+
+        self.assertEqual(str(columns['dt'].dtype), 'int64')
+        self.assertEqual(str(columns['temp'].dtype), 'float32')
+        self.assertEqual(list(columns['main']), [s['main'] for s in slots])
+        self.assertEqual(list(pd.to_datetime(columns['date_time'])), [s['date_time'] for s in slots])
+        for name in ('temp', 'humidity', 'pop', 'rain_3h'):
+            for value, slot in zip(columns[name], slots):
+                self.assertAlmostEqual(float(value), slot[name], places=4)
+
+        processor = WeatherDataProcessor()
+        processor.add_forecast_data('dicts', slots)
+        processor.add_forecast_data('columns', columns)
+        from_dicts = processor.get_forecast_summary('dicts')
+        from_columns = processor.get_forecast_summary('columns')
+        self.assertEqual([s['date'] for s in from_columns], [s['date'] for s in from_dicts])
+        self.assertAlmostEqual(from_columns[0]['avg_temp'], from_dicts[0]['avg_temp'], places=4)
+        print("✓ Columnar forecast parser test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import DatabaseManager
+
+def summary(day, avg_temp):
+    return {'date': day, 'avg_temp': avg_temp, 'max_temp': avg_temp + 5, 'min_temp': avg_temp - 5,
+            'dominant_weather': 'Clear', 'dominant_wind_direction': 'N'}
+
+class TestSummaryArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmp.name, 'weather.db')}")
+        self.start, self.end = date(2024, 1, 1), date(2024, 6, 15)
+        days = [self.start + timedelta(days=i) for i in range((self.end - self.start).days + 1)]
+        self.db.save_daily_summaries([(city, summary(day, day.toordinal() % 40))
+                                      for city in ('Delhi', 'Mumbai') for day in days])
+        self.db.save_daily_summary('Chennai', summary(date(2024, 2, 10), 29))
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.db.archive.dispose()
+        self.tmp.cleanup()
+
+    def _hot_count(self, before):
+        with self.db.engine.connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM daily_weather_summary WHERE date < :d"),
+                                {'d': before.isoformat()}).scalar()
+
+    def test_closed_months_move_to_archive(self):
+        """Old months leave the hot table; range reads span both stores unchanged"""
+        before = [(s.city, s.date, s.avg_temp) for s in self.db.get_daily_summaries(self.start, self.end)]
+        frame_before = self.db.get_summary_frame(self.start, self.end, columns=['avg_temp'])
+
+        archived = self.db.archive_closed_months(keep_months=2, today=date(2024, 6, 15))
+        self.assertEqual(archived, [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)])
+        self.assertEqual(self._hot_count(date(2024, 4, 1)), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'weather.archive',
+                                                    'summaries-2024-02.db')))
+
+        # A fresh manager (no cached rows) routes reads across hot and archive
+        reader = DatabaseManager(str(self.db.engine.url))
+        try:
+            after = [(s.city, s.date, s.avg_temp)
+                     for s in reader.get_daily_summaries(self.start, self.end)]
+            self.assertEqual(after, before)
+            frame = reader.get_summary_frame(self.start, self.end, columns=['avg_temp'])
+            self.assertEqual(list(frame['avg_temp']), list(frame_before['avg_temp']))
+            march = reader.get_city_summaries('Delhi', date(2024, 3, 30), date(2024, 4, 2))
+            self.assertEqual([s.date.day for s in march], [30, 31, 1, 2])
+            self.assertEqual(reader.get_latest_summary('Chennai').date, date(2024, 2, 10))
+        finally:
+            reader.engine.dispose()
+            reader.archive.dispose()
+        self.assertEqual(self.db.archive_closed_months(keep_months=2, today=date(2024, 6, 15)), [])
+        print("✓ Summary archive test passed")
+
+    def test_hot_rows_take_precedence(self):
+        """A late write into an archived month overrides the archived copy until re-archived"""
+        self.db.archive_closed_months(keep_months=2, today=date(2024, 6, 15))
+        day = date(2024, 2, 10)
+        self.db.save_daily_summary('Chennai', summary(day, 33))
+
+        rows = self.db.get_city_summaries('Chennai', date(2024, 2, 1), date(2024, 2, 29))
+        self.assertEqual([(s.date, s.avg_temp) for s in rows], [(day, 33)])
+        frame = self.db.get_summary_frame(day, day, columns=['city', 'avg_temp'], cities=['Chennai'])
+        self.assertEqual(list(frame['avg_temp']), [33])
+
+        self.assertEqual(self.db.archive_closed_months(keep_months=2, today=date(2024, 6, 15)),
+                         [date(2024, 2, 1)])
+        self.assertEqual(self._hot_count(date(2024, 4, 1)), 0)
+        frame = self.db.get_summary_frame(day, day, columns=['avg_temp'], cities=['Chennai'])
+        self.assertEqual(list(frame['avg_temp']), [33])
+        print("✓ Archive precedence test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,166 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from datetime import date, datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import backfill
+from src.api_client import OpenWeatherMapClient
+from src.backfill import BackfillJob
+from src.config import API_CALLS_PER_MINUTE, API_CALLS_PER_DAY, BACKFILL_BUDGET_FRACTION
+from src.data_processor import WeatherDataProcessor
+from src.database import DatabaseManager
+from src.stub_server import StubWeatherServer, weather_payload
+
+START = datetime(2024, 9, 1, tzinfo=timezone.utc).timestamp()
+
+def observations(city, days, per_day=24):
+    rows = []
+    client = OpenWeatherMapClient(use_cache=False)
+    for i in range(days * per_day):
+        payload = weather_payload(city, int(START + i * 86400 / per_day))
+        payload['main']['temp'] += i % 7
+        payload['weather'][0]['main'] = ['Clear', 'Rain', 'Clouds'][i % 3 if i % 5 else 0]
+        rows.append(client.parse_weather_data(payload))
+    return rows
+
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmp.name, 'weather.db')}")
+        self.checkpoint_dir = os.path.join(self.tmp.name, 'checkpoint')
+        self.client = OpenWeatherMapClient(use_cache=False)
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def _job(self):
+        return BackfillJob(self.db, date(2024, 9, 1), date(2024, 9, 3),
+                           checkpoint_dir=self.checkpoint_dir)
+
+    def _write_archives(self):
+        rows = observations('Delhi', 3) + observations('Mumbai', 3)
+        rows.sort(key=lambda r: r['dt'])
+        half = len(rows) // 2
+        jsonl_path = os.path.join(self.tmp.name, 'part1.jsonl')
+        with open(jsonl_path, 'w') as f:
+            for row in rows[:half]:
+                f.write(json.dumps(row) + '\n')
+        csv_path = os.path.join(self.tmp.name, 'part2.csv')
+        pd.DataFrame(rows[half:]).to_csv(csv_path, index=False)
+        return rows, [jsonl_path, csv_path]
+
+    def test_archive_backfill_matches_live_summaries(self):
+        """Streamed summaries equal the processor's, even when a day spans files"""
+        rows, paths = self._write_archives()
+        stats = self._job().run_archive(paths, self.client.parse_weather_data)
+        self.assertEqual(stats['summaries'], 6)
+
+        processor = WeatherDataProcessor()
+        for row in rows:
+            processor.add_weather_data(row)
+        for summary in self.db.get_city_summaries('Delhi', date(2024, 9, 1), date(2024, 9, 3)):
+            expected = processor.get_daily_summary('Delhi', summary.date)
+            self.assertAlmostEqual(summary.avg_temp, expected['avg_temp'], places=6)
+            self.assertEqual(summary.max_temp, expected['max_temp'])
+            self.assertEqual(summary.dominant_weather, expected['dominant_weather'])
+            self.assertEqual(summary.wind_direction, expected['dominant_wind_direction'])
+        print("✓ Archive backfill test passed")
+
+    def test_resume_from_checkpoint(self):
+        """An interrupted run resumes without reprocessing finished units"""
+        rows, paths = self._write_archives()
+        with open(paths[1]) as f:
+            csv_content = f.read()
+        with open(paths[1], 'w') as f:
+            f.write('city,dt\n"unterminated')
+
+        stats = self._job().run_archive(paths, self.client.parse_weather_data)
+        self.assertEqual((stats['units'], stats['failed']), (1, 1))
+        # Days span both files, so nothing is written while one has failed
+        self.assertEqual(self.db.get_daily_summaries(date(2024, 9, 1), date(2024, 9, 3)), [])
+
+        with open(paths[1], 'w') as f:
+            f.write(csv_content)
+        stats = self._job().run_archive(paths, self.client.parse_weather_data)
+        self.assertEqual(stats['units'], 1)
+
+        # Aggregates checkpointed from the first file are merged with the second
+        processor = WeatherDataProcessor()
+        for row in rows:
+            processor.add_weather_data(row)
+        summaries = self.db.get_daily_summaries(date(2024, 9, 1), date(2024, 9, 3))
+        self.assertEqual(len(summaries), 6)
+        for summary in summaries:
+            expected = processor.get_daily_summary(summary.city, summary.date)
+            self.assertAlmostEqual(summary.avg_temp, expected['avg_temp'], places=6)
+        print("✓ Backfill resume test passed")
+
+    def test_history_backfill(self):
+        """History windows are fetched concurrently and written per city and day"""
+        server = StubWeatherServer().start()
+        try:
+            client = OpenWeatherMapClient(base_url=server.base_url, use_cache=False,
+                                          history_base_url=server.base_url)
+            stats = self._job().run_history(client, ['Delhi', 'Chennai'])
+        finally:
+            server.stop()
+
+        self.assertEqual(stats['observations'], 2 * 3 * 24)
+        summaries = self.db.get_daily_summaries(date(2024, 9, 1), date(2024, 9, 3))
+        self.assertEqual([(s.city, s.date.day) for s in summaries],
+                         [(c, d) for d in (1, 2, 3) for c in ('Chennai', 'Delhi')])
+        print("✓ History backfill test passed")
+
+    def test_failing_unit_does_not_block_the_rest(self):
+        """A city the history API always rejects is recorded, retried, then skippable"""
+        server = StubWeatherServer().start()
+        calls = []
+        try:
+            client = OpenWeatherMapClient(base_url=server.base_url, use_cache=False,
+                                          history_base_url=server.base_url)
+            get_history_data = client.get_history_data
+            def history(city, start, end):
+                calls.append(city)
+                if city == 'Nowhere':
+                    raise ValueError("404 Client Error: city not found")
+                return get_history_data(city, start, end)
+            client.get_history_data = history
+
+            stats = self._job().run_history(client, ['Nowhere', 'Delhi'])
+            self.assertEqual((stats['units'], stats['failed']), (1, 1))
+            summaries = self.db.get_daily_summaries(date(2024, 9, 1), date(2024, 9, 3))
+            self.assertEqual([s.city for s in summaries], ['Delhi'] * 3)
+
+            calls.clear()
+            stats = self._job().run_history(client, ['Nowhere', 'Delhi'])
+            self.assertEqual((calls, stats['failed']), (['Nowhere'], 1))
+
+            calls.clear()
+            job = BackfillJob(self.db, date(2024, 9, 1), date(2024, 9, 3),
+                              checkpoint_dir=self.checkpoint_dir, skip_failed=True)
+            stats = job.run_history(client, ['Nowhere', 'Delhi'])
+            self.assertEqual((calls, stats['units'], stats['failed']), ([], 0, 0))
+        finally:
+            server.stop()
+        print("✓ Failed backfill unit test passed")
+
+    def test_history_budget_is_a_share_of_the_plan(self):
+        """The backfill CLI leaves most of the API budget to the running monitor"""
+        argv = ['--start', '2024-09-01', '--end', '2024-09-03', '--history']
+        args = backfill.parse_args(argv)
+        self.assertEqual(args.calls_per_minute, int(API_CALLS_PER_MINUTE * BACKFILL_BUDGET_FRACTION))
+        self.assertEqual(args.calls_per_day, int(API_CALLS_PER_DAY * BACKFILL_BUDGET_FRACTION))
+        self.assertLess(args.calls_per_minute, API_CALLS_PER_MINUTE)
+
+        args = backfill.parse_args(argv + ['--calls-per-minute', '5', '--calls-per-day', '500'])
+        self.assertEqual((args.calls_per_minute, args.calls_per_day), (5, 500))
+        print("✓ Backfill API budget test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
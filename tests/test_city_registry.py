@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.city_registry import CityRegistry, City, shard_for
+from src.api_client import OpenWeatherMapClient
+
+class TestCityRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_load_csv_and_json(self):
+        """CSV and JSON registries load IDs, coordinates, country and tier"""
+        csv_path = self._write('cities.csv',
+                               "name,id,lat,lon,country,tier\n"
+                               "Delhi,1273294,28.6667,77.2167,IN,high\n"
+                               "London,2643743,51.5085,-0.1257,GB,low\n"
+                               "Pune,,,,,\n")
+        json_path = self._write('cities.json', json.dumps([
+            {'name': 'Delhi', 'id': 1273294, 'lat': 28.6667, 'lon': 77.2167,
+             'country': 'IN', 'tier': 'high'},
+        ]))
+
+        registry = CityRegistry.load(csv_path)
+        self.assertEqual(registry.names(), ['Delhi', 'London', 'Pune'])
+        london = registry.get('London')
+        self.assertEqual((london.city_id, london.country, london.tier), (2643743, 'GB', 'low'))
+        pune = registry.get('Pune')
+        self.assertEqual((pune.city_id, pune.country, pune.tier), (None, 'IN', 'high'))
+        self.assertEqual(CityRegistry.load(json_path).get('Delhi').lat, 28.6667)
+        print("✓ City registry loading test passed")
+
+    def test_shards_are_stable_and_disjoint(self):
+        """Every city belongs to exactly one shard, independent of hash seed"""
+        registry = CityRegistry(City(f"City{i}") for i in range(1000))
+        shards = [registry.shard(i, 4) for i in range(4)]
+
+        names = [name for shard in shards for name in shard.names()]
+        self.assertEqual(sorted(names), sorted(registry.names()))
+        self.assertTrue(all(150 < len(shard) < 350 for shard in shards))
+        self.assertEqual(shard_for('Delhi', 4), shard_for('Delhi', 4))
+        print("✓ City sharding test passed")
+
+    def test_client_uses_registry_ids_and_countries(self):
+        """Requests use the city ID when known and the registry country otherwise"""
+        client = OpenWeatherMapClient(use_cache=False)
+        client.register_cities(CityRegistry([City('Delhi', city_id=1273294),
+                                             City('London', country='GB')]))
+        self.assertEqual(client._location_params('Delhi'), {'id': 1273294})
+        self.assertEqual(client._location_params('London'), {'q': 'London,GB'})
+        self.assertEqual(client._location_params('Pune'), {'q': 'Pune,IN'})
+        print("✓ Registry-aware client test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
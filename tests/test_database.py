@@ -0,0 +1,198 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+from sqlalchemy import event, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import DatabaseManager, DailyWeatherSummary
+
+def summary(day, avg_temp, weather='Clear'):
+    return {'date': day, 'avg_temp': avg_temp, 'max_temp': avg_temp + 5,
+            'min_temp': avg_temp - 5, 'dominant_weather': weather,
+            'dominant_wind_direction': 'N', 'detailed_description': weather.lower()}
+
+class TestDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(self.tmp.name, 'weather.db')}")
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def _statements(self, func):
+        """First keyword of each statement run by func, leaving out the summary version counter"""
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'summary_version' not in statement:
+                statements.append(statement.split()[0].upper())
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        try:
+            func()
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+        return statements
+
+    def test_bulk_upsert_single_statement(self):
+        """A cycle's summaries are upserted in one INSERT, without reading rows back"""
+        day = date(2024, 9, 1)
+        self.db.save_daily_summaries([('Delhi', summary(day, 30)), ('Mumbai', summary(day, 28))])
+
+        batch = [('Delhi', summary(day, 32, 'Rain')), ('Chennai', summary(day, 31))]
+        statements = self._statements(lambda: self.db.save_daily_summaries(batch))
+        self.assertEqual(statements.count('INSERT'), 1)
+        self.assertNotIn('SELECT', statements)
+        self.assertNotIn('UPDATE', statements)
+
+        rows = {s.city: s for s in self.db.get_daily_summaries(day, day)}
+        self.assertEqual(sorted(rows), ['Chennai', 'Delhi', 'Mumbai'])
+        self.assertEqual(rows['Delhi'].avg_temp, 32)
+        self.assertEqual(rows['Delhi'].dominant_weather, 'Rain')
+        self.assertEqual(rows['Delhi'].description, 'rain')
+        self.assertEqual(rows['Mumbai'].avg_temp, 28)
+        print("✓ Bulk summary upsert test passed")
+
+    def test_single_save_updates_in_place(self):
+        """save_daily_summary upserts on (city, date) rather than adding rows"""
+        day = date(2024, 9, 1)
+        self.db.save_daily_summary('Delhi', summary(day, 30))
+        self.db.save_daily_summary('Delhi', summary(day, 33))
+        rows = self.db.get_city_summaries('Delhi', day, day)
+        self.assertEqual([(r.city, r.avg_temp) for r in rows], [('Delhi', 33)])
+        print("✓ Single summary upsert test passed")
+
+    def test_summary_cache_refreshes_written_rows(self):
+        """Repeated reads skip SQLite; after a write only the changed rows are selected"""
+        days = [date(2024, 9, d) for d in range(1, 4)]
+        self.db.save_daily_summaries([(city, summary(day, 30))
+                                      for city in ('Delhi', 'Mumbai') for day in days])
+        first = self.db.get_daily_summaries(days[0], days[-1])
+        self.assertEqual(len(first), 6)
+        self.assertEqual(self._statements(lambda: self.db.get_daily_summaries(days[0], days[-1])), [])
+
+        self.db.save_daily_summaries([('Delhi', summary(days[-1], 34)),
+                                      ('Chennai', summary(days[-1], 31))])
+        parameters = []
+        def record(conn, cursor, statement, params, context, executemany):
+            if 'summary_version' not in statement:
+                parameters.append(params)
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        try:
+            refreshed = self.db.get_daily_summaries(days[0], days[-1])
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+        self.assertEqual(len(parameters), 1)
+        self.assertIn('Chennai', parameters[0])
+        self.assertNotIn('Mumbai', parameters[0])
+
+        self.assertEqual(len(refreshed), 7)
+        self.assertEqual([(r.city, r.avg_temp) for r in refreshed if r.date == days[-1]],
+                         [('Chennai', 31), ('Delhi', 34), ('Mumbai', 30)])
+        self.assertEqual(self.db.get_latest_summary('Delhi').avg_temp, 34)
+        self.assertEqual(self.db.cache.stats, {'hits': 1, 'refreshes': 1, 'misses': 2, 'cleared': 0})
+        print("✓ Summary cache test passed")
+
+    def test_cache_sees_writes_from_other_processes(self):
+        """A write through another manager (e.g. backfill.py) empties this process's cache"""
+        day = date(2024, 9, 1)
+        self.db.save_daily_summaries([('Delhi', summary(day, 30))])
+        self.assertEqual(self.db.get_city_summaries('Delhi', day, day)[0].avg_temp, 30)
+        self.assertEqual(self.db.get_latest_summary('Delhi').avg_temp, 30)
+        self.db.save_daily_summaries([('Mumbai', summary(day, 28))])  # Own writes keep the cache
+        self.assertEqual(self.db.get_city_summaries('Delhi', day, day)[0].avg_temp, 30)
+        self.assertEqual(self.db.cache.stats['cleared'], 0)
+
+        other = DatabaseManager(str(self.db.engine.url))
+        try:
+            other.save_daily_summaries([('Delhi', summary(day, 35))])
+        finally:
+            other.engine.dispose()
+        self.assertEqual(self.db.get_city_summaries('Delhi', day, day)[0].avg_temp, 35)
+        self.assertEqual(self.db.get_latest_summary('Delhi').avg_temp, 35)
+        self.assertEqual(self.db.cache.stats['cleared'], 1)
+        print("✓ Cross-process cache test passed")
+
+    def test_summary_frame_projection(self):
+        """The Core read path selects only the requested columns into typed arrays"""
+        self.db.engine.dispose()
+        self.db = DatabaseManager(str(self.db.engine.url), cache_summaries=False)
+        days = [date(2024, 9, d) for d in range(1, 4)]
+        self.db.save_daily_summaries([(city, summary(day, 30 + day.day, 'Rain'))
+                                      for city in ('Mumbai', 'Delhi') for day in days])
+        columns = ['date', 'city', 'avg_temp', 'max_temp', 'min_temp']
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(self.db.engine, 'before_cursor_execute', record)
+        try:
+            frame = self.db.get_summary_frame(days[0], days[1], columns=columns)
+        finally:
+            event.remove(self.db.engine, 'before_cursor_execute', record)
+        self.assertNotIn('dominant_weather', statements[0])
+
+        self.assertEqual(list(frame.columns), columns)
+        self.assertEqual(frame['date'].dtype.kind, 'M')
+        self.assertEqual(frame['avg_temp'].dtype, np.float64)
+        self.assertEqual(frame['city'].dtype, 'category')
+        self.assertEqual(list(frame['city']), ['Delhi', 'Mumbai'] * 2)
+        expected = self.db.get_daily_summaries(days[0], days[1])
+        self.assertEqual(list(frame['avg_temp']), [s.avg_temp for s in expected])
+
+        arrays = self.db.get_summary_columns(days[2], days[2], columns=['city'], cities=['Delhi'])
+        self.assertEqual(list(arrays['city']), ['Delhi'])
+        self.assertTrue(self.db.get_summary_frame(date(2025, 1, 1), date(2025, 1, 2)).empty)
+        print("✓ Summary frame test passed")
+
+    def test_summary_frame_uses_cache(self):
+        """With the cache on, repeated frame reads skip SQLite and pick up written rows"""
+        days = [date(2024, 9, d) for d in range(1, 4)]
+        self.db.save_daily_summaries([(city, summary(day, 30))
+                                      for city in ('Mumbai', 'Delhi') for day in days])
+        columns = ['date', 'city', 'avg_temp']
+        first = self.db.get_summary_frame(days[0], days[-1], columns=columns)
+        self.assertEqual(len(first), 6)
+        # The cache is filled from Core rows, without building ORM objects
+        row = self.db.get_daily_summaries(days[0], days[-1])[0]
+        self.assertNotIsInstance(row, DailyWeatherSummary)
+        self.assertEqual((row.city, row.date, row.avg_temp), ('Delhi', days[0], 30))
+        self.assertEqual(list(first.columns), columns)
+        self.assertEqual(first['date'].dtype.kind, 'M')
+        self.assertEqual(first['city'].dtype, 'category')
+        self.assertEqual(self._statements(
+            lambda: self.db.get_summary_frame(days[0], days[-1], columns=columns)), [])
+
+        self.db.save_daily_summaries([('Delhi', summary(days[-1], 34))])
+        frame = self.db.get_summary_frame(days[0], days[-1], columns=columns)
+        self.assertEqual(list(frame['avg_temp'][frame['date'] == np.datetime64(days[-1])]), [34, 30])
+        delhi = self.db.get_summary_columns(days[0], days[-1], columns=['avg_temp'], cities=['Delhi'])
+        self.assertEqual(list(delhi['avg_temp']), [30, 30, 34])
+        self.assertEqual(self.db.cache.stats, {'hits': 2, 'refreshes': 1, 'misses': 2, 'cleared': 0})
+        print("✓ Cached summary frame test passed")
+
+    def test_readers_not_blocked_by_writer(self):
+        """WAL mode lets a dashboard read while an ingestion transaction is open"""
+        day = date(2024, 9, 1)
+        self.db.save_daily_summary('Delhi', summary(day, 30))
+        with self.db.engine.connect() as conn:
+            self.assertEqual(conn.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(conn.execute(text('PRAGMA synchronous')).scalar(), 1)  # NORMAL
+
+        writer = self.db.Session()
+        try:
+            writer.execute(text("UPDATE daily_weather_summary SET avg_temp = 35"))
+            # The uncommitted write holds the lock; the read still sees the last commit
+            rows = self.db.get_city_summaries('Delhi', day, day)
+            self.assertEqual(rows[0].avg_temp, 30)
+            writer.commit()
+        finally:
+            writer.close()
+        self.assertEqual(self.db.get_latest_summary('Delhi').avg_temp, 35)
+        print("✓ Concurrent read test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
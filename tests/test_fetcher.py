@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetcher import ConcurrentFetcher
+
+class TestConcurrentFetcher(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = ConcurrentFetcher(max_workers=4)
+
+    def tearDown(self):
+        self.fetcher.shutdown()
+
+    def test_fetches_overlap_and_keep_order(self):
+        """Cycle time scales with the slowest city, results keep city order"""
+        cities = ['Delhi', 'Mumbai', 'Chennai', 'Kolkata']
+        delays = {'Delhi': 0.3, 'Mumbai': 0.1, 'Chennai': 0.2, 'Kolkata': 0.05}
+
+        def fetch(city):
+            time.sleep(delays[city])
+            return {'name': city}
+
+        start = time.monotonic()
+        results = self.fetcher.fetch_all(fetch, cities)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual([city for city, _, _ in results], cities)
+        self.assertEqual([data['name'] for _, data, _ in results], cities)
+        self.assertLess(elapsed, sum(delays.values()))
+        print("✓ Concurrent fetch test passed")
+
+    def test_concurrency_limit_and_errors(self):
+        """At most max_workers fetches run at once and errors stay per city"""
+        lock = threading.Lock()
+        active = {'now': 0, 'peak': 0}
+
+        def fetch(city):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            if city == 'Bad':
+                raise ValueError("city not found")
+            return city
+
+        cities = ['A', 'B', 'Bad', 'C', 'D', 'E', 'F', 'G']
+        results = self.fetcher.fetch_all(fetch, cities)
+
+        self.assertLessEqual(active['peak'], 4)
+        errors = {city: error for city, _, error in results if error is not None}
+        self.assertEqual(list(errors), ['Bad'])
+        self.assertIsInstance(errors['Bad'], ValueError)
+        print("✓ Concurrency limit test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
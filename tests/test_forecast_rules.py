@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processor import WeatherDataProcessor
+from src.forecast_rules import ForecastRuleEngine, sustained
+
+START = datetime(2024, 6, 1)
+
+def forecast(city, temps, rain=None):
+    rain = rain or [0] * len(temps)
+    return [{'city': city, 'dt': i, 'date_time': START + timedelta(hours=3 * i),
+             'main': 'Clear', 'temp': temp, 'humidity': 40, 'wind_speed': 5,
+             'pop': 0, 'rain_3h': r, 'snow_3h': 0}
+            for i, (temp, r) in enumerate(zip(temps, rain))]
+
+class TestForecastRules(unittest.TestCase):
+    def test_default_rules_across_cities(self):
+        """Configured rules produce one table for all cities and the old messages"""
+        processor = WeatherDataProcessor()
+        processor.add_forecast_data('Delhi', forecast('Delhi', [30] * 8 + [36] * 8))
+        processor.add_forecast_data('Mumbai', forecast('Mumbai', [30] * 16, rain=[0, 12] + [0] * 14))
+        processor.add_forecast_data('Chennai', forecast('Chennai', [30] * 16))
+
+        alerts = processor.get_forecast_alerts()
+        self.assertEqual(list(zip(alerts['city'], alerts['type'], alerts['date'])),
+                         [('Delhi', 'High Temperature', date(2024, 6, 2)),
+                          ('Mumbai', 'Heavy Rain', date(2024, 6, 1))])
+        self.assertEqual(alerts['peak'].tolist(), [36, 12])
+
+        self.assertEqual(processor.get_weather_alerts('Delhi'), [{
+            'type': 'High Temperature',
+            'description': 'Temperatures above 35°C expected on 2024-06-02'}])
+        self.assertEqual(processor.get_weather_alerts('Chennai'), [])
+        print("✓ Vectorized forecast alert test passed")
+
+    def test_unknown_names_rejected(self):
+        """A misspelled metric or override fails at load time instead of never firing"""
+        rule = {'name': 'Heavy Rain', 'metric': 'rain_3h', 'comparator': '>', 'threshold': 10}
+        with self.assertRaisesRegex(ValueError, "rain3h"):
+            ForecastRuleEngine.from_config([dict(rule, metric='rain3h')], {})
+        with self.assertRaisesRegex(ValueError, "Heavy Rian"):
+            ForecastRuleEngine.from_config([rule], {'Chennai': {'Heavy Rian': {'threshold': 5}}})
+        with self.assertRaisesRegex(ValueError, "threshold"):
+            ForecastRuleEngine.from_config([rule], {'Chennai': {'Heavy Rain': {'metric': 'pop'}}})
+        engine = ForecastRuleEngine.from_config([rule], {'Chennai': {'Heavy Rain': {'threshold': 5}}})
+        self.assertEqual(engine.rules[0].overrides, {'Chennai': 5})
+        print("✓ Forecast rule validation test passed")
+
+    def test_overrides_and_windows(self):
+        """Per-city thresholds apply, and sustained windows never span two cities"""
+        rules = [{'name': 'Heatwave', 'metric': 'temp', 'comparator': '>=', 'threshold': 40,
+                  'window': 3}]
+        engine = ForecastRuleEngine.from_config(rules, {'Delhi': {'Heatwave': {'threshold': 35}}})
+        stacked = pd.DataFrame({
+            'city': ['Delhi'] * 4 + ['Mumbai'] * 4,
+            'date_time': [START + timedelta(hours=3 * i) for i in range(8)],
+            'temp': [30, 36, 37, 38, 41, 41, 30, 41],
+        })
+        stacked['date'] = stacked['date_time'].dt.date
+        alerts = engine.evaluate(stacked)
+        self.assertEqual(alerts['city'].tolist(), ['Delhi'])
+        self.assertEqual(alerts['slots'].tolist(), [3])
+        self.assertEqual(alerts['threshold'].tolist(), [35])
+
+        mask = np.array([True, True, False, True, True, True])
+        groups = np.array([0, 0, 0, 0, 1, 1])
+        self.assertEqual(sustained(mask, groups, 2).tolist(),
+                         [True, True, False, False, True, True])
+        print("✓ Alert override and window test passed")
+
+if __name__ == '__main__':
+    unittest.main()
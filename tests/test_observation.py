@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api_client import OpenWeatherMapClient
+from src.data_processor import WeatherDataProcessor
+from src.observation import Observation
+from src.stub_server import weather_payload
+
+START = int(datetime(2024, 9, 1, tzinfo=timezone.utc).timestamp())
+
+class TestObservation(unittest.TestCase):
+    def setUp(self):
+        self.client = OpenWeatherMapClient(use_cache=False)
+
+    def test_record_matches_dict(self):
+        """parse_weather_record holds the same values as parse_weather_data"""
+        payload = weather_payload('Delhi', START)
+        payload['rain'] = {'1h': 2.5}
+        record = self.client.parse_weather_record(payload)
+        parsed = self.client.parse_weather_data(payload)
+
+        self.assertIsInstance(record, Observation)
+        # Measures are held at float32 precision
+        expected = {k: float(np.float32(v)) if isinstance(v, float) else v for k, v in parsed.items()}
+        self.assertEqual(record.to_dict(), {k: expected[k] for k in record.keys()})
+        self.assertEqual(record['rain_1h'], 2.5)
+        self.assertEqual(record.get('missing', 0), 0)
+        self.assertFalse(hasattr(record, '__dict__'))
+
+        # Strings from separate payloads end up as one shared object
+        other = self.client.parse_weather_record(weather_payload(''.join(['Del', 'hi']), START + 600))
+        self.assertIs(record.city, other.city)
+        self.assertIs(record.main, other.main)
+        print("✓ Observation record test passed")
+
+    def test_processor_accepts_records_and_dicts(self):
+        """Records and dicts give the same summary; the store keeps float32 readings"""
+        from_records, from_dicts = WeatherDataProcessor(), WeatherDataProcessor()
+        for i in range(24):
+            payload = weather_payload('Delhi', START + i * 3600)
+            payload['main']['temp'] += i * 0.1
+            from_records.add_weather_data(self.client.parse_weather_record(payload))
+            from_dicts.add_weather_data(self.client.parse_weather_data(payload))
+
+        day = datetime(2024, 9, 1).date()
+        self.assertEqual(from_records.get_daily_summary('Delhi', day),
+                         from_dicts.get_daily_summary('Delhi', day))
+        buffer = from_records.current_data['Delhi']
+        self.assertEqual(buffer.column('temp').dtype, np.float32)
+        self.assertEqual(buffer.column('dt').dtype, np.int64)
+        print("✓ Observation processor test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
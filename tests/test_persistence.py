@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api_client import OpenWeatherMapClient
+from src.database import DatabaseManager
+from src.persistence import WriteBehindQueue, database_writer
+from src.stub_server import weather_payload
+
+START = 1725148800  # 2024-09-01 00:00 UTC
+
+class TestWriteBehindQueue(unittest.TestCase):
+    def test_batches_by_size_and_time(self):
+        """Full batches are written at once; a partial one after flush_interval"""
+        batches = []
+        writer = WriteBehindQueue(batches.append, batch_size=4, flush_interval=0.2).start()
+        try:
+            for i in range(10):
+                writer.put(i)
+            deadline = time.monotonic() + 2
+            while sum(map(len, batches)) < 10 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            writer.stop()
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertEqual(writer.stats['written'], 10)
+        print("✓ Write-behind batching test passed")
+
+    def test_backpressure_when_full(self):
+        """put() blocks once max_pending items are waiting on a slow writer"""
+        release = threading.Event()
+        batches = []
+        def slow_write(batch):
+            release.wait()
+            batches.append(batch)
+
+        writer = WriteBehindQueue(slow_write, batch_size=1, flush_interval=0.01,
+                                  max_pending=2).start()
+        writer.put('a')  # Taken by the writer, which then stalls
+        time.sleep(0.05)
+        writer.put('b')
+        writer.put('c')
+        with self.assertRaises(queue.Full):
+            writer.put('d', timeout=0.05)
+        self.assertEqual(writer.stats['blocked'], 1)
+
+        release.set()
+        writer.put('d', timeout=1)
+        writer.stop()
+        self.assertEqual(batches, [['a'], ['b'], ['c'], ['d']])
+        print("✓ Write-behind backpressure test passed")
+
+    def test_observations_persisted(self):
+        """Queued readings land in weather_observation keyed by (city, dt)"""
+        tmp = tempfile.TemporaryDirectory()
+        db = DatabaseManager(f"sqlite:///{os.path.join(tmp.name, 'weather.db')}")
+        client = OpenWeatherMapClient(use_cache=False)
+        writer = WriteBehindQueue(db.save_observations, batch_size=50).start()
+        try:
+            for i in range(120):
+                record = client.parse_weather_record(weather_payload('Delhi', START + i * 600))
+                writer.put(record.to_dict())
+            writer.put(record.to_dict())  # Re-sent reading is skipped
+            writer.flush()
+            rows = db.get_observations('Delhi', START, START + 86400)
+            self.assertEqual(len(rows), 120)
+            self.assertEqual(rows[-1].dt, record.dt)
+            self.assertEqual(rows[-1].temp, record.temp)
+            self.assertEqual(writer.stats['errors'], 0)
+        finally:
+            writer.stop()
+            db.engine.dispose()
+            tmp.cleanup()
+        print("✓ Observation persistence test passed")
+
+    def test_coalesce_and_flush_on_stop(self):
+        """Repeat updates to a key within the window merge; stop() writes what is pending"""
+        written = {'summary': [], 'observation': []}
+        writer = WriteBehindQueue({kind: written[kind].append for kind in written},
+                                  flush_interval=60).start()
+        for temp in (30, 31, 32):
+            writer.put(('Delhi', temp), kind='summary', key=('Delhi', '2024-09-01'))
+        writer.put(('Mumbai', 28), kind='summary', key=('Mumbai', '2024-09-01'))
+        writer.put({'dt': 1}, kind='observation')
+        writer.put({'dt': 1}, kind='observation')
+        with self.assertRaises(KeyError):
+            writer.put({}, kind='unknown')
+
+        writer.stop()  # Long before the flush window ends
+        self.assertEqual(written['summary'], [[('Delhi', 32), ('Mumbai', 28)]])
+        self.assertEqual(written['observation'], [[{'dt': 1}, {'dt': 1}]])
+        self.assertEqual(writer.stats['coalesced'], 2)
+        print("✓ Write coalescing test passed")
+
+    def test_database_writer(self):
+        """One writer thread persists coalesced summaries and observations"""
+        tmp = tempfile.TemporaryDirectory()
+        db = DatabaseManager(f"sqlite:///{os.path.join(tmp.name, 'weather.db')}")
+        client = OpenWeatherMapClient(use_cache=False)
+        writer = database_writer(db, flush_interval=60).start()
+        try:
+            day = date(2024, 9, 1)
+            for temp in (30, 34):
+                summary = {'date': day, 'avg_temp': temp, 'max_temp': temp, 'min_temp': temp}
+                writer.put(('Delhi', summary), kind='summary', key=('Delhi', day))
+            record = client.parse_weather_record(weather_payload('Delhi', START))
+            writer.put(record.to_dict(), kind='observation', key=('Delhi', record.dt))
+            writer.stop()
+
+            self.assertEqual([s.avg_temp for s in db.get_city_summaries('Delhi', day, day)], [34])
+            self.assertEqual(len(db.get_observations('Delhi', START, START + 1)), 1)
+            self.assertEqual(writer.stats['errors'], 0)
+        finally:
+            writer.stop()
+            db.engine.dispose()
+            tmp.cleanup()
+        print("✓ Database writer test passed")
+
+    def test_archive_runs_on_writer_thread(self):
+        """call() runs archiving after the queued writes, on the writer thread"""
+        tmp = tempfile.TemporaryDirectory()
+        db = DatabaseManager(f"sqlite:///{os.path.join(tmp.name, 'weather.db')}")
+        writer = database_writer(db, flush_interval=60).start()
+        threads = []
+        def archive(**options):
+            threads.append(threading.current_thread())
+            return db.archive_closed_months(**options)
+        try:
+            for day in (date(2024, 1, 15), date(2024, 6, 15)):
+                summary = {'date': day, 'avg_temp': 30, 'max_temp': 30, 'min_temp': 30}
+                writer.put(('Delhi', summary), kind='summary', key=('Delhi', day))
+            archived = writer.call(archive, keep_months=2, today=date(2024, 6, 15))
+            self.assertEqual(archived, [date(2024, 1, 1)])
+            self.assertEqual(threads, [writer.thread])
+
+            with self.assertRaises(ZeroDivisionError):
+                writer.call(lambda: 1 / 0)
+            writer.stop()
+            self.assertEqual(writer.call(len, [1, 2]), 2)  # Inline once stopped
+
+            rows = db.get_city_summaries('Delhi', date(2024, 1, 1), date(2024, 6, 30))
+            self.assertEqual([s.date for s in rows], [date(2024, 1, 15), date(2024, 6, 15)])
+            self.assertEqual(writer.stats['errors'], 0)
+        finally:
+            writer.stop()
+            db.engine.dispose()
+            db.archive.dispose()
+            tmp.cleanup()
+        print("✓ Writer-thread archive test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
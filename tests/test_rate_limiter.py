@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rate_limiter import RateLimiter, QuotaDeferred, PRIORITY_HIGH, PRIORITY_LOW
+
+class TestRateLimiter(unittest.TestCase):
+    def test_concurrent_callers_queue_instead_of_failing(self):
+        """Threads sharing a limiter wait for tokens and never overspend"""
+        limiter = RateLimiter(per_minute=600, per_day=10000)
+        for _ in range(590):
+            limiter.acquire()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(limiter.acquire()))
+                   for _ in range(15)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # 10 tokens were left, the other 5 refill at 10 per second
+        self.assertEqual(results, [True] * 15)
+        self.assertGreater(time.monotonic() - start, 0.3)
+        self.assertEqual(limiter.remaining()['day'], 10000 - 605)
+        print("✓ Rate limiter queueing test passed")
+
+    def test_low_priority_yields_minute_reserve(self):
+        """Forecast calls leave the last part of the minute bucket to current weather"""
+        limiter = RateLimiter(per_minute=600, per_day=10000, reserve=0.2)
+        for _ in range(500):
+            limiter.acquire()
+
+        self.assertFalse(limiter.acquire(PRIORITY_LOW, timeout=0.05))
+        self.assertTrue(limiter.acquire(PRIORITY_HIGH, timeout=0.05))
+        print("✓ Rate limiter priority test passed")
+
+    def test_daily_budget_defers_forecasts(self):
+        """Low-priority calls are deferred once the daily budget hits its reserve"""
+        now = [86400 * 100.0]
+        limiter = RateLimiter(per_minute=100, per_day=10, reserve=0.2,
+                              clock=lambda: now[0])
+        for _ in range(8):
+            limiter.acquire(PRIORITY_LOW)
+
+        with self.assertRaises(QuotaDeferred):
+            limiter.acquire(PRIORITY_LOW)
+        self.assertTrue(limiter.acquire(PRIORITY_HIGH))
+        self.assertTrue(limiter.acquire(PRIORITY_HIGH))
+        self.assertFalse(limiter.acquire(PRIORITY_HIGH, timeout=0.01))
+        self.assertEqual(limiter.remaining()['day'], 0)
+
+        now[0] += 86400
+        self.assertEqual(limiter.remaining()['day'], 10)
+        self.assertTrue(limiter.acquire(PRIORITY_LOW))
+        print("✓ Daily budget test passed")
+
+    def test_small_budget_still_serves_low_priority(self):
+        """A per-minute budget too small for the reserve still lets forecasts through"""
+        for per_minute in (1, 1.2):
+            limiter = RateLimiter(per_minute=per_minute, per_day=1000, reserve=0.2)
+            self.assertTrue(limiter.acquire(PRIORITY_LOW, timeout=0.5))
+        with self.assertRaises(ValueError):
+            RateLimiter(per_minute=0.5, per_day=1000)
+        print("✓ Small budget rate limiter test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
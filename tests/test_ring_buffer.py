@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ring_buffer import ObservationBuffer
+from src.data_processor import WeatherDataProcessor
+
+DAY_START = 1704067200  # 2024-01-01 00:00 UTC
+
+def observation(dt, temp, main='Clear', city='TestCity'):
+    return {'city': city, 'temp': temp, 'feels_like': temp, 'main': main,
+            'description': main.lower(), 'humidity': 50, 'pressure': 1010,
+            'wind_speed': 3.0, 'wind_direction': 90, 'clouds': 10,
+            'visibility': 10000, 'rain_1h': 0, 'snow_1h': 0, 'dt': dt}
+
+class TestObservationBuffer(unittest.TestCase):
+    def test_frames_are_zero_copy_views(self):
+        """Frames wrap the buffer's arrays instead of copying them"""
+        buffer = ObservationBuffer(capacity=8)
+        for i in range(5):
+            buffer.append(observation(DAY_START + i * 600, 20 + i))
+
+        frame = buffer.frame()
+        self.assertTrue(np.shares_memory(frame['temp'].to_numpy(), buffer.columns['temp']))
+        self.assertTrue(np.shares_memory(frame['main'].cat.codes.to_numpy(), buffer.columns['main']))
+        self.assertEqual(list(frame['temp']), [20, 21, 22, 23, 24])
+        self.assertEqual(list(frame['main']), ['Clear'] * 5)
+        print("✓ Zero-copy frame test passed")
+
+    def test_capacity_is_a_ceiling(self):
+        """Appending past capacity overwrites the oldest rows"""
+        buffer = ObservationBuffer(capacity=4, initial_rows=2)
+        for i in range(10):
+            buffer.append(observation(DAY_START + i * 600, i))
+
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.rows, 4)
+        self.assertEqual(list(buffer.frame()['temp']), [6, 7, 8, 9])
+        self.assertEqual(list(buffer.since(DAY_START + 7 * 600)['temp']), [8, 9])
+
+        self.assertEqual(buffer.drop_through(DAY_START + 7 * 600), 2)
+        self.assertEqual(list(buffer.frame()['temp']), [8, 9])
+        print("✓ Ring buffer capacity test passed")
+
+    def test_storage_holds_one_copy_per_row(self):
+        """A rolling window moves rows back to the front instead of growing storage"""
+        buffer = ObservationBuffer(capacity=64, initial_rows=16)
+        for i in range(40):
+            buffer.append(observation(DAY_START + i * 600, i))
+        rows = buffer.rows
+        for i in range(40, 400):
+            buffer.append(observation(DAY_START + i * 600, i))
+            buffer.drop_through(DAY_START + (i - 40) * 600)
+
+        self.assertEqual(buffer.rows, rows)
+        self.assertEqual(buffer.nbytes, rows * sum(values.itemsize for values in buffer.columns.values()))
+        self.assertEqual(list(buffer.frame()['temp']), list(range(360, 400)))
+        print("✓ Single-copy storage test passed")
+
+    def test_retention_drops_whole_days(self):
+        """Expired days leave the buffer whole; only dropped aggregates count as freed bytes"""
+        processor = WeatherDataProcessor()
+        now = int(time.time())
+        for hours_ago in range(10 * 24, -1, -6):
+            processor.add_weather_data(observation(now - hours_ago * 3600, 20))
+        buffer = processor.current_data['TestCity']
+        before, storage = len(buffer), buffer.nbytes
+
+        stats = processor.clear_old_data(days=3)
+        cutoff_day = (now - 3 * 86400) // 86400
+        kept = buffer.column('dt')
+        self.assertEqual(stats['rows'], before - len(buffer))
+        self.assertEqual(int(kept.min()) // 86400, cutoff_day)
+        # Buffer slots are reused, not released; only dropped aggregates free memory
+        self.assertEqual(buffer.nbytes, storage)
+        self.assertGreater(stats['bytes_freed'], 0)
+        self.assertEqual(min(processor.daily_aggregates['TestCity']),
+                         date(1970, 1, 1) + timedelta(days=cutoff_day))
+        # Hourly rollups outlive raw rows under their own 14-day retention
+        self.assertEqual(len(processor.get_rollups('1h', 'TestCity')), 41)
+        print("✓ Partitioned retention test passed")
+
+    def test_recent_view_slices_without_copying(self):
+        """The cross-city view exposes per-city slices and a cached datetime column"""
+        processor = WeatherDataProcessor()
+        now = int(time.time())
+        for hours_ago in (30, 20, 10, 1):
+            processor.add_weather_data(observation(now - hours_ago * 3600, hours_ago, city='Delhi'))
+        processor.add_weather_data(observation(now - 2 * 3600, 5, 'Rain', city='Mumbai'))
+        processor.add_weather_data(observation(now - 40 * 3600, 5, 'Rain', city='Chennai'))
+
+        view = processor.get_recent_view(hours=24)
+        self.assertEqual(view.cities, ['Delhi', 'Mumbai'])
+        self.assertEqual(len(view), 4)
+        temps = view.column('Delhi', 'temp')
+        self.assertEqual(list(temps), [20, 10, 1])
+        self.assertTrue(np.shares_memory(temps, processor.current_data['Delhi'].columns['temp']))
+
+        times = view.column('Delhi', 'datetime')
+        self.assertIs(view.column('Delhi', 'datetime'), times)
+        self.assertTrue(np.shares_memory(times, processor.current_data['Delhi'].columns['dt']))
+        self.assertEqual(view.value_counts('main').to_dict(), {'Clear': 3, 'Rain': 1})
+
+        frame = processor.get_recent_data(hours=24)
+        self.assertEqual(list(frame['temp']), [20, 10, 1, 5])
+        self.assertNotIn('datetime', frame.columns)
+        print("✓ Recent data view test passed")
+
+    def test_daily_summary_uses_only_that_day(self):
+        """Daily summary selects the UTC day from the buffer"""
+        processor = WeatherDataProcessor()
+        processor.add_weather_data(observation(DAY_START - 600, 99, 'Rain'))
+        for i, main in enumerate(['Clouds', 'Clear', 'Clear']):
+            processor.add_weather_data(observation(DAY_START + i * 3600, 20 + i, main))
+        processor.add_weather_data(observation(DAY_START + 86400, 99, 'Rain'))
+
+        summary = processor.get_daily_summary('TestCity', date(2024, 1, 1))
+        self.assertEqual(summary['avg_temp'], 21.0)
+        self.assertEqual(summary['max_temp'], 22.0)
+        self.assertEqual(summary['dominant_weather'], 'Clear')
+        print("✓ Buffered daily summary test passed")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processor import WeatherDataProcessor
+from src.database import DatabaseManager, rollup_tier_for
+
+DAY_START = 1704067200  # 2024-01-01 00:00 UTC
+
+def observation(dt, temp):
+    return {'city': 'Delhi', 'temp': temp, 'feels_like': temp, 'main': 'Clear',
+            'description': 'clear sky', 'humidity': 50, 'pressure': 1010,
+            'wind_speed': 3.0, 'wind_direction': 90, 'clouds': 10,
+            'visibility': 10000, 'rain_1h': 0, 'snow_1h': 0, 'dt': dt}
+
+class TestRollupTiers(unittest.TestCase):
+    def setUp(self):
+        self.db = DatabaseManager('sqlite://')
+        self.processor = WeatherDataProcessor()
+
+    def _ingest(self, start, count, temp):
+        for i in range(count):
+            self.processor.add_weather_data(observation(start + i * 1200, temp))
+        for tier, batch in self.processor.take_dirty_rollups().items():
+            self.db.save_rollups(tier, batch)
+
+    def test_queries_use_the_coarsest_fitting_tier(self):
+        """Two days of 20-minute readings read back as 48, 8 or 2 rows"""
+        self._ingest(DAY_START, 144, 20)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 3)
+
+        self.assertEqual(rollup_tier_for(600), '1h')
+        self.assertEqual(rollup_tier_for(4 * 3600), '1h')
+        self.assertEqual(rollup_tier_for(7 * 86400), '1d')
+        self.assertEqual(len(self.db.get_rollups('Delhi', start, end, 3600)), 48)
+        self.assertEqual(len(self.db.get_rollups('Delhi', start, end, 6 * 3600)), 8)
+        daily = self.db.get_rollups('Delhi', start, end, 86400)
+        self.assertEqual([row.observations for row in daily], [72, 72])
+        print("✓ Rollup tier routing test passed")
+
+    def test_rollups_update_incrementally(self):
+        """Later readings update the open period's row instead of adding one"""
+        self._ingest(DAY_START, 2, 20)
+        self._ingest(DAY_START + 2400, 1, 23)
+        self.assertEqual(self.processor.take_dirty_rollups(), {'1h': [], '6h': [], '1d': []})
+
+        rows = self.db.get_rollups('Delhi', datetime(2024, 1, 1), datetime(2024, 1, 2), 3600)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].observations, 3)
+        self.assertAlmostEqual(rows[0].avg_temp, 21.0)
+        self.assertEqual(rows[0].max_temp, 23)
+        print("✓ Incremental rollup test passed")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scheduler import JobScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = JobScheduler(clock=self.clock, sleep=self.clock.sleep,
+                                      rng=random.Random(42))
+
+    def _run_until(self, end):
+        self.scheduler.run_forever(should_stop=lambda: self.clock.now >= end)
+
+    def test_independent_intervals_without_drift(self):
+        """Each job keeps its own period even when the work takes time"""
+        runs = {'weather': [], 'forecast': []}
+
+        def weather():
+            runs['weather'].append(self.clock.now)
+            self.clock.now += 3  # Slow job must not push later deadlines back
+
+        self.scheduler.add_job('weather', weather, 10)
+        self.scheduler.add_job('forecast', lambda: runs['forecast'].append(self.clock.now), 25)
+        self._run_until(60)
+
+        self.assertEqual(runs['weather'], [0, 10, 20, 30, 40, 50])
+        self.assertEqual(runs['forecast'], [3, 25, 50])
+        self.assertEqual(self.scheduler.get_stats()['weather']['missed'], 0)
+        print("✓ Scheduler drift compensation test passed")
+
+    def test_missed_deadlines_are_counted(self):
+        """Overrunning jobs skip the deadlines they missed"""
+        runs = []
+
+        def slow():
+            runs.append(self.clock.now)
+            if len(runs) == 2:
+                self.clock.now += 35
+
+        self.scheduler.add_job('slow', slow, 10)
+        self._run_until(70)
+
+        self.assertEqual(runs, [0, 10, 50, 60])
+        stats = self.scheduler.get_stats()['slow']
+        self.assertEqual(stats['missed'], 3)
+        self.assertEqual(stats['runs'], 4)
+        print("✓ Missed deadline accounting test passed")
+
+    def test_start_jitter_and_errors(self):
+        """Jitter spreads first runs and failing jobs stay scheduled"""
+        for i in range(20):
+            self.scheduler.add_job(f"city{i}", lambda: None, 600, jitter=30)
+        first_runs = [job.next_run for job in self.scheduler.jobs.values()]
+        self.assertTrue(all(0 <= t <= 30 for t in first_runs))
+        self.assertGreater(len(set(first_runs)), 1)
+
+        def broken():
+            raise RuntimeError("boom")
+
+        self.scheduler.add_job('broken', broken, 100)
+        self._run_until(250)
+        stats = self.scheduler.get_stats()['broken']
+        self.assertEqual(stats['runs'], 3)
+        self.assertEqual(stats['errors'], 3)
+        print("✓ Scheduler jitter test passed")
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
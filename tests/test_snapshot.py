@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processor import WeatherDataProcessor
+from src.snapshot import ObservationSnapshot
+from src.aggregator import utc_date
+
+def observation(city, dt, temp, main='Clear'):
+    return {'city': city, 'temp': temp, 'feels_like': temp, 'main': main,
+            'description': main.lower(), 'humidity': 50, 'pressure': 1010,
+            'wind_speed': 3.0, 'wind_direction': 90, 'clouds': 10,
+            'visibility': 10000, 'rain_1h': 0, 'snow_1h': 0, 'dt': dt}
+
+class TestObservationSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = ObservationSnapshot(os.path.join(self.tmp.name, 'snapshot'))
+        self.now = int(time.time())
+        self.processor = WeatherDataProcessor()
+        for i in range(6):
+            self.processor.add_weather_data(observation('Delhi', self.now - (6 - i) * 600, 30 + i))
+            self.processor.add_weather_data(observation('Mumbai', self.now - (6 - i) * 600, 25, 'Rain'))
+        self.processor.add_forecast_data('Delhi', [{'city': 'Delhi', 'dt': self.now,
+                                                    'date_time': date.today(), 'temp': 31}])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restart_keeps_intra_day_history(self):
+        """A restored processor carries on from the snapshot, not from empty"""
+        self.snapshot.save(self.processor)
+        restored = WeatherDataProcessor()
+        stats = self.snapshot.restore(restored)
+        self.assertEqual(stats['rows'], 12)
+
+        delhi = restored.current_data['Delhi']
+        self.assertTrue(delhi.mapped)
+        self.assertFalse(delhi.columns['temp'].flags.writeable)  # Still the read-only mapping
+        self.assertEqual(list(restored.get_recent_view().column('Delhi', 'temp')),
+                         [30, 31, 32, 33, 34, 35])
+        self.assertEqual(list(restored.get_forecast_data('Delhi')['temp']), [31])
+
+        # The first write copies the city out of the mapping and keeps aggregating
+        restored.add_weather_data(observation('Delhi', self.now, 36))
+        self.assertFalse(delhi.mapped)
+        self.assertEqual(len(delhi), 7)
+        self.processor.add_weather_data(observation('Delhi', self.now, 36))
+        today = utc_date(self.now)
+        self.assertEqual(restored.get_daily_summary('Delhi', today),
+                         self.processor.get_daily_summary('Delhi', today))
+        print("✓ Snapshot warm restart test passed")
+
+    def test_only_open_rollup_periods_saved(self):
+        """Closed rollup periods stay in their tables; the open one keeps aggregating"""
+        start = 1725148800  # 2024-09-01 00:00 UTC
+        for i in range(47):
+            self.processor.add_weather_data(observation('Pune', start + i * 3600 + 1800, 20 + i % 5))
+        self.snapshot.save(self.processor)
+        restored = WeatherDataProcessor()
+        self.snapshot.restore(restored)
+
+        for tier, periods in self.processor.rollups.items():
+            self.assertGreater(len(periods['Pune']), 1)
+            self.assertEqual(list(restored.rollups[tier]['Pune']), [max(periods['Pune'])])
+        self.assertEqual(restored.daily_aggregates.keys(), self.processor.daily_aggregates.keys())
+
+        for processor in (restored, self.processor):
+            processor.add_weather_data(observation('Pune', start + 47 * 3600 + 2400, 36))
+        for tier in self.processor.rollups:
+            self.assertEqual(restored.get_rollups(tier, 'Pune')[-1],
+                             self.processor.get_rollups(tier, 'Pune')[-1])
+        print("✓ Snapshot open rollup test passed")
+
+    def test_new_generation_replaces_old(self):
+        """Each save swaps in a new generation; a city filter restores a shard"""
+        self.snapshot.save(self.processor)
+        self.processor.add_weather_data(observation('Delhi', self.now, 40))
+        self.snapshot.save(self.processor)
+        generations = [n for n in os.listdir(self.snapshot.directory) if n.startswith('gen-')]
+        self.assertEqual(len(generations), 1)
+
+        restored = WeatherDataProcessor()
+        self.snapshot.restore(restored, cities={'Mumbai'})
+        self.assertEqual(list(restored.current_data), ['Mumbai'])
+        self.assertEqual(list(restored.daily_aggregates), ['Mumbai'])
+        self.assertIsNone(ObservationSnapshot(self.tmp.name).restore(WeatherDataProcessor()))
+        print("✓ Snapshot generation test passed")
+
+if __name__ == '__main__':
+    unittest.main()